@@ -1,11 +1,12 @@
 import re
 from datetime import (datetime, timezone)
+from django.db import transaction
 from django.db.models import QuerySet
 from rest_framework import status
+from expense.functions.sync_functions import set_changed
 from ..models.category import Category
 from ..serializers.category import CategorySerializer
-from ..utils.responses import (no_category_found,
-                               create_category_failed)
+from ..utils.responses import no_category_found
 
 
 def find_categories_by_user(userId: str) -> list:
@@ -22,7 +23,7 @@ def find_categories_by_user(userId: str) -> list:
     '''
     queryset: QuerySet[Category] = Category.objects.filter(
         user=userId).order_by('name')
-    if len(queryset) == 0:
+    if not queryset.exists():
         return [no_category_found, status.HTTP_404_NOT_FOUND]
     return [queryset, status.HTTP_200_OK]
 
@@ -80,14 +81,7 @@ def find_category_by_similar_name(category_name: str, userId: str) -> list:
                     a human-readable response message and a 'status'
                     integer with standard Http status code
     '''
-    name: str = category_name.title()
-    name.replace('-', ' ')
-    and_string: int = name.find('and')
-    if and_string != -1:
-        name = name.replace('and', '')
-
-    name_list: list = re.findall(r"\w+", name)
-    name_list.insert(0, name)
+    name_list: list = get_similar_name_list(category_name)
     user_queryset: QuerySet[Category] = Category.objects.filter(user=userId)
     if len(user_queryset) == 0:
         return [no_category_found, status.HTTP_404_NOT_FOUND]
@@ -102,49 +96,120 @@ def find_category_by_similar_name(category_name: str, userId: str) -> list:
         return [no_category_found, status.HTTP_404_NOT_FOUND]
 
 
-def get_category_id(category_name: str, userId: str) -> str | None:
-    ''' get_category_id: function to handle searching for category
-            by similar name or creating new category if no matches
+def get_similar_name_list(category_name: str) -> list:
+    ''' get_similar_name_list: function to get list of strings used to
+            match a category name to similar Category instance names,
+            full name first followed by each word in the name
 
         Args:
             category_name (str): name for requested Category instance
-            userId (str): id for specific User instance
 
         Returns:
-            categoryId (str): new or matching id for Category instance
+            list: list of name strings to match in order
     '''
-    categoryId: str | None = None
-    response = find_category_by_similar_name(category_name, userId)
-    if response[1] == 200:
-        categoryId = response[0].id
-    else:
-        result = create_category_for_import(category_name, userId)
-        if result[1] == 200:
-            categoryId = result[0]
-    return categoryId
+    name: str = category_name.title()
+    name.replace('-', ' ')
+    and_string: int = name.find('and')
+    if and_string != -1:
+        name = name.replace('and', '')
+
+    name_list: list = re.findall(r"\w+", name)
+    name_list.insert(0, name)
+    return name_list
 
 
-def create_category_for_import(name: str, userId: str) -> list:
-    ''' create_category_for_import: function to handle creating
-            new Category instance using name from CSV import file
+class CategoryResolver:
+    ''' CategoryResolver: class to resolve category names from CSV import
+            file to Category instance ids for a specific User instance,
+            loading the user's categories once and matching similar names
+            in memory, then bulk creating new categories for unmatched names
 
         Args:
-            name (str): name for requested Category instance
             userId (str): id for specific User instance
-
-        Returns:
-            list: list containing category ID string for success
-                or a human-readable response message if failed,
-                and a 'status' integer with standard Http status code
     '''
-    new_category: dict = {
-        'name': name, 'user': userId, 'display_color': '#FFFFFF',
-        'budget': 0, 'type': 1,  # Defaults to 1=Expense
-        'date_created': datetime.now(tz=timezone.utc).replace(microsecond=0)
-    }
-    serializer = CategorySerializer(data=new_category)
-    if not serializer.is_valid():
-        return [create_category_failed, status.HTTP_400_BAD_REQUEST]
-    serializer.save()
-    category: dict = serializer.data
-    return [category['id'], status.HTTP_200_OK]
+
+    def __init__(self, userId: str) -> None:
+        self.userId: str = userId
+        self.categories: list | None = None
+        self.resolved: dict = {}
+        self.pending: list = []
+
+    def get_category_id(self, category_name: str) -> str | None:
+        ''' get_category_id: function to handle searching for category
+                by similar name or adding new category if no matches
+
+            Args:
+                category_name (str): name for requested Category instance
+
+            Returns:
+                categoryId (str): new or matching id for Category instance
+        '''
+        if category_name in self.resolved:
+            return self.resolved[category_name]
+
+        if self.categories is None:
+            self.categories = [
+                [categoryId, name.lower()] for [categoryId, name] in
+                Category.objects.filter(user=self.userId).values_list(
+                    'id', 'name')]
+
+        categoryId: str | None = self.find_similar_name(category_name)
+        if categoryId is None:
+            categoryId = self.add_category(category_name)
+        self.resolved[category_name] = categoryId
+        return categoryId
+
+    def find_similar_name(self, category_name: str) -> str | None:
+        ''' find_similar_name: function to find id of first loaded category
+                containing the full name or any word in the name, ignoring
+                case
+
+            Args:
+                category_name (str): name for requested Category instance
+
+            Returns:
+                categoryId (str): matching id for Category instance or None
+        '''
+        for string in get_similar_name_list(category_name):
+            string = string.lower()
+            for [categoryId, name] in self.categories:
+                if string in name:
+                    return categoryId
+        return None
+
+    def add_category(self, name: str) -> str | None:
+        ''' add_category: function to validate new Category instance using
+                name from CSV import file and hold it to be bulk created
+
+            Args:
+                name (str): name for requested Category instance
+
+            Returns:
+                categoryId (str): id for new Category instance or None
+                    if validation failed
+        '''
+        new_category: dict = {
+            'name': name, 'user': self.userId, 'display_color': '#FFFFFF',
+            'budget': 0, 'type': 1,  # Defaults to 1=Expense
+            'date_created': datetime.now(tz=timezone.utc).replace(
+                microsecond=0)
+        }
+        # Validation checks (title case) name is unique for user
+        serializer = CategorySerializer(data=new_category)
+        if not serializer.is_valid():
+            return None
+        category = Category(**serializer.validated_data)
+        self.pending.append(category)
+        self.categories.append([category.id, category.name.lower()])
+        return category.id
+
+    def create_pending(self) -> None:
+        ''' create_pending: function to bulk create all new Category
+                instances added since the last call
+        '''
+        if len(self.pending) == 0:
+            return
+        with transaction.atomic():
+            set_changed(self.pending, self.userId)
+            Category.objects.bulk_create(self.pending)
+        self.pending = []
@@ -0,0 +1,199 @@
+from calendar import monthrange
+from datetime import (date, datetime)
+from decimal import Decimal
+from django.db.models import (Min, QuerySet)
+from django.utils.timezone import localdate
+from rest_framework import status
+from expense.models import ExpenseRollup
+from login.serializers.read import (format_decimal, format_uuid)
+from ..models.category import Category
+from ..utils.responses import (invalid_month, future_month)
+from .summary import (UNCATEGORIZED_NAME, UNCATEGORIZED_COLOR,
+                      UNCATEGORIZED_TYPE)
+
+
+# Months of rolling averages of monthly totals before forecast month
+AVERAGE_WINDOWS = [3, 6, 12]
+# Months before forecast month fitted by trend slope
+TREND_MONTHS = 12
+# Months of totals read before forecast month
+HISTORY_MONTHS = max(AVERAGE_WINDOWS + [TREND_MONTHS])
+
+
+def get_category_forecast(userId: str, month: str | None = None,
+                          today: date | None = None) -> list:
+    ''' get_category_forecast: function to get month-end projection at
+            current burn rate, rolling 3, 6 and 12 month averages and trend
+            slope of monthly totals of each Category instance of User
+            instance, from monthly expense rollups of last 13 months (so
+            cost depends on number of categories, not expenses)
+
+        Args:
+            userId (str): id for requested User instance
+            month (str): 'YYYY-MM' month to forecast (defaults to current
+                month, past months being fully elapsed)
+            today (date): current date (defaults to today in current time
+                zone)
+
+        Returns:
+            list: list containing forecast dictionary with 'month', 'days'
+                and 'elapsed_days' of month and list of forecast
+                dictionaries for each category (and expenses without
+                category, if any) or a human-readable response message
+                and a 'status' integer with standard Http status code
+    '''
+    if today is None:
+        today = localdate()
+    current: date = date(today.year, today.month, 1)
+    try:
+        month_date: date = (current if not month else
+                            datetime.strptime(month, '%Y-%m').date())
+    except (TypeError, ValueError):
+        return [invalid_month, status.HTTP_400_BAD_REQUEST]
+    if month_date > current:
+        return [future_month, status.HTTP_400_BAD_REQUEST]
+
+    days: int = monthrange(month_date.year, month_date.month)[1]
+    elapsed: int = today.day if month_date == current else days
+    totals: dict = get_monthly_totals(userId, month_date)
+    # Months before forecast month since first expense of user
+    first_month: date | None = ExpenseRollup.objects.filter(
+        user=userId).aggregate(first=Min('month'))['first']
+    history: int = 0 if first_month is None else max(min(
+        get_month_index(month_date) - get_month_index(first_month),
+        HISTORY_MONTHS), 0)
+
+    categories: QuerySet = Category.objects.filter(user=userId).values_list(
+        'id', 'name', 'display_color', 'type', 'budget')
+    forecast: list = [
+        get_forecast_item(format_uuid(categoryId), name, display_color,
+                          type, budget, totals.pop(categoryId, None),
+                          history, days, elapsed)
+        for [categoryId, name, display_color, type, budget] in categories]
+    if None in totals:
+        forecast.append(get_forecast_item(
+            None, UNCATEGORIZED_NAME, UNCATEGORIZED_COLOR,
+            UNCATEGORIZED_TYPE, Decimal(0), totals[None], history, days,
+            elapsed))
+    forecast.sort(key=lambda item: (item['category_id'] is None,
+                                    item['name']))
+    return [{'month': month_date.strftime('%Y-%m'), 'days': days,
+             'elapsed_days': elapsed, 'categories': forecast},
+            status.HTTP_200_OK]
+
+
+def get_month_index(month: date) -> int:
+    ''' get_month_index: function to get number of months since year 0
+            of month (so months can be subtracted)
+
+        Args:
+            month (date): first day of month
+
+        Returns:
+            int: month index
+    '''
+    return month.year * 12 + month.month - 1
+
+
+def get_monthly_totals(userId: str, month: date) -> dict:
+    ''' get_monthly_totals: function to get rollup totals of User instance
+            for month and each of the months before it averaged or fitted,
+            with withdrawals and deposits netted by type of category
+
+        Args:
+            userId (str): id for requested User instance
+            month (date): first day of forecast month
+
+        Returns:
+            dict: list of monthly totals (oldest first, forecast month
+                last) by category id (None for expenses without category)
+    '''
+    length: int = HISTORY_MONTHS + 1
+    end: int = get_month_index(month)
+    start: int = end - length + 1
+    rows: QuerySet = ExpenseRollup.objects.filter(
+        user=userId, month__gte=date(start // 12, start % 12 + 1, 1),
+        month__lte=month).values_list(
+        'category', 'category__type', 'month', 'type', 'total')
+    totals: dict = {}
+    for [categoryId, category_type, row_month, type, total] in rows:
+        if category_type is None:
+            category_type = UNCATEGORIZED_TYPE
+        # Expenses count towards category when type matches (as summary)
+        months: list = totals.setdefault(categoryId, [Decimal(0)] * length)
+        months[get_month_index(row_month) - start] += (
+            total if type == category_type else -total)
+    return totals
+
+
+def get_forecast_item(categoryId: str | None, name: str, display_color: str,
+                      type: int, budget: Decimal, months: list | None,
+                      history: int, days: int, elapsed: int) -> dict:
+    ''' get_forecast_item: function to get forecast dictionary of category
+            from its monthly totals
+
+        Args:
+            categoryId (str): id for Category instance (None for expenses
+                without category)
+            name (str): name of category
+            display_color (str): display color of category
+            type (int): type of category
+            budget (Decimal): monthly budget of category
+            months (list): monthly totals of category from
+                get_monthly_totals (None if no expenses)
+            history (int): number of months before forecast month since
+                first expense of user
+            days (int): number of days of forecast month
+            elapsed (int): number of days of forecast month elapsed
+
+        Returns:
+            dict: forecast dictionary of category
+    '''
+    if months is None:
+        months = [Decimal(0)] * (HISTORY_MONTHS + 1)
+    spent: Decimal = months[-1]
+    daily_rate: Decimal = spent / elapsed
+    projected: Decimal = daily_rate * days
+    over_budget: bool = projected >= budget
+    percent: int = 100
+    if not over_budget:
+        percent = 0 if budget <= 0 else max(int(projected * 100 // budget),
+                                            0)
+    item: dict = {'category_id': categoryId,
+                  'name': name,
+                  'display_color': display_color,
+                  'type': type,
+                  'budget': format_decimal(budget),
+                  'spent': format_decimal(spent),
+                  'daily_rate': format_decimal(daily_rate),
+                  'projected': format_decimal(projected),
+                  'projected_percent': percent,
+                  'projected_over_budget': over_budget}
+    for window in AVERAGE_WINDOWS:
+        count: int = min(window, history)
+        item['average_' + str(window)] = None if count == 0 else \
+            format_decimal(sum(months[-1 - count:-1]) / count)
+    item['trend'] = format_decimal(
+        get_trend_slope(months[-1 - min(TREND_MONTHS, history):-1]))
+    return item
+
+
+def get_trend_slope(totals: list) -> Decimal | None:
+    ''' get_trend_slope: function to get least squares slope of monthly
+            totals (change of total per month)
+
+        Args:
+            totals (list): monthly totals, oldest first
+
+        Returns:
+            Decimal: slope of totals (None if fewer than 2 months)
+    '''
+    count: int = len(totals)
+    if count < 2:
+        return None
+    mean_x: Decimal = Decimal(count - 1) / 2
+    mean_y: Decimal = sum(totals) / count
+    covariance: Decimal = sum((index - mean_x) * (total - mean_y)
+                              for [index, total] in enumerate(totals))
+    variance: Decimal = sum((index - mean_x) ** 2 for index in range(count))
+    return covariance / variance
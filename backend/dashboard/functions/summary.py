@@ -0,0 +1,350 @@
+import bisect
+from datetime import (date, datetime, time, timedelta, timezone)
+from decimal import Decimal
+from typing import Iterable
+from django.db.models import (Case, CharField, DecimalField, F,
+                              FilteredRelation, Q, QuerySet,
+                              SmallIntegerField, Sum, Value, When)
+from django.db.models.functions import Coalesce
+from django.utils.timezone import (get_current_timezone, make_aware)
+from rest_framework import status
+from expense.models import (Expense, ExpenseRollup)
+from expense.functions.rollup_functions import get_rollup_month
+from expense.functions.snapshot_functions import (EPOCH, NO_CATEGORY,
+                                                  LedgerSnapshot,
+                                                  build_snapshot_later,
+                                                  has_snapshot,
+                                                  open_snapshot)
+from login.functions.user import user_exists
+from login.serializers.read import (format_decimal, format_uuid)
+from login.utils.responses import no_user_found
+from ..models.category import Category
+from ..utils.responses import (invalid_month, invalid_date_range)
+
+
+# Name, color and type of summary row of expenses without category
+UNCATEGORIZED_NAME = 'Uncategorized'
+UNCATEGORIZED_COLOR = '#FFFFFF'
+UNCATEGORIZED_TYPE = 1
+
+AMOUNT_FIELD = DecimalField(max_digits=12, decimal_places=2)
+
+
+def get_category_summary(userId: str, month: str | None = None) -> list:
+    ''' get_category_summary: function to get budget, total spent, count
+            of expenses, percent of budget spent and over budget flag of
+            each Category instance of User instance for a month, with one
+            GROUP BY query of monthly expense rollups joined to categories
+            (so cost depends on number of categories, not expenses)
+
+        Args:
+            userId (str): id for requested User instance
+            month (str): 'YYYY-MM' month to summarize (defaults to
+                current month)
+
+        Returns:
+            list: list containing list of summary dictionaries for each
+                category (and expenses without category, if any) or a
+                human-readable response message and a 'status' integer
+                with standard Http status code
+    '''
+    try:
+        month_date: date = (
+            get_rollup_month(datetime.now(tz=timezone.utc)) if not month
+            else datetime.strptime(month, '%Y-%m').date())
+    except (TypeError, ValueError):
+        return [invalid_month, status.HTTP_400_BAD_REQUEST]
+
+    rows: QuerySet = get_category_totals(userId, month_date).union(
+        get_uncategorized_totals(userId, month_date), all=True)
+    summary: list = [get_summary_item(row) for row in rows]
+    summary.sort(key=lambda item: (item['category_id'] is None,
+                                   item['name']))
+    return [summary, status.HTTP_200_OK]
+
+
+def get_category_totals(userId: str, month: date) -> QuerySet:
+    ''' get_category_totals: function to get queryset of each Category
+            instance of User instance with signed total and count of
+            expenses in month, from rollups joined on user, category and
+            month
+
+        Args:
+            userId (str): id for requested User instance
+            month (date): first day of month
+
+        Returns:
+            QuerySet: queryset of category total dictionaries
+    '''
+    # Expenses count towards category when type matches (withdrawals
+    # of expense categories, deposits of income categories)
+    signed_total = Case(
+        When(month_rollups__type=F('type'),
+             then=F('month_rollups__total')),
+        default=-F('month_rollups__total'), output_field=AMOUNT_FIELD)
+    return Category.objects.filter(user=userId).annotate(
+        month_rollups=FilteredRelation('expense_rollups', condition=Q(
+            expense_rollups__user=userId,
+            expense_rollups__month=month))).values(
+        'id', 'name', 'display_color', 'type', 'budget').annotate(
+        spent=Coalesce(Sum(signed_total), Value(Decimal(0)),
+                       output_field=AMOUNT_FIELD),
+        count=Coalesce(Sum('month_rollups__count'), 0)).order_by()
+
+
+def get_uncategorized_totals(userId: str, month: date) -> QuerySet:
+    ''' get_uncategorized_totals: function to get queryset of signed total
+            and count of expenses of User instance without category in
+            month from rollups, with same columns as get_category_totals
+            (grouped by category, which is always null, so no row if no
+            expenses)
+
+        Args:
+            userId (str): id for requested User instance
+            month (date): first day of month
+
+        Returns:
+            QuerySet: queryset of total dictionary
+    '''
+    signed_total = Case(
+        When(type=UNCATEGORIZED_TYPE, then=F('total')),
+        default=-F('total'), output_field=AMOUNT_FIELD)
+    return ExpenseRollup.objects.filter(
+        user=userId, category=None, month=month).values(
+        'category',
+        summary_name=Value(UNCATEGORIZED_NAME, output_field=CharField()),
+        summary_color=Value(UNCATEGORIZED_COLOR, output_field=CharField()),
+        summary_type=Value(UNCATEGORIZED_TYPE,
+                           output_field=SmallIntegerField()),
+        summary_budget=Value(Decimal(0), output_field=AMOUNT_FIELD)).annotate(
+        spent=Coalesce(Sum(signed_total), Value(Decimal(0)),
+                       output_field=AMOUNT_FIELD),
+        count=Sum('count')).order_by()
+
+
+def get_summary_item(row: dict) -> dict:
+    ''' get_summary_item: function to get summary dictionary of category
+            total row, with percent of budget spent (0 to 100) and over
+            budget flag calculated as by dashboard progress graph
+
+        Args:
+            row (dict): category total dictionary
+
+        Returns:
+            dict: summary dictionary of category
+    '''
+    budget: Decimal = row['budget']
+    spent: Decimal = row['spent']
+    over_budget: bool = spent >= budget
+    percent: int = 100
+    if not over_budget:
+        percent = 0 if budget <= 0 else max(int(spent * 100 // budget), 0)
+    return {'category_id': format_uuid(row['id']),
+            'name': row['name'],
+            'display_color': row['display_color'],
+            'type': row['type'],
+            'budget': format_decimal(budget),
+            'spent': format_decimal(spent),
+            'count': row['count'],
+            'percent': percent,
+            'over_budget': over_budget}
+
+
+def get_range_summary(userId: str, start_date: str, end_date: str) -> list:
+    ''' get_range_summary: function to get signed total and count of
+            expenses of each Category instance of User instance and total
+            withdrawals and deposits of each day between two dates, for
+            any range of days (rollups only hold months), scanning
+            columnar snapshot of expenses of user instead of expense rows
+            (until first snapshot of user is built in background, expense
+            rows of range are read instead)
+
+        Args:
+            userId (str): id for requested User instance
+            start_date (str): ISO format date of start of range
+            end_date (str): ISO format date of end of range (inclusive)
+
+        Returns:
+            list: list containing dictionary of 'start_date', 'end_date',
+                list of summary dictionaries for each category (and
+                expenses without category, if any) and list of 'daily'
+                totals of days with expenses, or a human-readable response
+                message and a 'status' integer with standard Http status
+                code
+    '''
+    try:
+        start: int = (date.fromisoformat(str(start_date)) - EPOCH).days
+        end: int = (date.fromisoformat(str(end_date)) - EPOCH).days
+    except ValueError:
+        return [invalid_date_range, status.HTTP_400_BAD_REQUEST]
+    if end < start:
+        return [invalid_date_range, status.HTTP_400_BAD_REQUEST]
+
+    if has_snapshot(userId):
+        snapshot: LedgerSnapshot | None = open_snapshot(userId)
+        if snapshot is None:
+            return [no_user_found, status.HTTP_404_NOT_FOUND]
+        with snapshot:
+            [totals, daily] = get_snapshot_totals(snapshot, start, end)
+            codes: dict = {categoryId: code for [code, categoryId]
+                           in enumerate(snapshot.categories)}
+    else:
+        if not user_exists(userId):
+            return [no_user_found, status.HTTP_404_NOT_FOUND]
+        # Building snapshot reads every expense of user, so request is not
+        # kept waiting for it
+        build_snapshot_later(userId)
+        [totals, daily] = get_expense_range_totals(userId, start, end)
+        codes = {str(code): code for [code, _] in totals
+                 if code != NO_CATEGORY}
+
+    categories: QuerySet = Category.objects.filter(user=userId).values_list(
+        'id', 'name', 'display_color', 'type')
+    summary: list = [
+        get_range_item(totals, codes.get(str(categoryId)), categoryId, name,
+                       display_color, type)
+        for [categoryId, name, display_color, type] in categories]
+    if any(code == NO_CATEGORY for [code, _] in totals):
+        summary.append(get_range_item(
+            totals, NO_CATEGORY, None, UNCATEGORIZED_NAME,
+            UNCATEGORIZED_COLOR, UNCATEGORIZED_TYPE))
+    summary.sort(key=lambda item: (item['category_id'] is None,
+                                   item['name']))
+    return [{'start_date': str(start_date), 'end_date': str(end_date),
+             'categories': summary,
+             'daily': [{'date': str(EPOCH + timedelta(days=day)),
+                        'withdrawals': format_cents(withdrawals),
+                        'deposits': format_cents(deposits)}
+                       for [day, [withdrawals, deposits]]
+                       in sorted(daily.items())]},
+            status.HTTP_200_OK]
+
+
+def get_snapshot_totals(snapshot: LedgerSnapshot, start: int,
+                        end: int) -> list:
+    ''' get_snapshot_totals: function to sum amounts of expenses of
+            snapshot in range of days by category and type and by day,
+            reading only rows of range (rows are ordered by day)
+
+        Args:
+            snapshot (LedgerSnapshot): open snapshot of expenses of user
+            start (int): first day of range (days since EPOCH)
+            end (int): last day of range (days since EPOCH)
+
+        Returns:
+            list: list containing dictionary of [cents, count] by category
+                code and type and dictionary of [withdrawal cents, deposit
+                cents] by day
+    '''
+    columns: dict = snapshot.columns
+    first: int = bisect.bisect_left(columns['days'], start)
+    last: int = bisect.bisect_right(columns['days'], end, first)
+    return add_range_totals(zip(
+        columns['days'][first:last], columns['cents'][first:last],
+        columns['types'][first:last], columns['categories'][first:last]))
+
+
+def get_expense_range_totals(userId: str, start: int, end: int) -> list:
+    ''' get_expense_range_totals: function to sum amounts of expenses of
+            User instance in range of days by category and type and by day
+            from expense rows (when user has no snapshot yet)
+
+        Args:
+            userId (str): id for requested User instance
+            start (int): first day of range (days since EPOCH)
+            end (int): last day of range (days since EPOCH)
+
+        Returns:
+            list: list containing dictionary of [cents, count] by category
+                id (NO_CATEGORY for expenses without category) and type
+                and dictionary of [withdrawal cents, deposit cents] by day
+    '''
+    zone = get_current_timezone()
+    epoch: int = EPOCH.toordinal()
+    first: datetime = make_aware(datetime.combine(
+        EPOCH + timedelta(days=start), time.min), zone)
+    after: datetime = make_aware(datetime.combine(
+        EPOCH + timedelta(days=end + 1), time.min), zone)
+    rows: QuerySet = Expense.objects.filter(
+        user=userId, spend_date__gte=first, spend_date__lt=after).values_list(
+        'spend_date', 'amount', 'type', 'category')
+    return add_range_totals(
+        (spend_date.astimezone(zone).toordinal() - epoch, int(amount * 100),
+         type, NO_CATEGORY if categoryId is None else categoryId)
+        for [spend_date, amount, type, categoryId] in rows.iterator())
+
+
+def add_range_totals(rows: Iterable) -> list:
+    ''' add_range_totals: function to sum amounts of expenses by category
+            and type and by day
+
+        Args:
+            rows (Iterable): day, cents, type and category key of each
+                expense
+
+        Returns:
+            list: list containing dictionary of [cents, count] by category
+                key and type and dictionary of [withdrawal cents, deposit
+                cents] by day
+    '''
+    totals: dict = {}
+    daily: dict = {}
+    for [day, cents, type, code] in rows:
+        total: list | None = totals.get((code, type))
+        if total is None:
+            totals[(code, type)] = [cents, 1]
+        else:
+            total[0] += cents
+            total[1] += 1
+        day_total: list | None = daily.get(day)
+        if day_total is None:
+            day_total = daily[day] = [0, 0]
+        # Type 1 is withdrawal and type 0 deposit
+        day_total[1 - type] += cents
+    return [totals, daily]
+
+
+def get_range_item(totals: dict, code: int | None, categoryId,
+                   name: str, display_color: str, type: int) -> dict:
+    ''' get_range_item: function to get range summary dictionary of
+            category from snapshot totals
+
+        Args:
+            totals (dict): [cents, count] by category key and type
+            code (int | UUID): key of category in totals (None if
+                category has no expenses in range)
+            categoryId (UUID): id for Category instance (None for expenses
+                without category)
+            name (str): name of category
+            display_color (str): display color of category
+            type (int): type of category
+
+        Returns:
+            dict: range summary dictionary of category
+    '''
+    spent: int = 0
+    count: int = 0
+    # Expenses count towards category when type matches (as summary)
+    for expense_type in [0, 1]:
+        [cents, expenses] = totals.get((code, expense_type), [0, 0])
+        spent += cents if expense_type == type else -cents
+        count += expenses
+    return {'category_id': format_uuid(categoryId),
+            'name': name,
+            'display_color': display_color,
+            'type': type,
+            'spent': format_cents(spent),
+            'count': count}
+
+
+def format_cents(cents: int) -> str:
+    ''' format_cents: function to format amount in cents as fixed point
+            string with 2 decimal places
+
+        Args:
+            cents (int): amount in cents
+
+        Returns:
+            str: fixed point decimal string
+    '''
+    return format_decimal(Decimal(cents).scaleb(-2))
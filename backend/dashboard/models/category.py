@@ -19,14 +19,13 @@ class Category(models.Model):
                              on_delete=models.CASCADE,
                              related_name='categories')
     name = models.CharField(
-        max_length=50, blank=False, null=False, unique=True,
+        max_length=50, blank=False, null=False,
         validators=[MinLengthValidator(limit_value=2,
                                        message=('Must be at least ' +
                                                 '2 characters.')),
                     MaxLengthValidator(limit_value=50,
                                        message=('Must not exceed 50 ' +
-                                                'characters.'))],
-        error_messages={'unique': 'Category name must be unique.'})
+                                                'characters.'))])
     display_color = models.CharField(
         max_length=7, blank=False, null=False,
         validators=[MinLengthValidator(
@@ -48,9 +47,21 @@ class Category(models.Model):
                                  blank=False, null=False)
     date_created = CustomDateTimeField(blank=False, null=False)
 
+    # Change sequence number and date of last create or update (see
+    # expense sync)
+    change_seq = models.BigIntegerField(blank=False, null=False, default=0,
+                                        editable=False)
+    updated_at = CustomDateTimeField(blank=True, null=True, editable=False)
+
     def __str__(self) -> str:
         return self.name
 
     class Meta:
         verbose_name_plural = 'Categories'
         db_table = 'dashboard_categories'
+        indexes = [models.Index(fields=['user', 'change_seq'],
+                                name='category_user_change_seq_idx')]
+        # Category names are unique per user
+        constraints = [models.UniqueConstraint(
+            fields=['user', 'name'], name='category_user_name_unique',
+            violation_error_message='Category name must be unique.')]
@@ -1,5 +1,10 @@
 from datetime import datetime
+from django.db import transaction
 from rest_framework import serializers
+from expense.functions.sync_functions import (
+    set_changed, set_category_expenses_changed)
+from login.serializers.read import (ReadSerializer, format_datetime,
+                                    format_decimal, format_uuid)
 from ..models.category import Category
 
 
@@ -13,7 +18,7 @@ class CategorySerializer(serializers.ModelSerializer):
     '''
     class Meta:
         model = Category
-        fields = '__all__'
+        exclude = ['change_seq', 'updated_at']
 
     def validate_name(self, value: str) -> str:
         # Validate name to return first letter capitalized each word
@@ -37,13 +42,38 @@ class CategorySerializer(serializers.ModelSerializer):
 
     def create(self, validated_data) -> Category:
         # Create new instance of Category model once data validated
-        return Category.objects.create(**validated_data)
+        with transaction.atomic():
+            category = Category(**validated_data)
+            set_changed([category], category.user_id)
+            category.save(force_insert=True)
+        return category
 
     def update(self, instance, validated_data) -> Category:
         # Update existing instance of Category model once data validated
-        instance.name = validated_data.get('name', instance.name)
-        instance.display_color = validated_data.get(
-            'display_color', instance.display_color)
-        instance.budget = validated_data.get('budget', instance.budget)
-        instance.save()
+        with transaction.atomic():
+            name: str = instance.name
+            instance.name = validated_data.get('name', instance.name)
+            instance.display_color = validated_data.get(
+                'display_color', instance.display_color)
+            instance.budget = validated_data.get('budget', instance.budget)
+            change_seq: int = set_changed([instance], instance.user_id)
+            instance.save()
+            if instance.name != name:
+                # Category name is part of synced expenses
+                set_category_expenses_changed(instance, change_seq)
         return instance
+
+
+class CategoryReadSerializer(ReadSerializer):
+    ''' CategoryReadSerializer: read only Category serializer converting
+            rows of CategoryReadSerializer.get_values(queryset) to the
+            same data as CategorySerializer (datetimes without
+            microseconds)
+
+        Args:
+            ReadSerializer (class): custom read only serializer class
+    '''
+    value_fields = ['id', 'name', 'display_color', 'type', 'budget',
+                    'date_created', 'user']
+    value_formats = {'id': format_uuid, 'budget': format_decimal,
+                     'date_created': format_datetime, 'user': format_uuid}
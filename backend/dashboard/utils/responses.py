@@ -8,3 +8,9 @@ create_category_failed = 'Error creating category in db.'
 category_deleted = 'Category successfully deleted.'
 
 category_exists = 'Category with this name already exists.'
+
+invalid_month = 'Month must be in YYYY-MM format.'
+
+future_month = 'Month must not be after current month.'
+
+invalid_date_range = 'Dates must be in YYYY-MM-DD format and in order.'
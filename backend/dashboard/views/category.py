@@ -1,16 +1,29 @@
 from datetime import (datetime, timezone)
+from django.db import transaction
 from django.db.models import QuerySet
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control
 from django.utils.decorators import method_decorator
+from django.utils.timezone import localdate
 from django.views.decorators.csrf import ensure_csrf_cookie
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
 from ..models.category import Category
-from ..serializers.category import CategorySerializer
+from ..serializers.category import (CategorySerializer,
+                                     CategoryReadSerializer)
 from ..functions.category import (find_category_by_id,
                                   find_categories_by_user,
                                   find_category_by_name)
+from ..functions.summary import (get_category_summary,
+                                 get_range_summary)
+from ..functions.forecast import get_category_forecast
+from expense.functions.rollup_functions import move_category_rollups
+from expense.functions.sync_functions import (
+    add_tombstone, set_category_expenses_changed)
+from expense.models import Tombstone
+from login.utils.cache import get_cached_response
 from login.utils.responses import invalid_request_body
 from ..utils.responses import (no_category_found, category_deleted,
                                category_update_failed, create_category_failed,
@@ -70,15 +83,16 @@ class CategoryViewSet(viewsets.ViewSet):
         Returns:
             Response (HttpResponse): object containing API response
                 information, specifically a 'detail' object of
-                CategorySerializer data containing queryset of category
+                CategoryReadSerializer data containing queryset of category
                 database or error if no data found, 'status' integer with
                 standard Http status code
         '''
         queryset: QuerySet[Category] = Category.objects.all().order_by('name')
-        if len(queryset) == 0:
+        if not queryset.exists():
             return Response({'detail': no_category_found},
                             status=status.HTTP_404_NOT_FOUND)
-        serializer = CategorySerializer(queryset, many=True)
+        serializer = CategoryReadSerializer(
+            CategoryReadSerializer.get_values(queryset), many=True)
         return Response({'detail': serializer.data},
                         status=status.HTTP_200_OK)
 
@@ -98,24 +112,118 @@ class CategoryViewSet(viewsets.ViewSet):
         Returns:
             Response (HttpResponse): object containing API response
                 information, specifically a 'detail' object of
-                CategorySerializer data containing queryset of category
+                CategoryReadSerializer data containing queryset of category
                 database or error if no data found, 'status' integer with
                 standard Http status code
         '''
         try:
             userId: str = request.data['user']
-            response = find_categories_by_user(userId)
-            if response[1] == status.HTTP_404_NOT_FOUND:
-                return Response({'detail': response[0]},
-                                status=status.HTTP_207_MULTI_STATUS)
         except KeyError:
             return Response({'detail': invalid_request_body},
                             status=status.HTTP_400_BAD_REQUEST)
 
-        queryset: QuerySet[Category] = response[0]
-        serializer = CategorySerializer(queryset, many=True)
-        return Response({'detail': serializer.data},
-                        status=status.HTTP_200_OK)
+        return get_cached_response(
+            request, userId, 'user_categories', {},
+            lambda: get_user_categories(userId))
+
+    @method_decorator(ensure_csrf_cookie)
+    @action(methods=['post'], detail=False)
+    def summary(self, request) -> Response:
+        ''' summary: 'POST' route for 'dashboard/categories/summary' to get
+                budget, total spent, expense count, percent of budget spent
+                and over budget flag of each Category instance associated
+                to a specific User instance for a month
+
+        Args:
+            request (obj): object from client request, specifically
+                must contain a dictionary with an 'user' id and optionally
+                'month' ('YYYY-MM', defaults to current month) in
+                request.data
+
+        Returns:
+            Response (HttpResponse): object containing API response
+                information, specifically a 'detail' list of category
+                summary objects or error if month invalid, 'status'
+                integer with standard Http status code
+        '''
+        try:
+            userId: str = request.data['user']
+            month: str | None = request.data.get('month')
+        except KeyError:
+            return Response({'detail': invalid_request_body},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return get_cached_response(
+            request, userId, 'summary', {'month': month},
+            lambda: get_summary_response(userId, month))
+
+    @method_decorator(ensure_csrf_cookie)
+    @action(methods=['post'], detail=False)
+    def range_summary(self, request) -> Response:
+        ''' range_summary: 'POST' route for
+                'dashboard/categories/range_summary' to get total spent and
+                expense count of each Category instance associated to a
+                specific User instance and daily withdrawal and deposit
+                totals between two dates
+
+        Args:
+            request (obj): object from client request, specifically
+                must contain a dictionary with an 'user' id, 'start_date'
+                and 'end_date' ('YYYY-MM-DD', inclusive) in request.data
+
+        Returns:
+            Response (HttpResponse): object containing API response
+                information, specifically a 'detail' object of category
+                and daily totals or error if dates invalid, 'status'
+                integer with standard Http status code
+        '''
+        try:
+            userId: str = request.data['user']
+            start_date: str = request.data['start_date']
+            end_date: str = request.data['end_date']
+        except KeyError:
+            return Response({'detail': invalid_request_body},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return get_cached_response(
+            request, userId, 'range_summary',
+            {'start_date': start_date, 'end_date': end_date},
+            lambda: get_range_summary_response(userId, start_date,
+                                               end_date))
+
+    @method_decorator(ensure_csrf_cookie)
+    @action(methods=['post'], detail=False)
+    def forecast(self, request) -> Response:
+        ''' forecast: 'POST' route for 'dashboard/categories/forecast' to
+                get month-end projection at current burn rate, rolling 3, 6
+                and 12 month averages and trend slope of spending of each
+                Category instance associated to a specific User instance
+
+        Args:
+            request (obj): object from client request, specifically
+                must contain a dictionary with an 'user' id and optionally
+                'month' ('YYYY-MM', defaults to current month) in
+                request.data
+
+        Returns:
+            Response (HttpResponse): object containing API response
+                information, specifically a 'detail' object of month days
+                elapsed and list of category forecast objects or error if
+                month invalid, 'status' integer with standard Http status
+                code
+        '''
+        try:
+            userId: str = request.data['user']
+            month: str | None = request.data.get('month')
+        except KeyError:
+            return Response({'detail': invalid_request_body},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        # Projection changes with date, so cached for current day only
+        return get_cached_response(
+            request, userId, 'forecast',
+            {'month': month, 'date': localdate().isoformat()},
+            lambda: get_forecast_response(userId, month))
 
     @method_decorator(ensure_csrf_cookie)
     @action(methods=['post'], detail=False)
@@ -126,7 +234,7 @@ class CategoryViewSet(viewsets.ViewSet):
         Args:
             request (obj): object from client request, specifically
                 must contain a dictionary with a 'category_id' and 'user'
-                id in request.data
+                id in request.data (response only cached with 'user')
 
         Returns:
             Response (HttpResponse): object containing API response
@@ -136,14 +244,12 @@ class CategoryViewSet(viewsets.ViewSet):
                 Http status code
         '''
         categoryId: str = request.data['category_id']
-        response = find_category_by_id(categoryId)
-        if response[1] == status.HTTP_404_NOT_FOUND:
-            return Response({'detail': response[0]},
-                            status=status.HTTP_207_MULTI_STATUS)
-        category: Category = response[0]
-        serializer = CategorySerializer(category)
-        return Response({'detail': serializer.data},
-                        status=status.HTTP_200_OK)
+        userId: str | None = request.data.get('user')
+        if userId is None:
+            return get_category_response(categoryId)
+        return get_cached_response(
+            request, userId, 'get_category', {'category_id': categoryId},
+            lambda: get_category_response(categoryId, userId))
 
     @method_decorator(ensure_csrf_cookie)
     @action(methods=['post'], detail=False)
@@ -252,6 +358,126 @@ class CategoryViewSet(viewsets.ViewSet):
                             status=status.HTTP_400_BAD_REQUEST)
 
         category: Category = response[0]
-        category.delete()
+        with transaction.atomic():
+            # Expenses are set to no category, so totals move with them
+            move_category_rollups(category)
+            # Expenses are synced again without category
+            set_category_expenses_changed(category, add_tombstone(
+                category.user_id, Tombstone.CATEGORY, category.id))
+            category.delete()
         return Response({'detail': category_deleted},
                         status=status.HTTP_200_OK)
+
+
+def get_user_categories(userId: str) -> HttpResponse:
+    ''' get_user_categories: function to get response of user_categories
+            route (cached by user data version)
+
+        Args:
+            userId (str): id for requested User instance
+
+        Returns:
+            HttpResponse: object containing API response information,
+                specifically a 'detail' object of CategoryReadSerializer
+                data or error if no data found, 'status' integer with
+                standard Http status code
+    '''
+    response: list = find_categories_by_user(userId)
+    if response[1] == status.HTTP_404_NOT_FOUND:
+        return Response({'detail': response[0]},
+                        status=status.HTTP_207_MULTI_STATUS)
+    queryset: QuerySet[Category] = response[0]
+    serializer = CategoryReadSerializer(
+        CategoryReadSerializer.get_values(queryset), many=True)
+    return Response({'detail': serializer.data}, status=status.HTTP_200_OK)
+
+
+def get_summary_response(userId: str, month: str | None) -> HttpResponse:
+    ''' get_summary_response: function to get response of summary route
+            (cached by user data version)
+
+        Args:
+            userId (str): id for requested User instance
+            month (str): 'YYYY-MM' month to summarize (defaults to
+                current month)
+
+        Returns:
+            HttpResponse: object containing API response information,
+                specifically a 'detail' list of category summary objects
+                or error if month invalid, 'status' integer with standard
+                Http status code
+    '''
+    response: list = get_category_summary(userId, month)
+    return Response({'detail': response[0]}, status=response[1])
+
+
+def get_range_summary_response(userId: str, start_date: str,
+                               end_date: str) -> HttpResponse:
+    ''' get_range_summary_response: function to get response of
+            range_summary route (cached by user data version)
+
+        Args:
+            userId (str): id for requested User instance
+            start_date (str): ISO format date of start of range
+            end_date (str): ISO format date of end of range (inclusive)
+
+        Returns:
+            HttpResponse: object containing API response information,
+                specifically a 'detail' object of category and daily
+                totals or error if dates invalid, 'status' integer with
+                standard Http status code
+    '''
+    response: list = get_range_summary(userId, start_date, end_date)
+    if response[1] == status.HTTP_404_NOT_FOUND:
+        return Response({'detail': response[0]},
+                        status=status.HTTP_207_MULTI_STATUS)
+    return Response({'detail': response[0]}, status=response[1])
+
+
+def get_forecast_response(userId: str, month: str | None) -> HttpResponse:
+    ''' get_forecast_response: function to get response of forecast route
+            (cached by user data version)
+
+        Args:
+            userId (str): id for requested User instance
+            month (str): 'YYYY-MM' month to forecast (defaults to current
+                month)
+
+        Returns:
+            HttpResponse: object containing API response information,
+                specifically a 'detail' object of category forecasts or
+                error if month invalid, 'status' integer with standard Http
+                status code
+    '''
+    response: list = get_category_forecast(userId, month)
+    return Response({'detail': response[0]}, status=response[1])
+
+
+def get_category_response(categoryId: str,
+                          userId: str | None = None) -> HttpResponse:
+    ''' get_category_response: function to get response of get_category
+            route, marked not to be stored if category belongs to another
+            user than the one it is cached for (writes of its owner would
+            not invalidate it)
+
+        Args:
+            categoryId (str): id for requested Category instance
+            userId (str): id for User instance response is cached for
+
+        Returns:
+            HttpResponse: object containing API response information,
+                specifically a 'detail' object of CategorySerializer data
+                or error if no data found, 'status' integer with standard
+                Http status code
+    '''
+    response: list = find_category_by_id(categoryId)
+    if response[1] == status.HTTP_404_NOT_FOUND:
+        return Response({'detail': response[0]},
+                        status=status.HTTP_207_MULTI_STATUS)
+    category: Category = response[0]
+    serializer = CategorySerializer(category)
+    category_response = Response({'detail': serializer.data},
+                                 status=status.HTTP_200_OK)
+    if userId is not None and str(category.user_id) != str(userId):
+        patch_cache_control(category_response, no_store=True)
+    return category_response
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Expense
+from .models import (Expense, ExpenseRollup, ImportJob, ImportProfile,
+                     CategoryRule)
 
 
 class ExpenseAdmin(admin.ModelAdmin):
@@ -10,7 +11,7 @@ class ExpenseAdmin(admin.ModelAdmin):
     '''
     list_filter = ('vendor', 'user', 'category')
     list_display = ('spend_date', 'vendor', 'category', 'date_created', 'user')
-    search_fields = ('name', 'user', 'category')
+    search_fields = ('vendor', 'description', 'user__email', 'category__name')
     readonly_fields = ['date_created', 'user']
     fieldsets = [
         ('Expense Details', {'fields': [
@@ -19,4 +20,57 @@ class ExpenseAdmin(admin.ModelAdmin):
         ]})]
 
 
+class ImportJobAdmin(admin.ModelAdmin):
+    ''' ImportJobAdmin: class for ImportJob model in admin panel
+
+        Args:
+            ModelAdmin (class): Django model admin class
+    '''
+    list_filter = ('status', 'user')
+    list_display = ('id', 'user', 'status', 'rows_inserted', 'rows_failed',
+                    'rows_skipped', 'date_created', 'date_finished')
+    readonly_fields = ['date_created', 'date_started', 'date_updated',
+                       'date_finished', 'user']
+
+
+class ImportProfileAdmin(admin.ModelAdmin):
+    ''' ImportProfileAdmin: class for ImportProfile model in admin panel
+
+        Args:
+            ModelAdmin (class): Django model admin class
+    '''
+    list_filter = ('user',)
+    list_display = ('heading', 'user', 'date_column', 'amount_column',
+                    'vendor_column', 'category_column', 'date_created')
+    readonly_fields = ['signature', 'date_created', 'user']
+
+
+class CategoryRuleAdmin(admin.ModelAdmin):
+    ''' CategoryRuleAdmin: class for CategoryRule model in admin panel
+
+        Args:
+            ModelAdmin (class): Django model admin class
+    '''
+    list_filter = ('user',)
+    list_display = ('keywords', 'category', 'priority', 'user',
+                    'date_updated')
+    search_fields = ('keywords', 'user__email', 'category__name')
+    readonly_fields = ['date_created', 'date_updated', 'user']
+
+
+class ExpenseRollupAdmin(admin.ModelAdmin):
+    ''' ExpenseRollupAdmin: class for ExpenseRollup model in admin panel
+
+        Args:
+            ModelAdmin (class): Django model admin class
+    '''
+    list_filter = ('user', 'month')
+    list_display = ('month', 'user', 'category', 'type', 'total', 'count')
+    readonly_fields = ['user', 'category', 'month', 'type', 'total', 'count']
+
+
 admin.site.register(Expense, ExpenseAdmin)
+admin.site.register(CategoryRule, CategoryRuleAdmin)
+admin.site.register(ExpenseRollup, ExpenseRollupAdmin)
+admin.site.register(ImportJob, ImportJobAdmin)
+admin.site.register(ImportProfile, ImportProfileAdmin)
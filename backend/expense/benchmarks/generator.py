@@ -0,0 +1,75 @@
+import random
+from datetime import (date, timedelta)
+from typing import Iterator
+
+
+VENDOR_LIST = ['STARBUCKS #1234', 'AMAZON MKTPLACE', 'SHELL OIL 5744',
+               'WHOLE FOODS MKT', 'NETFLIX.COM', 'TARGET T-0921',
+               'UBER TRIP', 'CITY WATER UTIL', 'PAYROLL DIRECT DEP',
+               'CHIPOTLE ONLINE']
+TYPE_WORDS_LIST = ['debit', 'credit', 'sale', 'payment', 'posted']
+CATEGORY_LIST = ['Food and Drink', 'Shopping', 'Gas', 'Groceries',
+                 'Entertainment', 'Travel', 'Utilities', 'Income', '']
+CSV_HEADING = 'Date,Description,Amount,Type,Category\n'
+
+
+def generate_rows(count: int, seed: int = 0) -> Iterator[str]:
+    ''' generate_rows: function to generate synthetic csv rows
+            formatted like a bank export (date, vendor, amount, type)
+
+        Args:
+            count (int): number of rows to generate
+            seed (int): seed for random generator so output is repeatable
+
+        Yields:
+            str: single row of csv data
+    '''
+    generator = random.Random(seed)
+    start_date: date = date(2021, 1, 1)
+    for index in range(count):
+        spend_date: date = start_date + timedelta(days=index % 1095)
+        amount: float = generator.randint(1, 50000) / 100
+        amount_string: str = '{:.2f}'.format(amount)
+        if generator.random() < 0.8:
+            amount_string = '-' + amount_string
+        yield (spend_date.strftime('%m/%d/%Y') + ',' +
+               generator.choice(VENDOR_LIST) + ',' + amount_string + ',' +
+               generator.choice(TYPE_WORDS_LIST))
+
+
+def generate_csv(count: int, seed: int = 0) -> Iterator[str]:
+    ''' generate_csv: function to generate lines of a synthetic csv file
+            with a heading row and bank export quirks: quoted multiline
+            descriptions, parenthesized negatives, '$' prefixed amounts,
+            transaction type words and (sometimes empty) category column
+
+        Args:
+            count (int): number of rows to generate (excluding heading)
+            seed (int): seed for random generator so output is repeatable
+
+        Yields:
+            str: heading then each row of csv data ending in newline
+    '''
+    generator = random.Random(seed)
+    start_date: date = date(2021, 1, 1)
+    yield CSV_HEADING
+    for index in range(count):
+        spend_date: date = start_date + timedelta(days=index % 1095)
+        amount_string: str = '{:.2f}'.format(
+            generator.randint(1, 50000) / 100)
+        quirk: float = generator.random()
+        if quirk < 0.3:
+            amount_string = '-' + amount_string
+        elif quirk < 0.5:
+            amount_string = '(' + amount_string + ')'
+        elif quirk < 0.7:
+            amount_string = '$-' + amount_string
+        elif quirk < 0.8:
+            amount_string = '$' + amount_string
+
+        vendor: str = generator.choice(VENDOR_LIST)
+        if generator.random() < 0.2:
+            vendor = '"' + vendor + '\n  STORE ' + str(index % 97) + '"'
+        yield (spend_date.strftime('%m/%d/%Y') + ',' + vendor + ',' +
+               amount_string + ',' + generator.choice(TYPE_WORDS_LIST) +
+               ',' + generator.choice(CATEGORY_LIST) + '\n')
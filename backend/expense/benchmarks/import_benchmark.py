@@ -0,0 +1,198 @@
+import csv
+import time
+import uuid
+import tracemalloc
+from base64 import b64encode
+from datetime import (datetime, timezone)
+from typing import Callable
+from django.db import transaction
+from login.models.user import User
+from dashboard.functions.category import CategoryResolver
+from ..functions.import_functions import (PROFILE_SAMPLE_SIZE,
+                                          get_expense_objects, split_row,
+                                          parse_cells, infer_columns,
+                                          parse_columns, get_spend_date)
+from ..functions.stream_functions import (iter_base64_chunks,
+                                          iter_text_chunks, iter_records)
+from ..functions.views_functions import create_expenses_for_import
+from .generator import generate_csv
+
+
+PHASE_LIST = ['decode', 'clean', 'split', 'classify', 'categorize',
+              'insert']
+
+
+def run_import_benchmark(count: int, seed: int = 0, insert: bool = True,
+                         memory: bool = True,
+                         classifier: bool = False) -> dict:
+    ''' run_import_benchmark: function to time each phase of importing
+            a synthetic csv file, then repeat the pipeline with tracemalloc
+            to measure peak memory of each phase (kept separate so tracing
+            overhead does not skew timings)
+
+        Args:
+            count (int): number of rows in synthetic csv file
+            seed (int): seed for random generator so file is repeatable
+            insert (bool): whether to run insert phase (always rolled back)
+            memory (bool): whether to measure peak memory of each phase
+            classifier (bool): whether to classify each cell of every row
+                instead of parsing positionally by inferred column roles
+
+        Returns:
+            result (dict): rows, bytes, row counts and total seconds, with
+                seconds, rows per second and peak memory bytes per phase
+    '''
+    text: str = ''.join(generate_csv(count, seed))
+    data: str = 'data:text/csv;base64,' + b64encode(text.encode()).decode()
+    del text
+
+    seconds: dict = {}
+    counts: dict = run_pipeline(data, insert, classifier,
+                                get_time_measure(seconds))
+    peaks: dict = {}
+    if memory:
+        tracemalloc.start()
+        try:
+            run_pipeline(data, insert, classifier,
+                         get_memory_measure(peaks))
+        finally:
+            tracemalloc.stop()
+
+    phases: dict = {}
+    for name in PHASE_LIST:
+        if name not in seconds:
+            continue
+        phases[name] = {
+            'seconds': round(seconds[name], 6),
+            'rows_per_sec': round(count / max(seconds[name], 0.000001), 2),
+            'peak_memory': peaks.get(name)}
+    total: float = sum(seconds.values())
+    return {'rows': count, 'bytes': len(data), 'classifier': classifier,
+            'counts': counts,
+            'seconds': round(total, 6),
+            'rows_per_sec': round(count / max(total, 0.000001), 2),
+            'peak_memory': max(peaks.values()) if memory else None,
+            'phases': phases}
+
+
+def run_pipeline(data: str, insert: bool, classifier: bool,
+                 measure: Callable) -> dict:
+    ''' run_pipeline: function to run each import phase to completion
+            before the next, so each can be measured on its own, within
+            a transaction rolled back once finished
+
+        Args:
+            data (str): base64 data url string of expense file data
+            insert (bool): whether to run insert phase
+            classifier (bool): whether to classify each cell of every row
+            measure (Callable): function called with phase name and
+                function running phase, returning its result
+
+        Returns:
+            counts (dict): number of records, parsed rows and inserted,
+                failed and skipped expenses
+    '''
+    get_spend_date.cache_clear()
+    chunks: list = measure('decode', lambda: list(
+        iter_text_chunks(iter_base64_chunks(data))))
+    records: list = measure('clean', lambda: list(iter_records(chunks)))
+    if classifier:
+        cells: list = measure('split', lambda: [
+            split_row(record) for record in records[1:]])
+        parsed_rows: list = measure('classify', lambda: list(
+            filter(None, map(parse_cells, cells))))
+    else:
+        cells: list = measure('split', lambda: list(csv.reader(records)))
+        parsed_rows: list = measure('classify',
+                                    lambda: parse_by_columns(cells))
+    counts: dict = {'records': len(records) - 1, 'parsed': len(parsed_rows),
+                    'inserted': 0, 'failed': 0, 'skipped': 0}
+
+    def after_insert(created: int, failed: int, skipped: int) -> None:
+        counts['inserted'] += created
+        counts['failed'] += failed
+        counts['skipped'] += skipped
+
+    with transaction.atomic():
+        userId: str = str(create_benchmark_user().id)
+        resolver = CategoryResolver(userId)
+        expenses: list = measure('categorize', lambda: list(
+            get_expense_objects(parsed_rows, userId, resolver)))
+        if insert:
+            measure('insert', lambda: create_expenses_for_import(
+                expenses, after_insert=after_insert))
+        transaction.set_rollback(True)
+    return counts
+
+
+def parse_by_columns(cells: list) -> list:
+    ''' parse_by_columns: function to infer column roles from heading and
+            sample rows then parse every row positionally
+
+        Args:
+            cells (list): lists of cell strings for heading and each row
+
+        Returns:
+            list: list containing values returned by parse_columns for
+                each valid row
+    '''
+    columns: list | None = infer_columns(cells[0],
+                                         cells[1:PROFILE_SAMPLE_SIZE + 1])
+    if columns is None:
+        return []
+    return [values for values in (parse_columns(row, columns)
+                                  for row in cells[1:]) if values]
+
+
+def get_time_measure(results: dict) -> Callable:
+    ''' get_time_measure: function to get measure function recording
+            seconds taken by each phase
+
+        Args:
+            results (dict): dictionary to store seconds by phase name
+
+        Returns:
+            measure (Callable): function running and timing a phase
+    '''
+    def measure(name: str, func: Callable):
+        start: float = time.perf_counter()
+        value = func()
+        results[name] = time.perf_counter() - start
+        return value
+    return measure
+
+
+def get_memory_measure(results: dict) -> Callable:
+    ''' get_memory_measure: function to get measure function recording
+            peak memory allocated by each phase (tracemalloc must be
+            started)
+
+        Args:
+            results (dict): dictionary to store peak bytes by phase name
+
+        Returns:
+            measure (Callable): function running and tracing a phase
+    '''
+    def measure(name: str, func: Callable):
+        tracemalloc.reset_peak()
+        current: int = tracemalloc.get_traced_memory()[0]
+        value = func()
+        results[name] = tracemalloc.get_traced_memory()[1] - current
+        return value
+    return measure
+
+
+def create_benchmark_user() -> User:
+    ''' create_benchmark_user: function to create temporary User instance
+            owning benchmark categories and expenses (must be called
+            within a transaction that is rolled back)
+
+        Returns:
+            user (User): new instance of User class
+    '''
+    now: datetime = datetime.now(tz=timezone.utc).replace(microsecond=0)
+    name: str = 'bench' + uuid.uuid4().hex[:12]
+    return User.objects.create(
+        email=name + '@example.com', username=name,
+        first_name='Benchmark', last_name='User', email_verified=True,
+        password='benchmark-password', date_created=now, last_login=now)
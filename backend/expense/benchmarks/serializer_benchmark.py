@@ -0,0 +1,139 @@
+import random
+import time
+from datetime import (datetime, timedelta, timezone)
+from decimal import Decimal
+from typing import Callable
+from django.db import (connection, transaction)
+from django.db.models import QuerySet
+from rest_framework.renderers import JSONRenderer
+from dashboard.models.category import Category
+from dashboard.serializers.category import (CategorySerializer,
+                                            CategoryReadSerializer)
+from ..models import Expense
+from ..serializers import (ExpenseSerializer, ExpenseReadSerializer)
+from .generator import (CATEGORY_LIST, VENDOR_LIST)
+from .import_benchmark import create_benchmark_user
+
+
+SERIALIZER_LIST = ['model', 'read']
+
+
+def run_serializer_benchmark(count: int, seed: int = 0) -> dict:
+    ''' run_serializer_benchmark: function to time reading and rendering
+            Expense and Category rows as JSON with model serializers
+            against values() based read serializers, within a transaction
+            rolled back once finished
+
+        Args:
+            count (int): number of Expense and Category rows created
+            seed (int): seed for random generator so rows are repeatable
+
+        Returns:
+            result (dict): rows with seconds, rows per second, number of
+                queries and whether output matched, by model and
+                serializer
+    '''
+    result: dict = {'rows': count}
+    with transaction.atomic():
+        user_id: str = str(create_benchmark_user().id)
+        create_benchmark_rows(user_id, count, seed)
+        expenses: QuerySet[Expense] = Expense.objects.filter(
+            user=user_id).order_by('spend_date')
+        result['expense'] = compare_serializers(
+            count,
+            lambda: ExpenseSerializer(expenses.all(), many=True).data,
+            lambda: ExpenseReadSerializer(
+                ExpenseReadSerializer.get_values(expenses.all()),
+                many=True).data)
+        categories: QuerySet[Category] = Category.objects.filter(
+            user=user_id).order_by('name')
+        result['category'] = compare_serializers(
+            categories.count(),
+            lambda: CategorySerializer(categories.all(), many=True).data,
+            lambda: CategoryReadSerializer(
+                CategoryReadSerializer.get_values(categories.all()),
+                many=True).data)
+        transaction.set_rollback(True)
+    return result
+
+
+def compare_serializers(count: int, model: Callable, read: Callable) -> dict:
+    ''' compare_serializers: function to time functions serializing the
+            same queryset, each rendered as JSON
+
+        Args:
+            count (int): number of rows serialized
+            model (Callable): function returning model serializer data
+            read (Callable): function returning read serializer data
+
+        Returns:
+            results (dict): seconds, rows per second and number of queries
+                by serializer, and whether JSON output matched
+    '''
+    results: dict = {}
+    outputs: list = []
+    for [name, func] in zip(SERIALIZER_LIST, [model, read]):
+        queries: list = []
+        start: float = time.perf_counter()
+        with connection.execute_wrapper(get_query_counter(queries)):
+            outputs.append(JSONRenderer().render(func()))
+        seconds: float = time.perf_counter() - start
+        results[name] = {
+            'seconds': round(seconds, 6),
+            'rows_per_sec': round(count / max(seconds, 0.000001), 2),
+            'queries': len(queries)}
+    results['identical'] = outputs[0] == outputs[1]
+    return results
+
+
+def get_query_counter(queries: list) -> Callable:
+    ''' get_query_counter: function to get database execute wrapper
+            recording each query run
+
+        Args:
+            queries (list): list to append each query string to
+
+        Returns:
+            wrapper (Callable): execute wrapper function
+    '''
+    def wrapper(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+    return wrapper
+
+
+def create_benchmark_rows(user_id: str, count: int, seed: int) -> None:
+    ''' create_benchmark_rows: function to create synthetic Category and
+            Expense instances of benchmark user (some expenses without
+            category, all dates without microseconds)
+
+        Args:
+            user_id (str): id of benchmark User instance
+            count (int): number of Expense and extra Category instances
+            seed (int): seed for random generator so rows are repeatable
+    '''
+    generator = random.Random(seed)
+    now: datetime = datetime.now(tz=timezone.utc).replace(microsecond=0)
+    names: list = [name for name in CATEGORY_LIST if name != '']
+    categories: list = Category.objects.bulk_create(
+        [Category(user_id=user_id, name=name, display_color='#FFFFFF',
+                  type=1, budget=Decimal(generator.randint(0, 100000)),
+                  date_created=now) for name in names +
+         ['Category ' + str(index) for index in range(count)]],
+        batch_size=1000)
+    # Expenses use named categories or none
+    categories = categories[:len(names)] + [None]
+
+    start: datetime = datetime(2021, 1, 1, tzinfo=timezone.utc)
+    expenses: list = []
+    for index in range(count):
+        expenses.append(Expense(
+            user_id=user_id, category=generator.choice(categories),
+            vendor=generator.choice(VENDOR_LIST), description='',
+            amount=Decimal(generator.randint(1, 50000)) / 100, type=1,
+            spend_date=start + timedelta(hours=index % 26280),
+            date_created=now))
+        if len(expenses) >= 1000:
+            Expense.objects.bulk_create(expenses)
+            expenses = []
+    Expense.objects.bulk_create(expenses)
@@ -0,0 +1,206 @@
+import re
+import threading
+import unicodedata
+import uuid
+from collections import OrderedDict
+from django.conf import settings
+from django.db.models import (Count, QuerySet)
+from ..models import Expense
+from .sync_functions import get_change_seq
+
+
+# Words of bank export vendors that do not name the vendor (payment
+# method, terminal and card words)
+VENDOR_NOISE_WORDS = frozenset([
+    'pos', 'purchase', 'debit', 'credit', 'card', 'checkcard', 'visa',
+    'mastercard', 'recurring', 'payment', 'ach', 'withdrawal', 'store',
+    'ref', 'pending', 'authorized', 'on', 'www', 'com', 'inc', 'llc'])
+
+# Payment processor prefixes of vendors (ex: 'SQ *COFFEE SHOP')
+VENDOR_PREFIX_WORDS = frozenset(['sq', 'tst', 'sp', 'pp', 'paypal'])
+
+VENDOR_WORD_PATTERN = re.compile(r'[^\W_]+')
+CARD_MASK_PATTERN = re.compile(r'^x+$')
+# Words with this many digits are store, card or reference numbers
+# (shorter numbers may name vendor, ex: '7-Eleven')
+NUMBER_MIN_DIGITS = 3
+
+# Words of normalized vendor indexed (depth of trie)
+VENDOR_MAX_WORDS = 4
+# Share of expenses of vendor prefix a category needs to be assigned
+CATEGORY_MIN_SHARE = 0.6
+
+# Trained categorizers by user id, least recently used first
+categorizers: OrderedDict = OrderedDict()
+
+categorizers_lock = threading.Lock()
+
+
+def normalize_vendor(vendor: str) -> list:
+    ''' normalize_vendor: function to get words naming vendor of bank
+            export vendor string, lowercased without accents and without
+            store numbers, card suffixes, payment words or processor
+            prefixes (ex: 'SQ *COFFEE SHOP #123 XXXX4521' to ['coffee',
+            'shop'])
+
+        Args:
+            vendor (str): vendor of expense
+
+        Returns:
+            list: list of at most VENDOR_MAX_WORDS words (all words
+                except numbers if every word is a payment word)
+    '''
+    text: str = vendor.lower()
+    if not text.isascii():
+        text = ''.join(character for character in
+                       unicodedata.normalize('NFKD', text)
+                       if not unicodedata.combining(character))
+    words: list = [word for word in VENDOR_WORD_PATTERN.findall(text)
+                   if sum(character.isdigit() for character in word) <
+                   NUMBER_MIN_DIGITS and CARD_MASK_PATTERN.match(word) is None]
+    start: int = 0
+    while start < len(words) - 1 and words[start] in VENDOR_PREFIX_WORDS:
+        start += 1
+    names: list = [word for word in words[start:]
+                   if word not in VENDOR_NOISE_WORDS]
+    if len(names) == 0:
+        names = words
+    return names[:VENDOR_MAX_WORDS]
+
+
+class VendorCategorizer:
+    ''' VendorCategorizer: class to assign categories to vendors of a
+            specific User instance, learned from categorized expenses in
+            a trie of normalized vendor words, each node holding the
+            category of most expenses whose vendor starts with its words
+            (None if no category has CATEGORY_MIN_SHARE of them)
+    '''
+
+    def __init__(self) -> None:
+        # Each node is a list of children by word and category counts
+        # (replaced by category id once trained)
+        self.root: list = [{}, {}]
+        self.vendors: int = 0
+        self.expenses: int = 0
+
+    def add_vendor(self, vendor: str, categoryId: str, count: int) -> None:
+        ''' add_vendor: function to count expenses of vendor in category
+                on each node of path of vendor words
+
+            Args:
+                vendor (str): vendor of expenses
+                categoryId (str): id for Category instance of expenses
+                count (int): number of expenses
+        '''
+        node: list = self.root
+        for word in normalize_vendor(vendor):
+            node = node[0].setdefault(word, [{}, {}])
+            node[1][categoryId] = node[1].get(categoryId, 0) + count
+        self.vendors += 1
+        self.expenses += count
+
+    def set_categories(self) -> None:
+        ''' set_categories: function to replace category counts of each
+                node by category assigned to its vendor prefix
+        '''
+        nodes: list = list(self.root[0].values())
+        while len(nodes) > 0:
+            node: list = nodes.pop()
+            counts: dict = node[1]
+            categoryId: str = max(counts, key=counts.get)
+            node[1] = (categoryId if counts[categoryId] >=
+                       CATEGORY_MIN_SHARE * sum(counts.values()) else None)
+            nodes.extend(node[0].values())
+        self.root[1] = None
+
+    def get_category_id(self, vendor: str) -> str | None:
+        ''' get_category_id: function to get category of longest prefix
+                of vendor words with a category assigned, in time linear
+                in length of vendor
+
+            Args:
+                vendor (str): vendor of expense
+
+            Returns:
+                categoryId (str): id for Category instance or None if
+                    vendor has no category learned
+        '''
+        categoryId: str | None = None
+        node: list = self.root
+        for word in normalize_vendor(vendor):
+            node = node[0].get(word)
+            if node is None:
+                break
+            if node[1] is not None:
+                categoryId = node[1]
+        return categoryId
+
+
+def train_categorizer(userId: str) -> VendorCategorizer:
+    ''' train_categorizer: function to train categorizer of User instance
+            from its categorized expenses and keep it for current change
+            sequence number of user
+
+        Args:
+            userId (str): id for User instance
+
+        Returns:
+            VendorCategorizer: trained categorizer
+    '''
+    version: int = get_change_seq(userId)
+    categorizer = VendorCategorizer()
+    rows: QuerySet = Expense.objects.filter(
+        user=userId, category__isnull=False).values_list(
+        'vendor', 'category').annotate(count=Count('id')).order_by()
+    for [vendor, categoryId, count] in rows.iterator(
+            chunk_size=settings.STREAMING_CHUNK_SIZE):
+        categorizer.add_vendor(vendor, str(categoryId), count)
+    categorizer.set_categories()
+
+    with categorizers_lock:
+        categorizers[str(userId)] = [version, categorizer]
+        categorizers.move_to_end(str(userId))
+        while len(categorizers) > settings.CATEGORIZER_MAX_USERS:
+            categorizers.popitem(last=False)
+    return categorizer
+
+
+def get_user_categorizer(userId: str) -> VendorCategorizer:
+    ''' get_user_categorizer: function to get trained categorizer of User
+            instance, trained again if expenses or categories of user
+            were written since by any process (every write increases
+            change sequence number of user)
+
+        Args:
+            userId (str): id for User instance
+
+        Returns:
+            VendorCategorizer: trained categorizer
+    '''
+    version: int = get_change_seq(userId)
+    with categorizers_lock:
+        entry: list | None = categorizers.get(str(userId))
+        if entry is not None and entry[0] == version:
+            categorizers.move_to_end(str(userId))
+            return entry[1]
+    return train_categorizer(userId)
+
+
+def get_vendor_category_id(userId: str, vendor) -> str | None:
+    ''' get_vendor_category_id: function to get category learned for
+            vendor of new expense of User instance
+
+        Args:
+            userId (str): id for User instance
+            vendor (str): vendor of expense
+
+        Returns:
+            categoryId (str): id for Category instance or None
+    '''
+    if not isinstance(vendor, str) or not vendor:
+        return None
+    try:
+        userId = str(uuid.UUID(str(userId)))
+    except ValueError:
+        return None
+    return get_user_categorizer(userId).get_category_id(vendor)
@@ -0,0 +1,81 @@
+from decimal import Decimal
+from typing import Iterator
+from django.conf import settings
+from django.db.models import (F, QuerySet)
+from django.utils import timezone
+from ..models import Expense
+
+
+# Columns of exported CSV, as written by frontend createCSV (each line
+# ends with a comma, so an empty last column is kept)
+EXPORT_HEADING = ['Date', 'Vendor', 'Amount', 'Type', 'Category', '']
+
+# Names of expense types by type value (ExpenseType of frontend)
+EXPENSE_TYPE_NAMES = ['Deposit', 'Withdrawal']
+
+EXPORT_UNCATEGORIZED = 'Uncategorized'
+
+
+def iter_export_rows(queryset: QuerySet[Expense],
+                     chunk_size: int | None = None) -> Iterator[list]:
+    ''' iter_export_rows: function to yield CSV heading then a row for each
+            Expense instance of queryset, reading only exported columns
+            (and category name in same query) in chunks
+
+        Args:
+            queryset (QuerySet): queryset of Expense instances
+            chunk_size (int): number of rows read from database per chunk
+                (defaults to STREAMING_CHUNK_SIZE)
+
+        Returns:
+            Iterator[list]: iterator of CSV row lists
+    '''
+    if chunk_size is None:
+        chunk_size = settings.STREAMING_CHUNK_SIZE
+    yield EXPORT_HEADING
+    rows: QuerySet = queryset.values_list(
+        'spend_date', 'vendor', 'amount', 'type', F('category__name'))
+    for row in rows.iterator(chunk_size=chunk_size):
+        yield get_export_row(*row)
+
+
+def get_export_row(spend_date, vendor: str, amount: Decimal, type: int,
+                   category_name: str | None) -> list:
+    ''' get_export_row: function to get CSV row of expense columns, with
+            date, signed amount, type name and category formatted as
+            frontend createCSV
+
+        Args:
+            spend_date (datetime): spend date of expense
+            vendor (str): vendor of expense
+            amount (Decimal): amount of expense
+            type (int): type of expense (0 deposit, 1 withdrawal)
+            category_name (str): name of category (None if uncategorized)
+
+        Returns:
+            list: list of CSV column strings
+    '''
+    return [timezone.localtime(spend_date).date().isoformat(), vendor,
+            format_export_amount(amount, type),
+            EXPENSE_TYPE_NAMES[type] if 0 <= type < 2 else str(type),
+            category_name or EXPORT_UNCATEGORIZED, '']
+
+
+def format_export_amount(amount: Decimal, type: int) -> str:
+    ''' format_export_amount: function to format amount as number string
+            without trailing zeros, negative for withdrawals (as
+            amount.toString() of frontend)
+
+        Args:
+            amount (Decimal): amount of expense
+            type (int): type of expense (0 deposit, 1 withdrawal)
+
+        Returns:
+            str: signed amount string
+    '''
+    value: Decimal = Decimal(amount).normalize()
+    if type != 0:
+        value = -value
+    if value == 0:
+        return '0'
+    return '{:f}'.format(value)
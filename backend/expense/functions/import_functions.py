@@ -1,9 +1,19 @@
+import csv
 import re
-from base64 import b64decode
 from datetime import (datetime, timezone)
+from functools import lru_cache
+from hashlib import sha256
+from itertools import (chain, islice)
+from typing import Iterable, Iterator
 from rest_framework import status
-from dashboard.functions.category import get_category_id
+from dashboard.functions.category import CategoryResolver
+from ..models import ImportProfile
 from .views_functions import create_expenses_for_import
+from .categorizer_functions import (VendorCategorizer,
+                                    get_user_categorizer)
+from .rule_functions import (RuleMatcher, get_user_rules)
+from .stream_functions import (iter_base64_chunks, iter_text_chunks,
+                               iter_records)
 from ..utils.responses import (parse_csv_success,
                                parse_csv_failed)
 
@@ -11,7 +21,6 @@ from ..utils.responses import (parse_csv_success,
 DATE_REGEX = r"^(0[1-9]|1[0-2])[/](0[1-9]|[12]\d|3[01])[/](19\d\d|20\d\d)$"
 AMOUNT_STRING_REGEX = r"^[($-]*[0-9]+([.][0-9]{1,2})?[)]?$"
 AMOUNT_FLOAT_REGEX = r"[0-9]+[.]?[0-9]{1,2}"
-QUOTED_STRING_REGEX = r'"[^"]*(?:""[^"]*)*"'
 SKIP_WORDS_LIST = ['deposit', 'debit', 'credit', 'withdrawal',
                    'sale', 'return', 'adjustment', 'payment', 'transfer',
                    'income', 'reward', 'rewards', 'cash', 'dividend',
@@ -19,10 +28,26 @@ SKIP_WORDS_LIST = ['deposit', 'debit', 'credit', 'withdrawal',
                    'pending', 'interest', 'refund', 'refunded', 'dispute',
                    'disputed', 'adjust', 'fee']
 
+DATE_PATTERN = re.compile(DATE_REGEX)
+AMOUNT_STRING_PATTERN = re.compile(AMOUNT_STRING_REGEX)
+AMOUNT_FLOAT_PATTERN = re.compile(AMOUNT_FLOAT_REGEX)
+MULTIPLE_SPACES_PATTERN = re.compile(' +')
+SKIP_WORDS = frozenset(word.lower() for word in SKIP_WORDS_LIST)
 
-def decode_data_file(data: str, has_heading: bool, userId: str) -> None:
-    ''' decode_data_file: function to decode base64 string of imported
-            expense file data then create new Expense instances
+# Number of rows following heading used to infer column roles
+PROFILE_SAMPLE_SIZE = 50
+# Fraction of sample rows a column must match to be given a role
+DATE_COLUMN_RATIO = 0.9
+AMOUNT_COLUMN_RATIO = 0.9
+TEXT_COLUMN_RATIO = 0.5
+VENDOR_HEADING_LIST = ['description', 'vendor', 'payee', 'merchant',
+                       'name']
+
+
+def decode_data_file(data: str, has_heading: bool, userId: str) -> list:
+    ''' decode_data_file: function to incrementally decode base64 string of
+            imported expense file data then create new Expense instances
+            as rows are parsed
 
         Args:
             data (str): base64 string of expense file data to be imported
@@ -35,128 +60,457 @@ def decode_data_file(data: str, has_heading: bool, userId: str) -> None:
                 Http status code
     '''
     try:
-        decoded_data: str = b64decode(data.split(',')[1]).decode('utf-8')
-
-        # Remove extra whitespace within string
-        decoded_data = re.sub(' +', ' ', decoded_data)
-
-        # Remove newline character with multiline string
-        decoded_data = re.sub(QUOTED_STRING_REGEX,
-                              lambda match: match.group(0).replace("\n", " "),
-                              decoded_data)
-
-        split_decoded: list = decoded_data.split('\n')
-        length_split: int = len(split_decoded)
-    except Exception:
+        records: Iterator[str] = iter_records(
+            iter_text_chunks(iter_base64_chunks(data)))
+        columns: list | None
+        [records, columns] = get_import_columns(records, has_heading, userId)
+
+        resolver = CategoryResolver(userId)
+        new_expenses: Iterator[dict] = parse_data(records, userId, resolver,
+                                                  columns)
+        response = create_expenses_for_import(
+            new_expenses, before_insert=resolver.create_pending)
+    except (AttributeError, ValueError):
         return [parse_csv_failed, status.HTTP_400_BAD_REQUEST]
 
-    if has_heading:
-        body: list = split_decoded[1:length_split]
-    else:
-        body: list = split_decoded
-
-    if len(body) == 0:
-        return [parse_csv_failed, status.HTTP_400_BAD_REQUEST]
-
-    new_expenses: list = parse_data(body, userId)
-    if len(new_expenses) == 0:
-        return [parse_csv_failed, status.HTTP_400_BAD_REQUEST]
-
-    response = create_expenses_for_import(new_expenses)
     if response[1] != 200:
         return [parse_csv_failed, status.HTTP_400_BAD_REQUEST]
     return [parse_csv_success, status.HTTP_200_OK]
 
 
-def parse_data(body: list, userId: str) -> list:
+def parse_data(body: Iterable[str], userId: str,
+               resolver: CategoryResolver | None = None,
+               columns: list | None = None,
+               categorizer: VendorCategorizer | None = None,
+               rules: RuleMatcher | None = None) -> Iterator[dict]:
     ''' parse_data: function to parse data extracting values
-            to create new Expense objests
+            to create new Expense objests, new categories being bulk
+            created once body is fully parsed, rows matching a category
+            rule given its category and other rows without category
+            given category learned for their vendor
 
         Args:
-            body (list): list of strings containing row data from
+            body (Iterable[str]): strings containing row data from
                 csv file body (stripped of heading row)
             userId (str): id for associated User instance
+            resolver (CategoryResolver): resolver for category names
+                shared across the whole import
+            columns (list): date, amount, vendor and category column
+                indexes to parse rows positionally, or None to classify
+                each cell of every row
+            categorizer (VendorCategorizer): categorizer of vendors
+                (defaults to trained categorizer of user)
+            rules (RuleMatcher): compiled category rules (defaults to
+                rules of user)
+
+        Yields:
+            dict: Expense type object for each valid row
+    '''
+    parsed_rows: Iterator[list] = filter(None, parse_rows(body, columns))
+    yield from get_expense_objects(parsed_rows, userId, resolver,
+                                   categorizer, rules)
+
+
+def parse_rows(body: Iterable[str],
+               columns: list | None = None) -> Iterator[list | None]:
+    ''' parse_rows: function to extract expense values from rows of
+            csv data, either positionally using column indexes or by
+            classifying each cell
+
+        Args:
+            body (Iterable[str]): strings containing row data from
+                csv file body (stripped of heading row)
+            columns (list): date, amount, vendor and category column
+                indexes, or None to classify each cell
 
         Returns:
-            list: list containing Expense type objects
+            Iterator: values returned by parse_columns or parse_row
+                for each row
     '''
-    new_expenses: list = []
-    for row in body:
-        row: str
-        # Remove quotes and carriage characters, split string into list
-        split_row: list = row.replace('"', '').replace("'", '').replace(
-            '\r', '').split(',')
-
-        # Remove empty cells in row
-        prune_row: list = list(filter(None, split_row))
-        if len(prune_row) == 0:
-            continue
+    if columns is None:
+        return map(parse_row, body)
+    return (parse_columns(cells, columns) for cells in csv.reader(body))
 
-        # Find date then convert to datetime
-        spend_date: datetime
-        [spend_date, prune_row] = find_date_string(prune_row)
 
-        # Find amount then covert to float and get type value
-        amount: float
-        type: int
-        [amount, type, prune_row] = find_amount_string(prune_row)
-        if len(str(amount)) == 0:
-            continue
+def get_import_columns(records: Iterator[str], has_heading: bool,
+                       userId: str) -> list:
+    ''' get_import_columns: function to get column roles of import
+            file from ImportProfile instance matching its heading, if they
+            still match a sample of rows, or infer them from heading and
+            sample, saving ImportProfile instance so inference runs once
+            per heading (and again once a file no longer matches it)
+
+        Args:
+            records (Iterator[str]): rows of csv data including heading
+            has_heading (bool): whether file contains a heading row
+            userId (str): id for associated User instance
+
+        Returns:
+            list: list containing iterator of rows following heading
+                (sample rows included) and list of date, amount, vendor
+                and category column indexes, or None if roles could not
+                be inferred
+    '''
+    heading: list = []
+    profile: ImportProfile | None = None
+    if has_heading:
+        heading_row: str | None = next(records, None)
+        if heading_row is None:
+            return [records, None]
+        heading = next(csv.reader([heading_row]))
+        signature: str = get_heading_signature(heading)
+        profile = ImportProfile.objects.filter(
+            user=userId, signature=signature).first()
+
+    sample: list = list(islice(records, PROFILE_SAMPLE_SIZE))
+    records = chain(sample, records)
+    sample_cells: list = [cells for cells in csv.reader(sample) if any(cells)]
+    if profile is not None and match_columns(profile.get_columns(),
+                                             sample_cells):
+        return [records, profile.get_columns()]
+    columns: list | None = infer_columns(heading, sample_cells)
+    if columns is None or not has_heading:
+        return [records, columns]
+
+    # Profile replaced if inferred wrongly or bank changed column order
+    [date_column, amount_column, vendor_column, category_column] = columns
+    ImportProfile.objects.update_or_create(
+        user_id=userId, signature=signature,
+        defaults={'heading': ','.join(heading)[:500],
+                  'date_column': date_column, 'amount_column': amount_column,
+                  'vendor_column': vendor_column,
+                  'category_column': category_column,
+                  'date_created': datetime.now(tz=timezone.utc).replace(
+                      microsecond=0)})
+    return [records, columns]
+
+
+def get_heading_signature(heading: list) -> str:
+    ''' get_heading_signature: function to hash heading cells ignoring
+            case and surrounding whitespace
+
+        Args:
+            heading (list): list of strings for heading row
+
+        Returns:
+            signature (str): sha256 hex digest of heading cells
+    '''
+    cells: list = [cell.strip().lower() for cell in heading]
+    return sha256('\x1f'.join(cells).encode()).hexdigest()
+
+
+def infer_columns(heading: list, sample: list) -> list | None:
+    ''' infer_columns: function to infer column roles from the share of
+            sample cells in each column matching dates, amounts and text,
+            using heading names to choose between matching columns
+
+        Args:
+            heading (list): list of strings for heading row (empty if
+                file has no heading)
+            sample (list): lists of cell strings for sample rows
 
-        # Find vendor and category strings then trim length
-        vendor: str
-        category: str
-        [vendor, category] = find_vendor_category(prune_row)
-        if len(vendor) == 0:
+        Returns:
+            list: list containing date, amount and vendor column indexes
+                and category column index or None, or None if no single
+                date, amount and vendor column found
+    '''
+    if len(sample) == 0:
+        return None
+    width: int = max(len(cells) for cells in sample)
+    counts: list = get_column_counts(sample)
+
+    names: list = [name.strip().lower() for name in heading]
+    names += [''] * (width - len(names))
+
+    def find_column(kind: int, ratio: float, words: list,
+                    used: list) -> int | None:
+        indexes: list = [index for index in range(width)
+                         if index not in used and
+                         counts[index][kind] >= ratio * len(sample)]
+        for index in indexes:
+            if any(word in names[index] for word in words):
+                return index
+        return indexes[0] if len(indexes) > 0 else None
+
+    date_column: int | None = find_column(0, DATE_COLUMN_RATIO, ['date'],
+                                          [])
+    amount_column: int | None = find_column(1, AMOUNT_COLUMN_RATIO,
+                                            ['amount'], [date_column])
+    vendor_column: int | None = find_column(
+        2, TEXT_COLUMN_RATIO, VENDOR_HEADING_LIST,
+        [date_column, amount_column])
+    if date_column is None or amount_column is None or vendor_column is None:
+        return None
+
+    # Category is named column, or last text column like parse_row
+    used: list = [date_column, amount_column, vendor_column]
+    category_column: int | None = None
+    for index in range(width):
+        if index in used:
             continue
+        if 'category' in names[index]:
+            category_column = index
+            break
+        if counts[index][2] >= TEXT_COLUMN_RATIO * len(sample):
+            category_column = index
+    return [date_column, amount_column, vendor_column, category_column]
 
-        # Check for existing category by name or create new
-        categoryId: str | None = None
-        if len(category) > 0:
-            categoryId = get_category_id(category, userId)
+
+def get_column_counts(sample: list) -> list:
+    ''' get_column_counts: function to count sample cells of each column
+            matching dates, amounts and text
+
+        Args:
+            sample (list): lists of cell strings for sample rows
+
+        Returns:
+            list: list containing [date, amount, text] counts for each
+                column of widest row
+    '''
+    width: int = max((len(cells) for cells in sample), default=0)
+    counts: list = [[0, 0, 0] for _ in range(width)]
+    for cells in sample:
+        for index, cell in enumerate(cells):
+            cell = cell.strip()
+            if DATE_PATTERN.match(cell) is not None:
+                counts[index][0] += 1
+            elif AMOUNT_STRING_PATTERN.match(cell) is not None:
+                counts[index][1] += 1
+            elif len(cell) >= 2 and cell.lower() not in SKIP_WORDS:
+                counts[index][2] += 1
+    return counts
+
+
+def match_columns(columns: list, sample: list) -> bool:
+    ''' match_columns: function to check column roles of stored
+            ImportProfile instance against sample rows of a new file, with
+            the ratios infer_columns requires
+
+        Args:
+            columns (list): date, amount, vendor and category column
+                indexes (category index may be None)
+            sample (list): lists of cell strings for sample rows
+
+        Returns:
+            bool: True if date, amount and vendor columns still match
+                (or no sample rows)
+    '''
+    if len(sample) == 0:
+        return True
+    counts: list = get_column_counts(sample)
+    [date_column, amount_column, vendor_column] = columns[:3]
+    for [index, kind, ratio] in [[date_column, 0, DATE_COLUMN_RATIO],
+                                 [amount_column, 1, AMOUNT_COLUMN_RATIO],
+                                 [vendor_column, 2, TEXT_COLUMN_RATIO]]:
+        if index >= len(counts) or counts[index][kind] < ratio * len(sample):
+            return False
+    return True
+
+
+def parse_columns(cells: list, columns: list) -> list | None:
+    ''' parse_columns: function to extract expense values from cells
+            of single row of csv data using column indexes
+
+        Args:
+            cells (list): list of strings for single row of data
+                from csv file
+            columns (list): date, amount, vendor and category column
+                indexes (category index may be None)
+
+        Returns:
+            list: list containing spend_date as datetime (or empty string
+                if no date found), amount as float, type as int, vendor
+                and category as strings, or None if row has no amount
+                or vendor
+    '''
+    [date_column, amount_column, vendor_column, category_column] = columns
+    if len(cells) <= max(date_column, amount_column, vendor_column):
+        return None
+
+    amount_string: str = cells[amount_column].strip()
+    if AMOUNT_STRING_PATTERN.match(amount_string) is None:
+        return None
+    amount: float
+    type: int
+    [amount, type] = get_amount_type(amount_string)
+    if len(str(amount)) == 0:
+        return None
+
+    # Remove quotes like split_row so vendor matches classified rows
+    vendor: str = get_trimmed_vendor(
+        cells[vendor_column].replace("'", '').strip())
+    if len(vendor) == 0:
+        return None
+
+    date_string: str = cells[date_column].strip()
+    spend_date: datetime | str = ''
+    if DATE_PATTERN.match(date_string) is not None:
+        spend_date = get_spend_date(date_string)
+
+    category: str = ''
+    if category_column is not None and category_column < len(cells):
+        category = get_trimmed_category(
+            cells[category_column].replace("'", '').strip())
+    return [spend_date, amount, type, vendor, category]
+
+
+def parse_row(row: str) -> list | None:
+    ''' parse_row: function to extract expense values from single
+            row of csv data
+
+        Args:
+            row (str): single row of csv data
+
+        Returns:
+            list: list containing spend_date as datetime (or empty string
+                if no date found), amount as float, type as int, vendor
+                and category as strings, or None if row has no amount
+                or vendor
+    '''
+    return parse_cells(split_row(row))
+
+
+def split_row(row: str) -> list:
+    ''' split_row: function to remove quotes and carriage characters
+            from single row of csv data then split it into cells
+
+        Args:
+            row (str): single row of csv data
+
+        Returns:
+            list: list of strings for each cell in row
+    '''
+    return row.replace('"', '').replace("'", '').replace(
+        '\r', '').split(',')
+
+
+def parse_cells(cells: list) -> list | None:
+    ''' parse_cells: function to extract expense values from cells
+            of single row of csv data
+
+        Args:
+            cells (list): list of strings for single row of data
+                from csv file
+
+        Returns:
+            list: list containing spend_date as datetime (or empty string
+                if no date found), amount as float, type as int, vendor
+                and category as strings, or None if row has no amount
+                or vendor
+    '''
+    # Label each cell once as date, amount or text
+    date_string: str | None
+    amount_string: str | None
+    text_list: list
+    [date_string, amount_string, text_list] = classify_cells(cells)
+
+    # Convert date to datetime
+    spend_date: datetime | str = ''
+    if date_string is not None:
+        spend_date = get_spend_date(date_string)
+
+    # Convert amount to float and get type value
+    if amount_string is None:
+        return None
+    amount: float
+    type: int
+    [amount, type] = get_amount_type(amount_string)
+    if len(str(amount)) == 0:
+        return None
+
+    # Find vendor and category strings then trim length
+    vendor: str
+    category: str
+    [vendor, category] = get_vendor_category(text_list)
+    if len(vendor) == 0:
+        return None
+    return [spend_date, amount, type, vendor, category]
+
+
+def get_expense_objects(parsed_rows: Iterable[list], userId: str,
+                        resolver: CategoryResolver | None = None,
+                        categorizer: VendorCategorizer | None = None,
+                        rules: RuleMatcher | None = None
+                        ) -> Iterator[dict]:
+    ''' get_expense_objects: function to create Expense type objects
+            from parsed row values, assigning category of first category
+            rule matching vendor, else resolving category names to ids or
+            assigning category learned for vendor to rows without one
+
+        Args:
+            parsed_rows (Iterable[list]): lists of values returned
+                by parse_row
+            userId (str): id for associated User instance
+            resolver (CategoryResolver): resolver for category names
+                shared across the whole import
+            categorizer (VendorCategorizer): categorizer of vendors
+                (defaults to trained categorizer of user, loaded at first
+                row without category)
+            rules (RuleMatcher): compiled category rules (defaults to
+                rules of user)
+
+        Yields:
+            dict: Expense type object for each parsed row
+    '''
+    if resolver is None:
+        resolver = CategoryResolver(userId)
+    if rules is None:
+        rules = get_user_rules(userId)
+
+    date_created: datetime = datetime.now(tz=timezone.utc).replace(
+        microsecond=0)
+    for [spend_date, amount, type, vendor, category] in parsed_rows:
+        # Check for existing category by similar name or add new
+        # Rules chosen by user take precedence over category of file
+        categoryId: str | None = rules.get_category_id(vendor)
+        if categoryId is None and len(category) > 0:
+            categoryId = resolver.get_category_id(category)
+        elif categoryId is None:
+            if categorizer is None:
+                categorizer = get_user_categorizer(userId)
+            categoryId = categorizer.get_category_id(vendor)
 
         expense: dict = {'vendor': vendor, 'amount': amount, 'type': type,
                          'spend_date': spend_date, 'user': userId,
-                         'date_created': datetime.now(tz=timezone.utc).replace(
-                             microsecond=0)}
+                         'date_created': date_created}
         if categoryId is not None:
             expense['category'] = categoryId
-        new_expenses.append(expense)
-    return new_expenses
+        yield expense
+    resolver.create_pending()
 
 
-def find_date_string(data: list) -> list:
-    ''' find_date_string: function to find date string in
-            list by matching regex of data format 'mm/dd/yyyy'
+def classify_cells(data: list) -> list:
+    ''' classify_cells: function to label each cell in a single pass as
+            date (format 'mm/dd/yyyy'), amount (currency formats ex:
+            ($000.00), $-000.00, (000.00), $000.00, 000, 000.00, .00),
+            skipped (less than 2 characters or transaction words) or text
 
         Args:
             data (list): list of strings for single row of data
                 from csv file
 
         Returns:
-            list: list containing spend_date as datetime
-                and data list after matching date strings removed
+            list: list containing first date string or None, first
+                amount string or None, and list of remaining text strings
     '''
-    match_list: list = []
-    index_list: list = []
-    for index, item in enumerate(data):
-        match = re.search(DATE_REGEX, item)
-        if match is not None:
-            match_list.append(match.group())
-            index_list.append(index)
-
-    adjust: int = 0
-    for index in index_list:
-        del data[index-adjust]
-        adjust += 1
-
-    if len(match_list) == 0:
-        return ['', data]
-    date_string: str = match_list[0]
-    spend_date: datetime = get_spend_date(date_string)
-    return [spend_date, data]
-
-
+    date_string: str | None = None
+    amount_string: str | None = None
+    text_list: list = []
+    for item in data:
+        if not item:
+            continue
+        if DATE_PATTERN.match(item) is not None:
+            if date_string is None:
+                date_string = item
+        elif AMOUNT_STRING_PATTERN.match(item) is not None:
+            if amount_string is None:
+                amount_string = item
+        elif len(item) >= 2 and item.lower() not in SKIP_WORDS:
+            text_list.append(item)
+    return [date_string, amount_string, text_list]
+
+
+@lru_cache(maxsize=4096)
 def get_spend_date(date: str) -> datetime:
     ''' get_spend_date: function to convert date
             string to datetime
@@ -173,42 +527,6 @@ def get_spend_date(date: str) -> datetime:
     return spend_date
 
 
-def find_amount_string(data: list) -> list:
-    ''' find_amount_string: function to find amount string in
-            list by matching regex of currency formats
-            ex: ($000.00), $-000.00, (000.00), $000.00,
-                000, 000.00, .00
-
-        Args:
-            data (list): list of strings for single row of data
-                from csv file
-
-        Returns:
-            list: list containing amount as float, type as int,
-                and data list after matching amount strings removed
-    '''
-    match_list: list = []
-    index_list: list = []
-    for index, item in enumerate(data):
-        match = re.search(AMOUNT_STRING_REGEX, item)
-        if match is not None:
-            match_list.append(match.group())
-            index_list.append(index)
-
-    adjust: int = 0
-    for index in index_list:
-        del data[index-adjust]
-        adjust += 1
-
-    amount: float
-    type: int
-    if len(match_list) == 0:
-        return ['', '', data]
-    amount_string: str = match_list[0]
-    [amount, type] = get_amount_type(amount_string)
-    return [amount, type, data]
-
-
 def get_amount_type(amount: str) -> list:
     ''' get_amount_type: function to convert amount
             string to float and extract type value
@@ -228,54 +546,25 @@ def get_amount_type(amount: str) -> list:
     if open_parenth != -1 or negative != -1:
         amount_type = 1  # 1=Withdrawal for negative number
 
-    amount_list = re.findall(AMOUNT_FLOAT_REGEX, amount)
+    amount_list = AMOUNT_FLOAT_PATTERN.findall(amount)
     if len(amount_list) == 0:
         return ['', '']
     amount_num: float = float(amount_list[0])
     return [amount_num, amount_type]
 
 
-def find_vendor_category(data: list) -> list:
-    ''' find_vendor_category: function to find vendor and
-            category strings in list by matching regex
+def get_vendor_category(data: list) -> list:
+    ''' get_vendor_category: function to get vendor and category
+            strings from text cells of a row, vendor being the first
+            and category the last
 
         Args:
-            data (list): list of strings for single row of data
+            data (list): list of text strings for single row of data
                 from csv file
 
         Returns:
             list: list containing vendor and category as strings
     '''
-    regex_list: list = [DATE_REGEX, AMOUNT_STRING_REGEX]
-    index_list: list = []
-    for index, item in enumerate(data):
-        # Remove strings less than 2 characters
-        if len(item) < 2:
-            index_list.append(index)
-            continue
-
-        # Remove strings matching transaction words
-        deleted: bool = False
-        for word in SKIP_WORDS_LIST:
-            if item.lower() == word.lower():
-                deleted = True
-                index_list.append(index)
-                break
-        if deleted:
-            continue
-
-        # Remove strings matching date/amount patterns
-        for pattern in regex_list:
-            match = re.search(pattern, item)
-            if match is not None:
-                index_list.append(index)
-                break
-
-    adjust: int = 0
-    for index in index_list:
-        del data[index-adjust]
-        adjust += 1
-
     count: int = len(data)
     if count == 0:
         return ['', '']
@@ -301,7 +590,7 @@ def get_trimmed_vendor(name: str) -> str:
             vendor (str): cleaned and trimmed string
     '''
     allowed_length: int = 100
-    vendor: str = re.sub(' +', ' ', name)
+    vendor: str = MULTIPLE_SPACES_PATTERN.sub(' ', name)
     if len(vendor) > allowed_length:
         vendor = vendor[0:allowed_length]
     return vendor
@@ -318,7 +607,7 @@ def get_trimmed_category(name: str) -> str:
             category (str): cleaned and trimmed string
     '''
     allowed_length: int = 50
-    category: str = re.sub(' +', ' ', name)
+    category: str = MULTIPLE_SPACES_PATTERN.sub(' ', name)
     if len(category) > allowed_length:
         category = category[0:allowed_length]
     return category
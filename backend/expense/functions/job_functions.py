@@ -0,0 +1,445 @@
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import (datetime, timedelta, timezone)
+from itertools import islice
+from typing import Iterator
+from django.conf import settings
+from django.db import (connection, transaction, DatabaseError)
+from django.db.models import (F, QuerySet)
+from rest_framework import status
+from login.models.user import User
+from login.utils.responses import no_user_found
+from dashboard.functions.category import CategoryResolver
+from ..models import ImportJob
+from ..serializers import ImportJobSerializer
+from .import_functions import (parse_data, get_import_columns)
+from .stream_functions import (iter_base64_chunks, iter_file_chunks,
+                               iter_text_chunks, iter_records)
+from .views_functions import (create_expenses_for_import,
+                              get_import_message)
+from ..utils.responses import (no_import_job_found, import_job_limit,
+                               import_job_cancelled, import_job_finished,
+                               import_job_failed, parse_csv_failed,
+                               import_csv_failed)
+
+
+executor: ThreadPoolExecutor | None = None
+executor_lock = threading.Lock()
+# Ids of import jobs submitted to worker pool of this process and not
+# yet finished
+local_jobs: set = set()
+
+
+class ImportCancelled(Exception):
+    ''' ImportCancelled: exception raised within an import job once
+            its ImportJob instance has been cancelled
+
+        Args:
+            Exception (class): Python base exception class
+    '''
+
+
+def get_executor() -> ThreadPoolExecutor:
+    ''' get_executor: function to get worker pool running import jobs,
+            creating it on first use
+
+        Returns:
+            executor (ThreadPoolExecutor): pool limited to
+                EXPENSE_IMPORT_MAX_WORKERS concurrent import jobs
+    '''
+    global executor
+    with executor_lock:
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=settings.EXPENSE_IMPORT_MAX_WORKERS,
+                thread_name_prefix='expense-import')
+        return executor
+
+
+def get_worker_name() -> str:
+    ''' get_worker_name: function to get name of this worker process
+            stored on import jobs it runs
+
+        Returns:
+            str: 'host:pid' of this process
+    '''
+    return socket.gethostname() + ':' + str(os.getpid())
+
+
+def is_worker_alive(worker: str, jobId) -> bool:
+    ''' is_worker_alive: function to check whether worker process
+            running import job may still be running it (processes on other
+            hosts cannot be checked, so their jobs resume only after
+            EXPENSE_IMPORT_JOB_TIMEOUT)
+
+        Args:
+            worker (str): 'host:pid' of worker process running job
+            jobId (UUID): id for running ImportJob instance
+
+        Returns:
+            bool: False if worker process is known to have exited or not
+                to be running job
+    '''
+    if worker == get_worker_name():
+        # Process id may be reused by this process after a restart
+        with executor_lock:
+            return jobId in local_jobs
+    [host, _, pid] = worker.rpartition(':')
+    # os.kill terminates processes on Windows rather than checking them
+    if host != socket.gethostname() or not pid.isdigit() or os.name == 'nt':
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def submit_import_job(jobId) -> None:
+    ''' submit_import_job: function to submit import job to worker pool
+            of this process, unless already submitted
+
+        Args:
+            jobId (UUID): id for ImportJob instance
+    '''
+    pool: ThreadPoolExecutor = get_executor()
+    with executor_lock:
+        if jobId in local_jobs:
+            return
+        local_jobs.add(jobId)
+    pool.submit(run_import_job, jobId)
+
+
+def resume_import_jobs() -> None:
+    ''' resume_import_jobs: function to submit queued import jobs and
+            running jobs whose worker process has exited or which made no
+            progress within EXPENSE_IMPORT_JOB_TIMEOUT to worker pool (run
+            with each job request, so jobs interrupted by a restart are
+            resumed, claims keeping each job to one worker)
+    '''
+    cutoff: datetime = datetime.now(tz=timezone.utc) - timedelta(
+        seconds=settings.EXPENSE_IMPORT_JOB_TIMEOUT)
+    jobs: QuerySet = ImportJob.objects.filter(
+        status__in=[ImportJob.QUEUED, ImportJob.RUNNING]).order_by(
+        'date_created').values_list('id', 'status', 'worker', 'date_updated')
+    for [jobId, job_status, worker, date_updated] in jobs:
+        if (job_status == ImportJob.QUEUED or
+                not is_worker_alive(worker, jobId) or date_updated < cutoff):
+            submit_import_job(jobId)
+
+
+def count_active_jobs(userId: str) -> int:
+    ''' count_active_jobs: function to count queued and running import
+            jobs of User instance
+
+        Args:
+            userId (str): id for User instance
+
+        Returns:
+            int: number of active ImportJob instances
+    '''
+    return ImportJob.objects.filter(
+        user=userId,
+        status__in=[ImportJob.QUEUED, ImportJob.RUNNING]).count()
+
+
+def create_import_job(data: str, has_heading: bool, userId: str) -> list:
+    ''' create_import_job: function to store base64 string of expense
+            file data then queue an ImportJob instance to import it, at
+            most EXPENSE_IMPORT_MAX_JOBS_PER_USER jobs of a user being
+            active at once
+
+        Args:
+            data (str): base64 string of expense file data to be imported
+            has_heading (bool): whether file contains a heading row
+            userId (str): id for associated User instance
+
+        Returns:
+            list: list containing new import job id or a human-readable
+                response message and a 'status' integer with standard
+                Http status code
+    '''
+    resume_import_jobs()
+    if not User.objects.filter(id=userId).exists():
+        return [no_user_found, status.HTTP_404_NOT_FOUND]
+    # Checked again with user row locked once file is stored
+    if count_active_jobs(userId) >= settings.EXPENSE_IMPORT_MAX_JOBS_PER_USER:
+        return [import_job_limit, status.HTTP_429_TOO_MANY_REQUESTS]
+
+    serializer = ImportJobSerializer(data={
+        'user': userId, 'has_heading': has_heading,
+        'date_created': datetime.now(tz=timezone.utc).replace(microsecond=0)
+    })
+    if not serializer.is_valid():
+        return [parse_csv_failed, status.HTTP_400_BAD_REQUEST]
+
+    os.makedirs(settings.EXPENSE_IMPORT_DIR, exist_ok=True)
+    job: ImportJob = ImportJob(**serializer.validated_data)
+    job.file_path = os.path.join(settings.EXPENSE_IMPORT_DIR,
+                                 str(job.id) + '.csv')
+    try:
+        with open(job.file_path, 'wb') as file:
+            for chunk in iter_base64_chunks(data):
+                file.write(chunk)
+    except (AttributeError, ValueError):
+        os.remove(job.file_path)
+        return [parse_csv_failed, status.HTTP_400_BAD_REQUEST]
+    job.file_size = os.path.getsize(job.file_path)
+
+    try:
+        with transaction.atomic():
+            # Update of user row holds lock until commit (also on SQLite,
+            # which ignores select_for_update), so concurrent requests of
+            # user count active jobs one at a time
+            User.objects.filter(id=userId).update(
+                change_seq=F('change_seq'))
+            if (count_active_jobs(userId) >=
+                    settings.EXPENSE_IMPORT_MAX_JOBS_PER_USER):
+                os.remove(job.file_path)
+                return [import_job_limit, status.HTTP_429_TOO_MANY_REQUESTS]
+            job.save()
+            transaction.on_commit(lambda: submit_import_job(job.id))
+    except DatabaseError:
+        os.remove(job.file_path)
+        raise
+    return [job.id, status.HTTP_200_OK]
+
+
+def find_import_job_by_id(jobId: str) -> list:
+    ''' find_import_job_by_id: function to return ImportJob instance
+            based on query by id field
+
+        Args:
+            jobId (str): id for requested ImportJob instance
+
+        Returns:
+            list: list containing either an instance of ImportJob class or
+                    a human-readable response message and a 'status'
+                    integer with standard Http status code
+    '''
+    resume_import_jobs()
+    job: ImportJob | None = ImportJob.objects.filter(id=jobId).first()
+    if job is None:
+        return [no_import_job_found, status.HTTP_404_NOT_FOUND]
+    return [job, status.HTTP_200_OK]
+
+
+def cancel_import_job(job: ImportJob) -> list:
+    ''' cancel_import_job: function to cancel queued or running ImportJob
+            instance, rows already inserted being kept
+
+        Args:
+            job (ImportJob): instance of ImportJob class to cancel
+
+        Returns:
+            list: list containing a human-readable response message
+                and a 'status' integer with standard Http status code
+    '''
+    now: datetime = datetime.now(tz=timezone.utc).replace(microsecond=0)
+    was_queued: bool = ImportJob.objects.filter(
+        id=job.id, status=ImportJob.QUEUED).update(
+        status=ImportJob.CANCELLED, date_finished=now) > 0
+    if not was_queued and ImportJob.objects.filter(
+            id=job.id, status=ImportJob.RUNNING).update(
+            status=ImportJob.CANCELLED, date_finished=now) == 0:
+        return [import_job_finished, status.HTTP_409_CONFLICT]
+
+    # Running jobs remove their file once they see they were cancelled
+    job.refresh_from_db()
+    if was_queued or not is_worker_alive(job.worker, job.id):
+        remove_job_file(job.id)
+    return [import_job_cancelled, status.HTTP_200_OK]
+
+
+def claim_import_job(jobId, worker: str) -> ImportJob | None:
+    ''' claim_import_job: function to mark ImportJob instance as running
+            so only one worker imports it, claiming either a queued job or
+            a running job whose worker process has exited or which made no
+            progress within EXPENSE_IMPORT_JOB_TIMEOUT
+
+        Args:
+            jobId (UUID): id for requested ImportJob instance
+            worker (str): 'host:pid' of this worker process
+
+        Returns:
+            job (ImportJob): claimed instance of ImportJob class or None
+                if job was claimed by another worker or finished
+    '''
+    now: datetime = datetime.now(tz=timezone.utc).replace(microsecond=0)
+    cutoff: datetime = now - timedelta(
+        seconds=settings.EXPENSE_IMPORT_JOB_TIMEOUT)
+    claimed: int = ImportJob.objects.filter(
+        id=jobId, status=ImportJob.QUEUED).update(
+        status=ImportJob.RUNNING, worker=worker, date_started=now,
+        date_updated=now)
+    if claimed == 0:
+        running: list | None = ImportJob.objects.filter(
+            id=jobId, status=ImportJob.RUNNING).values_list(
+            'worker', 'date_updated').first()
+        if running is None:
+            return None
+        [old_worker, date_updated] = running
+        if is_worker_alive(old_worker, jobId) and date_updated >= cutoff:
+            return None
+        # Claimed only if no other worker claimed it since it was read
+        claimed = ImportJob.objects.filter(
+            id=jobId, status=ImportJob.RUNNING, worker=old_worker,
+            date_updated=date_updated).update(worker=worker,
+                                              date_updated=now)
+    if claimed == 0:
+        return None
+    return ImportJob.objects.get(id=jobId)
+
+
+def remove_job_file(jobId) -> None:
+    ''' remove_job_file: function to remove stored expense file of
+            import job, once job is finished or deleted
+
+        Args:
+            jobId (UUID): id for ImportJob instance
+    '''
+    job: list | None = ImportJob.objects.filter(id=jobId).values_list(
+        'status', 'file_path').first()
+    file_path: str = os.path.join(settings.EXPENSE_IMPORT_DIR,
+                                  str(jobId) + '.csv')
+    if job is not None:
+        if job[0] in [ImportJob.QUEUED, ImportJob.RUNNING]:
+            return
+        file_path = job[1]
+    if os.path.exists(file_path):
+        os.remove(file_path)
+
+
+def run_import_job(jobId) -> None:
+    ''' run_import_job: function run by worker pool to import stored
+            expense file for ImportJob instance, saving progress with each
+            inserted batch and resuming after rows already parsed (any
+            error fails job, and file is removed once job is finished)
+
+        Args:
+            jobId (UUID): id for requested ImportJob instance
+    '''
+    worker: str = get_worker_name()
+    try:
+        job: ImportJob | None = claim_import_job(jobId, worker)
+        if job is not None:
+            finish_import_job(job, worker)
+    except Exception as error:
+        # Errors such as a locked database fail job rather than leaving
+        # it running with no worker
+        ImportJob.objects.filter(
+            id=jobId, status=ImportJob.RUNNING, worker=worker).update(
+            status=ImportJob.FAILED, message=get_error_message(error),
+            date_finished=datetime.now(tz=timezone.utc).replace(
+                microsecond=0))
+    finally:
+        try:
+            with executor_lock:
+                local_jobs.discard(jobId)
+            remove_job_file(jobId)
+        finally:
+            connection.close()
+
+
+def finish_import_job(job: ImportJob, worker: str) -> None:
+    ''' finish_import_job: function to import stored expense file of
+            claimed ImportJob instance then set its final status and
+            message, unless job was claimed by another worker meanwhile
+
+        Args:
+            job (ImportJob): claimed instance of ImportJob class
+            worker (str): 'host:pid' of this worker process
+    '''
+    job_status: int = ImportJob.COMPLETED
+    try:
+        import_job_file(job)
+    except ImportCancelled:
+        job_status = ImportJob.CANCELLED
+    except (OSError, ValueError):
+        job_status = ImportJob.FAILED
+
+    job.refresh_from_db()
+    message: str = get_import_message(job.rows_inserted, job.rows_failed,
+                                      job.rows_skipped)
+    if job_status == ImportJob.FAILED:
+        message = parse_csv_failed
+    elif job.rows_inserted == 0 and job.rows_skipped == 0:
+        job_status = ImportJob.FAILED
+        message = import_csv_failed
+    ImportJob.objects.filter(
+        id=job.id, status=ImportJob.RUNNING, worker=worker).update(
+        status=job_status, message=message,
+        date_finished=datetime.now(tz=timezone.utc).replace(microsecond=0))
+
+
+def get_error_message(error: Exception) -> str:
+    ''' get_error_message: function to get message of import job
+            failed by unexpected error
+
+        Args:
+            error (Exception): error raised by import job
+
+        Returns:
+            str: message fitting ImportJob message field
+    '''
+    message: str = import_job_failed + ' ' + (str(error) or
+                                              type(error).__name__)
+    return message[:ImportJob._meta.get_field('message').max_length]
+
+
+def import_job_file(job: ImportJob) -> None:
+    ''' import_job_file: function to stream stored expense file for
+            ImportJob instance through import pipeline, saving progress
+            within the transaction of each inserted batch
+
+        Args:
+            job (ImportJob): running instance of ImportJob class
+    '''
+    progress: dict = {'bytes_read': 0, 'rows_parsed': job.rows_parsed}
+    resolver = CategoryResolver(str(job.user_id))
+
+    def count_bytes(chunks: Iterator[bytes]) -> Iterator[bytes]:
+        for chunk in chunks:
+            progress['bytes_read'] += len(chunk)
+            yield chunk
+
+    def count_rows(records: Iterator[str]) -> Iterator[str]:
+        for record in records:
+            progress['rows_parsed'] += 1
+            yield record
+
+    def before_insert() -> None:
+        # Stop once job is cancelled or claimed by another worker
+        if not ImportJob.objects.filter(
+                id=job.id, status=ImportJob.RUNNING,
+                worker=job.worker).exists():
+            raise ImportCancelled()
+        resolver.create_pending()
+
+    def after_insert(created: int, failed: int, skipped: int) -> None:
+        ImportJob.objects.filter(id=job.id).update(
+            bytes_read=progress['bytes_read'],
+            rows_parsed=progress['rows_parsed'],
+            rows_inserted=F('rows_inserted') + created,
+            rows_failed=F('rows_failed') + failed,
+            rows_skipped=F('rows_skipped') + skipped,
+            date_updated=datetime.now(tz=timezone.utc).replace(
+                microsecond=0))
+
+    with open(job.file_path, 'rb') as file:
+        records: Iterator[str] = iter_records(
+            iter_text_chunks(count_bytes(iter_file_chunks(file))))
+        columns: list | None
+        [records, columns] = get_import_columns(records, job.has_heading,
+                                                str(job.user_id))
+
+        # Skip rows already imported before job was interrupted
+        body: Iterator[str] = islice(records, job.rows_parsed, None)
+        new_expenses: Iterator[dict] = parse_data(
+            count_rows(body), str(job.user_id), resolver, columns)
+        create_expenses_for_import(new_expenses, before_insert=before_insert,
+                                   after_insert=after_insert)
@@ -0,0 +1,204 @@
+from datetime import (date, datetime)
+from decimal import Decimal
+from typing import Iterable
+from django.db import transaction
+from django.db.models import (Count, DateField, F, QuerySet, Sum)
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from login.models.user import User
+from dashboard.models.category import Category
+from ..models import (Expense, ExpenseRollup)
+
+
+def get_rollup_month(spend_date: datetime) -> date:
+    ''' get_rollup_month: function to get first day of month of spend
+            date in current time zone (as TruncMonth in database)
+
+        Args:
+            spend_date (datetime): spend date of expense
+
+        Returns:
+            date: first day of month
+    '''
+    if timezone.is_naive(spend_date):
+        spend_date = timezone.make_aware(spend_date)
+    spend_date = timezone.localtime(spend_date)
+    return date(spend_date.year, spend_date.month, 1)
+
+
+def get_rollup_key(userId, categoryId, month: date, type: int) -> tuple:
+    ''' get_rollup_key: function to get key of ExpenseRollup instance
+
+        Args:
+            userId (str | UUID): id for User instance
+            categoryId (str | UUID | None): id for Category instance
+            month (date): first day of month
+            type (int): expense type
+
+        Returns:
+            tuple: tuple of user id, category id (or None), month and type
+    '''
+    return (str(userId), None if categoryId is None else str(categoryId),
+            month, int(type))
+
+
+def update_rollups(expenses: Iterable[Expense], sign: int = 1) -> None:
+    ''' update_rollups: function to add (or with sign -1 remove) amounts
+            of expenses to totals of their ExpenseRollup instances, with
+            one update per user, category, month and type (must be
+            called in transaction writing expenses)
+
+        Args:
+            expenses (Iterable[Expense]): created, updated or deleted
+                instances of Expense class
+            sign (int): 1 to add expenses or -1 to remove them
+    '''
+    deltas: dict = {}
+    for expense in expenses:
+        key: tuple = get_rollup_key(
+            expense.user_id, expense.category_id,
+            get_rollup_month(expense.spend_date), expense.type)
+        [total, count] = deltas.get(key, [Decimal(0), 0])
+        amount: Decimal = Decimal(str(expense.amount)).quantize(
+            Decimal('0.01'))
+        deltas[key] = [total + sign * amount, count + sign]
+    apply_rollup_deltas(deltas)
+
+
+def apply_rollup_deltas(deltas: dict) -> None:
+    ''' apply_rollup_deltas: function to add changes of total and count
+            to ExpenseRollup instances, creating missing instances and
+            deleting instances left without expenses
+
+        Args:
+            deltas (dict): dictionary of total and count changes by
+                rollup key
+    '''
+    with transaction.atomic():
+        for [key, [total, count]] in deltas.items():
+            if total == 0 and count == 0:
+                continue
+            [userId, categoryId, month, type] = key
+            rollups: QuerySet[ExpenseRollup] = ExpenseRollup.objects.filter(
+                user=userId, category=categoryId, month=month, type=type)
+            updated: int = rollups.update(total=F('total') + total,
+                                          count=F('count') + count)
+            if updated == 0:
+                ExpenseRollup.objects.create(
+                    user_id=userId, category_id=categoryId, month=month,
+                    type=type, total=total, count=count)
+            elif count < 0:
+                rollups.filter(count__lte=0).delete()
+
+
+def move_category_rollups(category: Category) -> None:
+    ''' move_category_rollups: function to move totals of Category
+            instance to uncategorized rollups, as its expenses are set to
+            no category when it is deleted (must be called in transaction
+            deleting category)
+
+        Args:
+            category (Category): instance of Category class to be deleted
+    '''
+    rollups: QuerySet[ExpenseRollup] = ExpenseRollup.objects.filter(
+        category=category)
+    deltas: dict = {}
+    for rollup in rollups:
+        key: tuple = get_rollup_key(rollup.user_id, None, rollup.month,
+                                    rollup.type)
+        [total, count] = deltas.get(key, [Decimal(0), 0])
+        deltas[key] = [total + rollup.total, count + rollup.count]
+    with transaction.atomic():
+        rollups.delete()
+        apply_rollup_deltas(deltas)
+
+
+def get_expense_totals(queryset: QuerySet[Expense]) -> dict:
+    ''' get_expense_totals: function to get total amount and count of
+            expenses by rollup key, computed from expense rows
+
+        Args:
+            queryset (QuerySet): queryset of Expense instances
+
+        Returns:
+            dict: dictionary of total and count by rollup key
+    '''
+    rows: QuerySet = queryset.values(
+        'user', 'category', 'type',
+        month=TruncMonth('spend_date', output_field=DateField())).annotate(
+        total=Sum('amount'), count=Count('id')).order_by()
+    return {get_rollup_key(row['user'], row['category'], row['month'],
+                           row['type']): [row['total'], row['count']]
+            for row in rows}
+
+
+def rebuild_rollups(userId: str | None = None) -> int:
+    ''' rebuild_rollups: function to replace ExpenseRollup instances with
+            totals computed from expense rows, increasing change sequence
+            of rebuilt users so their cached summaries are not read again
+
+        Args:
+            userId (str): id for User instance to rebuild (defaults to
+                all users)
+
+        Returns:
+            int: number of ExpenseRollup instances created
+    '''
+    rollups: QuerySet[ExpenseRollup] = ExpenseRollup.objects.all()
+    expenses: QuerySet[Expense] = Expense.objects.all()
+    users: QuerySet[User] = User.objects.all()
+    if userId is not None:
+        rollups = rollups.filter(user=userId)
+        expenses = expenses.filter(user=userId)
+        users = users.filter(id=userId)
+    with transaction.atomic():
+        users.update(change_seq=F('change_seq') + 1)
+        rollups.delete()
+        created: list = ExpenseRollup.objects.bulk_create(
+            [ExpenseRollup(user_id=key[0], category_id=key[1],
+                           month=key[2], type=key[3], total=total,
+                           count=count)
+             for [key, [total, count]] in
+             get_expense_totals(expenses).items()],
+            batch_size=1000)
+    return len(created)
+
+
+def check_rollups(userId: str | None = None) -> list:
+    ''' check_rollups: function to compare ExpenseRollup instances with
+            totals computed from expense rows
+
+        Args:
+            userId (str): id for User instance to check (defaults to
+                all users)
+
+        Returns:
+            list: list of human-readable mismatch strings (empty if
+                rollups are consistent)
+    '''
+    rollups: QuerySet[ExpenseRollup] = ExpenseRollup.objects.all()
+    expenses: QuerySet[Expense] = Expense.objects.all()
+    if userId is not None:
+        rollups = rollups.filter(user=userId)
+        expenses = expenses.filter(user=userId)
+    expected: dict = get_expense_totals(expenses)
+    found: dict = {}
+    for rollup in rollups:
+        key: tuple = get_rollup_key(rollup.user_id, rollup.category_id,
+                                    rollup.month, rollup.type)
+        # Uncategorized rows are not unique (null categories are distinct)
+        [total, count] = found.get(key, [0, 0])
+        found[key] = [total + rollup.total, count + rollup.count]
+
+    mismatches: list = []
+    for key in sorted(set(expected) | set(found), key=str):
+        [expected_total, expected_count] = expected.get(key, [0, 0])
+        [total, count] = found.get(key, [0, 0])
+        if (Decimal(str(total)).quantize(Decimal('0.01')) !=
+                Decimal(str(expected_total)).quantize(Decimal('0.01')) or
+                count != expected_count):
+            mismatches.append(
+                ' '.join(str(value) for value in key) + ': rollup ' +
+                str(total) + ' (' + str(count) + ') != expenses ' +
+                str(expected_total) + ' (' + str(expected_count) + ')')
+    return mismatches
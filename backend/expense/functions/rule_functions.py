@@ -0,0 +1,259 @@
+import threading
+import uuid
+from collections import (OrderedDict, deque)
+from datetime import (datetime, timezone)
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+from rest_framework import status
+from ..models import (CategoryRule, Expense)
+from ..utils.responses import no_rule_found
+from .rollup_functions import rebuild_rollups
+from .sync_functions import (get_change_seq, next_change_seq)
+
+
+# Expenses updated per statement when rules are reapplied
+REAPPLY_BATCH_SIZE = 500
+
+# Compiled rules by user id, least recently used first
+user_rules: OrderedDict = OrderedDict()
+
+user_rules_lock = threading.Lock()
+
+
+def get_rule_keywords(keywords: str) -> list:
+    ''' get_rule_keywords: function to get list of lowercase keywords of
+            comma separated keywords string of rule
+
+        Args:
+            keywords (str): comma separated keywords (ex: 'AMZN, AMAZON')
+
+        Returns:
+            list: list of keyword strings without surrounding spaces
+    '''
+    return [keyword.strip().lower() for keyword in keywords.split(',')
+            if keyword.strip()]
+
+
+class RuleMatcher:
+    ''' RuleMatcher: class to find category of first rule (in priority
+            order) with a keyword contained in vendor, all keywords of
+            all rules being compiled into one Aho-Corasick automaton so
+            each vendor is read once whatever the number of rules
+
+        Args:
+            rules (list): list of [keywords list, category id] of rules
+                in priority order
+    '''
+
+    def __init__(self, rules: list) -> None:
+        self.categories: list = [categoryId for [_, categoryId] in rules]
+        # Index of first rule with a keyword ending at each state (number
+        # of rules if none) and transitions of states by character
+        self.outputs: list = [len(rules)]
+        self.transitions: list = [{}]
+        for index, [keywords, _] in enumerate(rules):
+            for keyword in keywords:
+                self.add_keyword(keyword, index)
+        self.add_failure_transitions()
+
+    def add_keyword(self, keyword: str, index: int) -> None:
+        ''' add_keyword: function to add states spelling keyword to trie
+                of automaton
+
+            Args:
+                keyword (str): lowercase keyword
+                index (int): index of rule of keyword
+        '''
+        state: int = 0
+        for character in keyword:
+            next_state: int | None = self.transitions[state].get(character)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions.append({})
+                self.outputs.append(len(self.categories))
+                self.transitions[state][character] = next_state
+            state = next_state
+        self.outputs[state] = min(self.outputs[state], index)
+
+    def add_failure_transitions(self) -> None:
+        ''' add_failure_transitions: function to complete trie into a
+                deterministic automaton, each state also taking the
+                transitions and rule of its longest proper suffix which is
+                a keyword prefix (breadth first, so suffix states are
+                complete before states using them)
+        '''
+        failures: list = [0] * len(self.transitions)
+        queue: deque = deque()
+        for state in self.transitions[0].values():
+            queue.append(state)
+        while len(queue) > 0:
+            state: int = queue.popleft()
+            trie: dict = self.transitions[state]
+            for [character, next_state] in trie.items():
+                queue.append(next_state)
+                failures[next_state] = self.transitions[
+                    failures[state]].get(character, 0)
+            failure_state: int = failures[state]
+            self.outputs[state] = min(self.outputs[state],
+                                      self.outputs[failure_state])
+            self.transitions[state] = {**self.transitions[failure_state],
+                                       **trie}
+
+    def get_category_id(self, vendor: str) -> str | None:
+        ''' get_category_id: function to get category of first rule with
+                a keyword in vendor, in time linear in length of vendor
+
+            Args:
+                vendor (str): vendor of expense
+
+            Returns:
+                categoryId (str): id for Category instance or None if no
+                    rule matches
+        '''
+        best: int = len(self.categories)
+        if best == 0:
+            return None
+        transitions: list = self.transitions
+        outputs: list = self.outputs
+        state: int = 0
+        for character in vendor.lower():
+            state = transitions[state].get(character, 0)
+            if outputs[state] < best:
+                best = outputs[state]
+        return self.categories[best] if best < len(self.categories) \
+            else None
+
+
+def get_user_rules(userId: str) -> RuleMatcher:
+    ''' get_user_rules: function to get compiled CategoryRule instances of
+            User instance, compiled again only when change sequence number
+            of user increased since (as every rule write increases it)
+
+        Args:
+            userId (str): id for User instance
+
+        Returns:
+            RuleMatcher: compiled rules of user
+    '''
+    version: int = get_change_seq(userId)
+    with user_rules_lock:
+        entry: list | None = user_rules.get(str(userId))
+        if entry is not None and entry[0] == version:
+            user_rules.move_to_end(str(userId))
+            return entry[1]
+
+    matcher = RuleMatcher([
+        [get_rule_keywords(keywords), str(categoryId)]
+        for [keywords, categoryId] in CategoryRule.objects.filter(
+            user=userId).order_by('priority', 'date_created').values_list(
+            'keywords', 'category')])
+    with user_rules_lock:
+        user_rules[str(userId)] = [version, matcher]
+        user_rules.move_to_end(str(userId))
+        while len(user_rules) > settings.CATEGORIZER_MAX_USERS:
+            user_rules.popitem(last=False)
+    return matcher
+
+
+def get_rule_category_id(userId: str, vendor) -> str | None:
+    ''' get_rule_category_id: function to get category of first rule of
+            User instance matching vendor of new expense
+
+        Args:
+            userId (str): id for User instance
+            vendor (str): vendor of expense
+
+        Returns:
+            categoryId (str): id for Category instance or None
+    '''
+    if not isinstance(vendor, str) or not vendor:
+        return None
+    try:
+        userId = str(uuid.UUID(str(userId)))
+    except ValueError:
+        return None
+    return get_user_rules(userId).get_category_id(vendor)
+
+
+def find_rules_by_user(userId: str) -> list:
+    ''' find_rules_by_user: function to get all CategoryRule instance(s)
+            associated with specific User instance in priority order
+
+        Args:
+            userId (str): id for requested User instance
+
+        Returns:
+            list: list containing a queryset of CategoryRule instance(s)
+                    or a human-readable response message and a 'status'
+                    integer with standard Http status code
+    '''
+    queryset: QuerySet[CategoryRule] = CategoryRule.objects.filter(
+        user=userId).order_by('priority', 'date_created')
+    if not queryset.exists():
+        return [no_rule_found, status.HTTP_404_NOT_FOUND]
+    return [queryset, status.HTTP_200_OK]
+
+
+def find_rule_by_id(ruleId: str) -> list:
+    ''' find_rule_by_id: function to return CategoryRule instance based on
+            query by id field
+
+        Args:
+            ruleId (str): id for requested CategoryRule instance
+
+        Returns:
+            list: list containing either an instance of CategoryRule class
+                    or a human-readable response message and a 'status'
+                    integer with standard Http status code
+    '''
+    rule: CategoryRule | None = CategoryRule.objects.filter(
+        id=ruleId).first()
+    if rule is None:
+        return [no_rule_found, status.HTTP_404_NOT_FOUND]
+    return [rule, status.HTTP_200_OK]
+
+
+def reapply_rules(userId: str) -> list:
+    ''' reapply_rules: function to give every Expense instance of User
+            instance matching a rule the category of that rule, matching
+            each distinct vendor once and updating expenses with one
+            UPDATE per target category and batch of ids (rollups of user
+            are rebuilt once)
+
+        Args:
+            userId (str): id for requested User instance
+
+        Returns:
+            list: list containing number of expenses recategorized and a
+                'status' integer with standard Http status code
+    '''
+    matcher: RuleMatcher = get_user_rules(userId)
+    matches: dict = {}
+    targets: dict = {}
+    rows: QuerySet = Expense.objects.filter(user=userId).values_list(
+        'id', 'vendor', 'category')
+    for [expenseId, vendor, categoryId] in rows.iterator(
+            chunk_size=settings.STREAMING_CHUNK_SIZE):
+        if vendor not in matches:
+            matches[vendor] = matcher.get_category_id(vendor)
+        target: str | None = matches[vendor]
+        if target is not None and target != str(categoryId):
+            targets.setdefault(target, []).append(expenseId)
+
+    count: int = sum(len(expenseIds) for expenseIds in targets.values())
+    if count == 0:
+        return [0, status.HTTP_200_OK]
+    with transaction.atomic():
+        change_seq: int = next_change_seq(userId)
+        updated_at: datetime = datetime.now(tz=timezone.utc).replace(
+            microsecond=0)
+        for [target, expenseIds] in targets.items():
+            for start in range(0, len(expenseIds), REAPPLY_BATCH_SIZE):
+                Expense.objects.filter(
+                    user=userId,
+                    id__in=expenseIds[start:start + REAPPLY_BATCH_SIZE]
+                ).update(category=target, change_seq=change_seq,
+                         updated_at=updated_at)
+        rebuild_rollups(userId)
+    return [count, status.HTTP_200_OK]
@@ -0,0 +1,173 @@
+import re
+import uuid
+from datetime import (date, datetime, time, timedelta)
+from decimal import (Decimal, InvalidOperation)
+from django.db import (connection, connections)
+from django.db.models import (FloatField, QuerySet)
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+from rest_framework import status
+from ..models import Expense
+from ..utils.responses import invalid_search_request
+
+
+# FTS5 index of vendor and description of expense_expenses rows (by
+# rowid, without copying text), kept in sync by triggers
+SEARCH_TABLE = 'expense_search'
+
+SEARCH_INDEX_SQL = [
+    ("CREATE VIRTUAL TABLE IF NOT EXISTS expense_search USING fts5("
+     "vendor, description, content='expense_expenses', "
+     "content_rowid='rowid', tokenize='unicode61 remove_diacritics 2', "
+     "prefix='2 3')"),
+    ("CREATE TRIGGER IF NOT EXISTS expense_search_insert AFTER INSERT ON "
+     "expense_expenses BEGIN INSERT INTO expense_search(rowid, vendor, "
+     "description) VALUES (new.rowid, new.vendor, new.description); END"),
+    ("CREATE TRIGGER IF NOT EXISTS expense_search_delete AFTER DELETE ON "
+     "expense_expenses BEGIN INSERT INTO expense_search(expense_search, "
+     "rowid, vendor, description) VALUES ('delete', old.rowid, "
+     "old.vendor, old.description); END"),
+    ("CREATE TRIGGER IF NOT EXISTS expense_search_update AFTER UPDATE OF "
+     "vendor, description ON expense_expenses BEGIN "
+     "INSERT INTO expense_search(expense_search, rowid, vendor, "
+     "description) VALUES ('delete', old.rowid, old.vendor, "
+     "old.description); INSERT INTO expense_search(rowid, vendor, "
+     "description) VALUES (new.rowid, new.vendor, new.description); END")]
+
+# Rank of match (lower is better), weighting vendor over description
+SEARCH_RANK_SQL = 'bm25(expense_search, 4.0, 1.0)'
+
+# Words of search text, with '*' suffix for prefix match
+SEARCH_TERM_REGEX = re.compile(r'(\w+)(\*?)')
+
+# Unique ordering of search matches positioning each page
+SEARCH_PAGE_ORDERING = ['rank', 'id']
+
+
+def create_search_index(using: str = 'default', **kwargs) -> None:
+    ''' create_search_index: function to create FTS5 search table of
+            expenses and triggers keeping it in sync with every insert,
+            update and delete (connected to post_migrate, so created by
+            'migrate --run-syncdb'; SQLite only)
+
+        Args:
+            using (str): alias of database migrated
+            kwargs (dict): other post_migrate signal arguments
+    '''
+    database = connections[using]
+    if database.vendor != 'sqlite':
+        return
+    with database.cursor() as cursor:
+        created: bool = SEARCH_TABLE not in \
+            database.introspection.table_names(cursor)
+        for sql in SEARCH_INDEX_SQL:
+            cursor.execute(sql)
+        if created:
+            # Index rows of tables created before search table
+            rebuild_search_index(cursor)
+
+
+def rebuild_search_index(cursor=None) -> None:
+    ''' rebuild_search_index: function to rebuild search table from all
+            expense rows (needed after VACUUM or a table rebuild by
+            sync_schema, which may renumber rowids)
+
+        Args:
+            cursor (obj): database cursor (defaults to new cursor of
+                default database)
+    '''
+    if cursor is None:
+        with connection.cursor() as cursor:
+            rebuild_search_index(cursor)
+        return
+    cursor.execute("INSERT INTO expense_search(expense_search) "
+                   "VALUES ('rebuild')")
+
+
+def get_match_query(text: str) -> str | None:
+    ''' get_match_query: function to get FTS5 query matching every word of
+            search text, with words quoted so search text cannot use query
+            syntax
+
+        Args:
+            text (str): search text (words ending with '*' match as
+                prefix)
+
+        Returns:
+            str: FTS5 query string (None if text has no words)
+    '''
+    terms: list = ['"' + word + '"' + star
+                   for [word, star] in SEARCH_TERM_REGEX.findall(text)]
+    if len(terms) == 0:
+        return None
+    return ' AND '.join(terms)
+
+
+def search_expenses(userId: str, params) -> list:
+    ''' search_expenses: function to get queryset of Expense instances of
+            User instance matching search text, ranked by relevance and
+            optionally filtered by spend date range, category, type and
+            amount range
+
+        Args:
+            userId (str): id for requested User instance
+            params (dict): request body with 'query' search text and
+                optional 'start_date' and 'end_date' ISO format dates
+                (inclusive, in current time zone),
+                'category_id', 'type', 'min_amount' and 'max_amount'
+
+        Returns:
+            list: list containing a queryset of Expense instances
+                annotated with 'rank' or a human-readable response message
+                and a 'status' integer with standard Http status code
+    '''
+    try:
+        match: str | None = get_match_query(str(params['query']))
+        if match is None:
+            raise ValueError('Search text has no words.')
+        queryset: QuerySet[Expense] = Expense.objects.filter(user=userId)
+        if params.get('start_date'):
+            queryset = queryset.filter(
+                spend_date__gte=get_day_start(params['start_date']))
+        if params.get('end_date'):
+            queryset = queryset.filter(spend_date__lt=get_day_start(
+                params['end_date'], timedelta(days=1)))
+        if params.get('category_id'):
+            queryset = queryset.filter(
+                category=uuid.UUID(str(params['category_id'])))
+        if params.get('type') not in [None, '']:
+            queryset = queryset.filter(type=int(params['type']))
+        if params.get('min_amount') not in [None, '']:
+            queryset = queryset.filter(
+                amount__gte=Decimal(str(params['min_amount'])))
+        if params.get('max_amount') not in [None, '']:
+            queryset = queryset.filter(
+                amount__lte=Decimal(str(params['max_amount'])))
+    except (TypeError, ValueError, InvalidOperation):
+        return [invalid_search_request, status.HTTP_400_BAD_REQUEST]
+
+    # Unary '+' keeps rowid join from being passed to FTS5, so SQLite
+    # runs the match once and looks up each matching expense by rowid
+    # (rather than matching again for each expense in a date range)
+    queryset = queryset.extra(
+        tables=[SEARCH_TABLE],
+        where=['expense_expenses.rowid = +' + SEARCH_TABLE + '.rowid',
+               SEARCH_TABLE + ' MATCH %s'],
+        params=[match]).annotate(
+        rank=RawSQL(SEARCH_RANK_SQL, [], output_field=FloatField()))
+    return [queryset, status.HTTP_200_OK]
+
+
+def get_day_start(value: str, offset: timedelta = timedelta()) -> datetime:
+    ''' get_day_start: function to get start of day of ISO format date
+            (plus offset) in current time zone
+
+        Args:
+            value (str): ISO format date ('YYYY-MM-DD')
+            offset (timedelta): time added to date
+
+        Returns:
+            datetime: aware datetime at midnight
+    '''
+    day: date = date.fromisoformat(str(value)) + offset
+    return timezone.make_aware(datetime.combine(day, time()))
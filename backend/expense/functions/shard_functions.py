@@ -0,0 +1,114 @@
+import mmap
+from collections import deque
+from concurrent.futures import Executor
+from typing import Iterator
+from .import_functions import parse_rows
+from .stream_functions import iter_records
+
+
+# Approximate number of bytes parsed per worker task
+SHARD_SIZE = 8 * 1024 * 1024
+
+# Shards submitted ahead of writer per worker, so parsed rows held in
+# memory are bounded while workers stay busy
+SHARDS_AHEAD_PER_WORKER = 2
+
+
+def get_shard_ranges(data: mmap.mmap, shard_size: int = SHARD_SIZE) -> list:
+    ''' get_shard_ranges: function to split memory-mapped csv file into
+            byte ranges of about shard_size ending on record boundaries,
+            so newlines within quoted strings are never split
+
+        Args:
+            data (mmap): memory-mapped expense file data
+            shard_size (int): approximate number of bytes per shard
+
+        Returns:
+            list: list containing [start, end] byte offsets for each shard
+    '''
+    size: int = len(data)
+    ranges: list = []
+    start: int = 0
+    while start < size:
+        end: int = start + shard_size
+        if end >= size:
+            ranges.append([start, size])
+            break
+
+        # Move end to next newline outside quotes
+        quotes: int = data[start:end].count(b'"')
+        while True:
+            newline: int = data.find(b'\n', end)
+            if newline == -1:
+                end = size
+                break
+            quotes += data[end:newline + 1].count(b'"')
+            end = newline + 1
+            if quotes % 2 == 0:
+                break
+        ranges.append([start, end])
+        start = end
+    return ranges
+
+
+def parse_shard(file_path: str, start: int, end: int,
+                skip_first: bool = False,
+                columns: list | None = None) -> list:
+    ''' parse_shard: function run by worker process to parse byte range
+            of csv file into expense values
+
+        Args:
+            file_path (str): path of expense file to be imported
+            start (int): byte offset of first record in shard
+            end (int): byte offset after last record in shard
+            skip_first (bool): whether to skip first record (heading row)
+            columns (list): date, amount, vendor and category column
+                indexes found for whole file, or None to classify cells
+
+        Returns:
+            list: list containing values returned by parse_columns or
+                parse_row for each valid row in shard
+    '''
+    with open(file_path, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            text: str = data[start:end].decode('utf-8')
+
+    records: Iterator[str] = iter_records([text])
+    if skip_first:
+        next(records, None)
+    return list(filter(None, parse_rows(records, columns)))
+
+
+def iter_parsed_shards(executor: Executor, file_path: str, ranges: list,
+                       has_heading: bool, columns: list | None,
+                       limit: int) -> Iterator[list]:
+    ''' iter_parsed_shards: function to parse shards of csv file in worker
+            processes, yielding parsed rows of each shard in file order
+            with at most limit shards submitted but not yet consumed
+
+        Args:
+            executor (Executor): pool of parse workers
+            file_path (str): path of expense file to be imported
+            ranges (list): [start, end] byte offsets of each shard
+            has_heading (bool): whether first record is a heading row
+            columns (list): date, amount, vendor and category column
+                indexes found for whole file, or None to classify cells
+            limit (int): maximum number of shards parsing or parsed ahead
+
+        Returns:
+            Iterator[list]: iterator of lists returned by parse_shard
+    '''
+    pending: deque = deque()
+    try:
+        for index, [start, end] in enumerate(ranges):
+            if len(pending) >= limit:
+                yield pending.popleft().result()
+            pending.append(executor.submit(
+                parse_shard, file_path, start, end,
+                has_heading and index == 0, columns))
+        while len(pending) > 0:
+            yield pending.popleft().result()
+    finally:
+        # Shards not started are dropped if writer stops early
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,514 @@
+import bisect
+import itertools
+import json
+import mmap
+import os
+import sys
+import threading
+import uuid
+from array import array
+from datetime import date
+from pathlib import Path
+from typing import Iterable
+from django.conf import settings
+from django.db import (connection, transaction)
+from django.db.models import QuerySet
+from django.utils import timezone
+from login.models.user import User
+from ..models import (Expense, Tombstone)
+
+
+# Version of snapshot files (snapshots of other versions are rebuilt)
+SNAPSHOT_FORMAT = 2
+
+# Typecode of each column file of snapshot, one value per expense (rows
+# ordered by day, so ranges of days are found by bisection): day of
+# spend date (days since EPOCH in current time zone), amount in cents,
+# type and code of category in dictionary of snapshot
+SNAPSHOT_COLUMNS = {'days': 'i', 'cents': 'q', 'types': 'b',
+                    'categories': 'h'}
+EPOCH = date(1970, 1, 1)
+
+# Bytes of each expense id of ids file (rows are located by id)
+ID_SIZE = 16
+# Category code of expenses without category
+NO_CATEGORY = -1
+# Categories of dictionary before snapshot is rebuilt (int16 codes)
+MAX_CATEGORY_CODES = 32767
+# Changed rows looked up by searching ids (each search may read every
+# id) before comparing every id once
+ID_SEARCH_LIMIT = 16
+
+# Lock of each user snapshot, so one thread of process refreshes it
+snapshot_locks: dict = {}
+
+snapshot_locks_lock = threading.Lock()
+
+# Ids of users whose first snapshot is being built in background
+building_users: set = set()
+
+
+class LedgerSnapshot:
+    ''' LedgerSnapshot: class to read columns of snapshot of expenses of
+            a specific User instance as typed memoryviews of its memory
+            mapped files (without copying), closed once scanned
+
+        Args:
+            directory (Path): snapshot directory of user
+            meta (dict): snapshot metadata of refresh_snapshot
+    '''
+
+    def __init__(self, directory: Path, meta: dict) -> None:
+        self.count: int = meta['count']
+        self.categories: list = meta['categories']
+        self.maps: list = []
+        self.ids: memoryview = self.map_column(
+            directory, meta['generation'], 'ids', 'B')
+        self.columns: dict = {
+            name: self.map_column(directory, meta['generation'], name,
+                                  typecode)
+            for [name, typecode] in SNAPSHOT_COLUMNS.items()}
+
+    def map_column(self, directory: Path, generation: str | None,
+                   name: str, typecode: str) -> memoryview:
+        ''' map_column: function to memory map column file of snapshot
+
+            Args:
+                directory (Path): snapshot directory of user
+                generation (str): generation of snapshot files
+                name (str): name of column
+                typecode (str): array typecode of column values
+
+            Returns:
+                memoryview: values of column (empty if no expenses, as
+                    empty files cannot be mapped)
+        '''
+        if self.count == 0:
+            return memoryview(array(typecode))
+        path: Path = get_column_path(directory, generation, name)
+        with open(path, 'rb') as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.maps.append(data)
+        return memoryview(data).cast(typecode)
+
+    def close(self) -> None:
+        ''' close: function to release memoryviews and unmap files
+        '''
+        self.ids.release()
+        for column in self.columns.values():
+            column.release()
+        for data in self.maps:
+            data.close()
+
+    def __enter__(self) -> 'LedgerSnapshot':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def get_snapshot_dir(userId: str) -> Path:
+    ''' get_snapshot_dir: function to get snapshot directory of User
+            instance
+
+        Args:
+            userId (str): id for User instance
+
+        Returns:
+            Path: directory of snapshot files of user
+    '''
+    return Path(settings.EXPENSE_SNAPSHOT_DIR) / str(userId)
+
+
+def get_column_path(directory: Path, generation: str, name: str) -> Path:
+    ''' get_column_path: function to get path of column file of snapshot
+
+        Args:
+            directory (Path): snapshot directory of user
+            generation (str): generation of snapshot files
+            name (str): name of column
+
+        Returns:
+            Path: path of column file
+    '''
+    return directory / (generation + '.' + name)
+
+
+def get_empty_meta() -> dict:
+    ''' get_empty_meta: function to get metadata of snapshot without
+            expenses, which every change is applied to
+
+        Returns:
+            dict: snapshot metadata
+    '''
+    return {'format': SNAPSHOT_FORMAT, 'time_zone': settings.TIME_ZONE,
+            'change_seq': -1, 'count': 0, 'generation': None,
+            'categories': []}
+
+
+def read_snapshot_meta(directory: Path) -> dict:
+    ''' read_snapshot_meta: function to read metadata of snapshot of user,
+            empty if missing or written with other format or time zone
+
+        Args:
+            directory (Path): snapshot directory of user
+
+        Returns:
+            dict: snapshot metadata
+    '''
+    try:
+        with open(directory / 'meta.json', encoding='utf-8') as file:
+            meta: dict = json.load(file)
+    except (OSError, ValueError):
+        return get_empty_meta()
+    if meta.get('format') != SNAPSHOT_FORMAT or \
+            meta.get('time_zone') != settings.TIME_ZONE:
+        return get_empty_meta()
+    return meta
+
+
+def refresh_snapshot(userId: str, rebuild: bool = False) -> dict | None:
+    ''' refresh_snapshot: function to bring snapshot of User instance up
+            to date with its expenses, applying only expenses written and
+            deleted since change sequence number of snapshot (every
+            expense write sets change_seq of expense and every delete adds
+            a tombstone, so no trigger is needed), or building it again if
+            its files were removed meanwhile by another process
+
+        Args:
+            userId (str): id for User instance
+            rebuild (bool): whether to build snapshot again even if up to
+                date (ex: its files are missing)
+
+        Returns:
+            dict: snapshot metadata (None if user not found)
+    '''
+    with snapshot_locks_lock:
+        lock = snapshot_locks.setdefault(str(userId), threading.Lock())
+    with lock:
+        # Sequence number is read before changes, so changes committed in
+        # between are applied again next refresh rather than missed
+        change_seq: int | None = User.objects.filter(
+            id=userId).values_list('change_seq', flat=True).first()
+        if change_seq is None:
+            return None
+        directory: Path = get_snapshot_dir(userId)
+        meta: dict = read_snapshot_meta(directory)
+        if meta['change_seq'] == change_seq and not rebuild:
+            return meta
+        new_meta: dict | None = None
+        if not rebuild:
+            try:
+                new_meta = update_snapshot(userId, directory, meta,
+                                           change_seq)
+            except FileNotFoundError:
+                # Generation replaced by refresh of another process
+                new_meta = None
+        if new_meta is None:
+            new_meta = update_snapshot(userId, directory, get_empty_meta(),
+                                       change_seq)
+            remove_generation(directory, meta['generation'])
+        return new_meta
+
+
+def update_snapshot(userId: str, directory: Path, meta: dict,
+                    change_seq: int) -> dict | None:
+    ''' update_snapshot: function to write new generation of snapshot of
+            User instance with rows of expenses changed or deleted since
+            snapshot removed and rows of changed expenses merged in by day
+            (copying columns of current snapshot, so readers of it are
+            never affected)
+
+        Args:
+            userId (str): id for User instance
+            directory (Path): snapshot directory of user
+            meta (dict): current snapshot metadata (empty to build)
+            change_seq (int): change sequence number of user
+
+        Returns:
+            dict: new snapshot metadata (None if category dictionary is
+                full and snapshot must be built again)
+    '''
+    with LedgerSnapshot(directory, meta) as snapshot:
+        ids = bytearray(snapshot.ids)
+        columns: dict = {}
+        for [name, typecode] in SNAPSHOT_COLUMNS.items():
+            columns[name] = array(typecode)
+            with snapshot.columns[name].cast('B') as data:
+                columns[name].frombytes(data)
+    categories: list = list(meta['categories'])
+    codes: dict = {uuid.UUID(categoryId): code
+                   for [code, categoryId] in enumerate(categories)}
+    zone = timezone.get_current_timezone()
+    epoch: int = EPOCH.toordinal()
+
+    # Changed rows in order of day (spend date order in any time zone)
+    rows: QuerySet = Expense.objects.filter(
+        user=userId, change_seq__gt=meta['change_seq']).order_by(
+        'spend_date', 'id').values_list(
+        'id', 'spend_date', 'amount', 'type', 'category')
+    changed: Iterable = rows.iterator(
+        chunk_size=settings.STREAMING_CHUNK_SIZE)
+    if len(ids) > 0:
+        # Changed rows are removed and merged in again at their new day
+        changed = list(changed)
+        tombstones: QuerySet = Tombstone.objects.filter(
+            user=userId, name=Tombstone.EXPENSE,
+            change_seq__gt=meta['change_seq']).values_list(
+            'object_id', flat=True)
+        keys: list = [expenseId.bytes for [expenseId, *_] in changed]
+        keys += [objectId.bytes for objectId in tombstones]
+        removed: list = sorted(get_id_positions(ids, keys).values())
+        if len(removed) > 0:
+            [ids, columns] = remove_positions(ids, columns, removed)
+
+    added_ids = bytearray()
+    added: dict = {name: array(typecode)
+                   for [name, typecode] in SNAPSHOT_COLUMNS.items()}
+    for [expenseId, spend_date, amount, type, categoryId] in changed:
+        code: int | None = NO_CATEGORY if categoryId is None else \
+            codes.get(categoryId)
+        if code is None:
+            if len(categories) >= MAX_CATEGORY_CODES:
+                return None
+            code = codes[categoryId] = len(categories)
+            categories.append(str(categoryId))
+        added_ids.extend(expenseId.bytes)
+        added['days'].append(spend_date.astimezone(zone).toordinal() - epoch)
+        added['cents'].append(int(amount * 100))
+        added['types'].append(type)
+        added['categories'].append(code)
+    [ids, columns] = merge_rows(ids, columns, added_ids, added)
+
+    new_meta: dict = {**meta, 'change_seq': change_seq,
+                      'count': len(ids) // ID_SIZE,
+                      'generation': uuid.uuid4().hex,
+                      'categories': categories}
+    write_snapshot(directory, meta, new_meta, ids, columns)
+    return new_meta
+
+
+def get_id_positions(ids: bytearray, keys: list) -> dict:
+    ''' get_id_positions: function to get row positions of expense ids in
+            ids column, searching bytes for a few ids and else comparing
+            first 8 bytes of every id with those of ids in one pass
+
+        Args:
+            ids (bytearray): ids column of snapshot
+            keys (list): list of 16 byte expense ids
+
+        Returns:
+            dict: row position by id of ids found
+    '''
+    positions: dict = {}
+    if len(keys) == 0 or len(ids) == 0:
+        return positions
+    if len(keys) <= ID_SEARCH_LIMIT:
+        for key in keys:
+            start: int = ids.find(key)
+            # Id bytes may also occur across two ids
+            while start != -1 and start % ID_SIZE != 0:
+                start = ids.find(key, start + 1)
+            if start != -1:
+                positions[key] = start // ID_SIZE
+        return positions
+
+    prefixes: set = {int.from_bytes(key[:8], sys.byteorder) for key in keys}
+    key_set: set = set(keys)
+    # Views are released so ids can be extended after
+    with memoryview(ids) as view, view.cast('Q') as words, \
+            words[0::ID_SIZE // 8] as first_words:
+        candidates: list = list(itertools.compress(
+            itertools.count(), map(prefixes.__contains__, first_words)))
+    for position in candidates:
+        key: bytes = bytes(ids[position * ID_SIZE:(position + 1) * ID_SIZE])
+        if key in key_set:
+            positions[key] = position
+    return positions
+
+
+def remove_positions(ids: bytearray, columns: dict, removed: list) -> list:
+    ''' remove_positions: function to remove rows from columns of snapshot
+
+        Args:
+            ids (bytearray): ids column of snapshot
+            columns (dict): array of each other column of snapshot
+            removed (list): sorted positions of rows removed
+
+        Returns:
+            list: list containing new ids column and dictionary of arrays
+                of other columns
+    '''
+    kept: list = []
+    start: int = 0
+    for position in removed:
+        if position > start:
+            kept.append([start, position])
+        start = position + 1
+    kept.append([start, len(ids) // ID_SIZE])
+
+    new_ids = bytearray()
+    new_columns: dict = {name: array(typecode)
+                         for [name, typecode] in SNAPSHOT_COLUMNS.items()}
+    for [start, end] in kept:
+        new_ids.extend(ids[start * ID_SIZE:end * ID_SIZE])
+        for [name, column] in columns.items():
+            new_columns[name].extend(column[start:end])
+    return [new_ids, new_columns]
+
+
+def merge_rows(ids: bytearray, columns: dict, added_ids: bytearray,
+               added: dict) -> list:
+    ''' merge_rows: function to merge rows ordered by day into columns of
+            snapshot ordered by day, each after rows of same day
+
+        Args:
+            ids (bytearray): ids column of snapshot
+            columns (dict): array of each other column of snapshot
+            added_ids (bytearray): ids of added rows
+            added (dict): array of each other column of added rows
+
+        Returns:
+            list: list containing new ids column and dictionary of arrays
+                of other columns
+    '''
+    if len(added_ids) == 0:
+        return [ids, columns]
+    if len(ids) == 0:
+        return [added_ids, added]
+
+    new_ids = bytearray()
+    new_columns: dict = {name: array(typecode)
+                         for [name, typecode] in SNAPSHOT_COLUMNS.items()}
+    start: int = 0
+    for [index, day] in enumerate(added['days']):
+        position: int = bisect.bisect_right(columns['days'], day, start)
+        new_ids.extend(ids[start * ID_SIZE:position * ID_SIZE])
+        new_ids.extend(added_ids[index * ID_SIZE:(index + 1) * ID_SIZE])
+        for [name, column] in columns.items():
+            new_columns[name].extend(column[start:position])
+            new_columns[name].append(added[name][index])
+        start = position
+    new_ids.extend(ids[start * ID_SIZE:])
+    for [name, column] in columns.items():
+        new_columns[name].extend(column[start:])
+    return [new_ids, new_columns]
+
+
+def write_snapshot(directory: Path, meta: dict, new_meta: dict,
+                   ids: bytearray, columns: dict) -> None:
+    ''' write_snapshot: function to write column files of new generation
+            of snapshot, then replace metadata file (so snapshot changes
+            at once) and delete files of previous generation
+
+        Args:
+            directory (Path): snapshot directory of user
+            meta (dict): previous snapshot metadata
+            new_meta (dict): new snapshot metadata
+            ids (bytearray): ids column
+            columns (dict): array of each other column
+    '''
+    directory.mkdir(parents=True, exist_ok=True)
+    generation: str = new_meta['generation']
+    with open(get_column_path(directory, generation, 'ids'), 'wb') as file:
+        file.write(ids)
+    for [name, column] in columns.items():
+        with open(get_column_path(directory, generation, name), 'wb') as file:
+            column.tofile(file)
+    temp_path: Path = directory / (generation + '.json')
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(new_meta, file)
+    os.replace(temp_path, directory / 'meta.json')
+    remove_generation(directory, meta['generation'])
+
+
+def remove_generation(directory: Path, generation: str | None) -> None:
+    ''' remove_generation: function to delete column files of replaced
+            generation of snapshot (mapped files of readers stay valid
+            until unmapped)
+
+        Args:
+            directory (Path): snapshot directory of user
+            generation (str): generation of snapshot files (None if no
+                files)
+    '''
+    if generation is None:
+        return
+    for name in ['ids', *SNAPSHOT_COLUMNS]:
+        try:
+            os.remove(get_column_path(directory, generation, name))
+        except OSError:
+            pass
+
+
+def open_snapshot(userId: str) -> LedgerSnapshot | None:
+    ''' open_snapshot: function to refresh and open snapshot of User
+            instance for scanning (must be closed, ex: with statement)
+
+        Args:
+            userId (str): id for User instance
+
+        Returns:
+            LedgerSnapshot: snapshot of expenses of user (None if user not
+                found)
+    '''
+    rebuild: bool = False
+    while True:
+        meta: dict | None = refresh_snapshot(userId, rebuild)
+        if meta is None:
+            return None
+        try:
+            return LedgerSnapshot(get_snapshot_dir(userId), meta)
+        except FileNotFoundError:
+            # Replaced by another process since refreshed, or files of
+            # current generation removed, so built again if missing again
+            rebuild = meta == read_snapshot_meta(get_snapshot_dir(userId))
+
+
+def has_snapshot(userId: str) -> bool:
+    ''' has_snapshot: function to determine whether snapshot of User
+            instance has been built (with current format and time zone)
+
+        Args:
+            userId (str): id for User instance
+
+        Returns:
+            bool: True if snapshot exists, even if not up to date
+    '''
+    return read_snapshot_meta(get_snapshot_dir(userId))['generation'] \
+        is not None
+
+
+def build_snapshot_later(userId: str) -> None:
+    ''' build_snapshot_later: function to build first snapshot of User
+            instance in a background thread once current transaction
+            commits (unless already building), so requests are not kept
+            waiting while every expense of user is read
+
+        Args:
+            userId (str): id for User instance
+    '''
+    def start() -> None:
+        with snapshot_locks_lock:
+            if str(userId) in building_users:
+                return
+            building_users.add(str(userId))
+        threading.Thread(target=build_snapshot, args=[str(userId)],
+                         name='expense-snapshot', daemon=True).start()
+
+    transaction.on_commit(start)
+
+
+def build_snapshot(userId: str) -> None:
+    ''' build_snapshot: function run by background thread to build
+            snapshot of User instance
+
+        Args:
+            userId (str): id for User instance
+    '''
+    try:
+        refresh_snapshot(userId)
+    finally:
+        with snapshot_locks_lock:
+            building_users.discard(userId)
+        connection.close()
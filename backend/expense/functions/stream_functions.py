@@ -0,0 +1,174 @@
+import re
+import codecs
+from base64 import b64decode
+from typing import BinaryIO, Iterable, Iterator
+
+
+# Base64 characters decoded per chunk (must be a multiple of 4)
+BASE64_CHUNK_SIZE = 64 * 1024
+FILE_CHUNK_SIZE = 64 * 1024
+MULTIPLE_SPACES_REGEX = re.compile(' +')
+
+
+def iter_base64_chunks(data: str,
+                       chunk_size: int = BASE64_CHUNK_SIZE) -> Iterator[bytes]:
+    ''' iter_base64_chunks: function to incrementally decode base64 data
+            url string into raw bytes without decoding whole payload at once
+
+        Args:
+            data (str): base64 data url string of expense file data
+                (ex: 'data:text/csv;base64,...')
+            chunk_size (int): number of base64 characters decoded per chunk
+
+        Yields:
+            bytes: decoded bytes for each chunk of data
+    '''
+    start: int = data.index(',') + 1
+    length: int = len(data)
+    for index in range(start, length, chunk_size):
+        yield b64decode(data[index:index + chunk_size])
+
+
+def iter_file_chunks(file: BinaryIO,
+                     chunk_size: int = FILE_CHUNK_SIZE) -> Iterator[bytes]:
+    ''' iter_file_chunks: function to read binary file in chunks
+
+        Args:
+            file (BinaryIO): open binary file of expense file data
+            chunk_size (int): number of bytes read per chunk
+
+        Yields:
+            bytes: raw bytes for each chunk of data
+    '''
+    while True:
+        chunk: bytes = file.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_text_chunks(chunks: Iterable[bytes],
+                     encoding: str = 'utf-8') -> Iterator[str]:
+    ''' iter_text_chunks: function to incrementally decode bytes into
+            text, handling multi-byte characters split across chunks
+
+        Args:
+            chunks (Iterable[bytes]): raw bytes chunks of expense file data
+            encoding (str): text encoding of expense file data
+
+        Yields:
+            str: decoded text for each chunk of data
+    '''
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for chunk in chunks:
+        text: str = decoder.decode(chunk)
+        if text:
+            yield text
+    text: str = decoder.decode(b'', final=True)
+    if text:
+        yield text
+
+
+def iter_records(chunks: Iterable[str]) -> Iterator[str]:
+    ''' iter_records: function to split text chunks into csv records,
+            treating newlines within quoted strings as part of the record
+
+        Args:
+            chunks (Iterable[str]): decoded text chunks of expense file data
+
+        Yields:
+            str: single row of csv data with extra whitespace removed and
+                quoted newline characters replaced by spaces
+    '''
+    reader = RecordReader()
+    for chunk in chunks:
+        yield from reader.feed(chunk)
+    yield from reader.close()
+
+
+class RecordReader:
+    ''' RecordReader: class to split text chunks pushed to it into csv
+            records, treating newlines within quoted strings as part of
+            the record and holding incomplete records until next chunk
+    '''
+
+    def __init__(self) -> None:
+        self.parts: list = []
+        self.in_quotes: bool = False
+
+    def feed(self, chunk: str) -> list:
+        ''' feed: function to split next text chunk into csv records
+
+            Args:
+                chunk (str): decoded text chunk of expense file data
+
+            Returns:
+                records (list): list of complete rows of csv data with extra
+                    whitespace removed and quoted newline characters
+                    replaced by spaces
+        '''
+        records: list = []
+        parts: list = self.parts
+        in_quotes: bool = self.in_quotes
+        position: int = 0
+        length: int = len(chunk)
+        while position < length:
+            if in_quotes:
+                # Keep quoted text, including newlines, as part of record
+                quote: int = chunk.find('"', position)
+                if quote == -1:
+                    parts.append(chunk[position:])
+                    break
+                parts.append(chunk[position:quote + 1])
+                in_quotes = False
+                position = quote + 1
+                continue
+
+            newline: int = chunk.find('\n', position)
+            quote: int = chunk.find('"', position,
+                                    length if newline == -1 else newline)
+            if quote != -1:
+                parts.append(chunk[position:quote + 1])
+                in_quotes = True
+                position = quote + 1
+            elif newline != -1:
+                parts.append(chunk[position:newline])
+                records.append(get_clean_record(parts))
+                parts = []
+                position = newline + 1
+            else:
+                parts.append(chunk[position:])
+                break
+
+        self.parts = parts
+        self.in_quotes = in_quotes
+        return records
+
+    def close(self) -> list:
+        ''' close: function to return final record held once all text
+                chunks have been fed
+
+            Returns:
+                records (list): list containing last row of csv data if
+                    file did not end with a newline character
+        '''
+        records: list = []
+        if len(self.parts) > 0:
+            records.append(get_clean_record(self.parts))
+        self.parts = []
+        self.in_quotes = False
+        return records
+
+
+def get_clean_record(parts: list) -> str:
+    ''' get_clean_record: function to join record parts, removing extra
+            whitespace and newline characters within quoted strings
+
+        Args:
+            parts (list): list of strings making up a single csv record
+
+        Returns:
+            record (str): cleaned single row of csv data
+    '''
+    record: str = MULTIPLE_SPACES_REGEX.sub(' ', ''.join(parts))
+    return record.replace('\n', ' ')
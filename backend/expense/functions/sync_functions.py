@@ -0,0 +1,93 @@
+from datetime import (datetime, timezone)
+from typing import Iterable
+from django.db.models import F
+from login.models.user import User
+from dashboard.models.category import Category
+from ..models import (Expense, Tombstone)
+
+
+def next_change_seq(userId: str) -> int:
+    ''' next_change_seq: function to increase and get change sequence
+            number of User instance (must be called in transaction of the
+            change, whose update of user row holds lock until commit so
+            sequence numbers of a user are committed in order)
+
+        Args:
+            userId (str): id for User instance
+
+        Returns:
+            int: new change sequence number
+    '''
+    User.objects.filter(id=userId).update(change_seq=F('change_seq') + 1)
+    return User.objects.values_list('change_seq', flat=True).get(id=userId)
+
+
+def get_change_seq(userId: str) -> int:
+    ''' get_change_seq: function to get current change sequence number
+            of User instance, committed by writes of any process
+
+        Args:
+            userId (str): id for User instance
+
+        Returns:
+            int: change sequence number (0 if no user found)
+    '''
+    change_seq: int | None = User.objects.filter(id=userId).values_list(
+        'change_seq', flat=True).first()
+    return 0 if change_seq is None else change_seq
+
+
+def set_changed(instances: Iterable, userId: str) -> int:
+    ''' set_changed: function to set next change sequence number and
+            update date of Expense or Category instances of User instance
+            before they are saved
+
+        Args:
+            instances (Iterable): instances of Expense or Category class
+            userId (str): id for User instance
+
+        Returns:
+            int: change sequence number set
+    '''
+    change_seq: int = next_change_seq(userId)
+    updated_at: datetime = datetime.now(tz=timezone.utc).replace(
+        microsecond=0)
+    for instance in instances:
+        instance.change_seq = change_seq
+        instance.updated_at = updated_at
+    return change_seq
+
+
+def set_category_expenses_changed(category: Category,
+                                  change_seq: int) -> None:
+    ''' set_category_expenses_changed: function to set change sequence
+            number of Expense instances of Category instance, as their
+            category name changed or category will be deleted
+
+        Args:
+            category (Category): instance of Category class
+            change_seq (int): change sequence number of category change
+    '''
+    Expense.objects.filter(category=category).update(
+        change_seq=change_seq,
+        updated_at=datetime.now(tz=timezone.utc).replace(microsecond=0))
+
+
+def add_tombstone(userId: str, name: str, objectId: str) -> int:
+    ''' add_tombstone: function to record deletion of Expense or Category
+            instance with next change sequence number (must be called in
+            transaction of the deletion)
+
+        Args:
+            userId (str): id for User instance
+            name (str): Tombstone.EXPENSE or Tombstone.CATEGORY
+            objectId (str): id for deleted instance
+
+        Returns:
+            int: change sequence number of deletion
+    '''
+    change_seq: int = next_change_seq(userId)
+    Tombstone.objects.create(
+        user_id=userId, name=name, object_id=objectId, change_seq=change_seq,
+        date_deleted=datetime.now(tz=timezone.utc).replace(microsecond=0))
+    return change_seq
@@ -0,0 +1,265 @@
+import codecs
+import zlib
+from typing import BinaryIO, Iterator
+from django.conf import settings
+from django.core.files.uploadhandler import (FileUploadHandler, StopUpload)
+from django.http import QueryDict
+from rest_framework import status
+from rest_framework.fields import BooleanField
+from dashboard.functions.category import CategoryResolver
+from .import_functions import (PROFILE_SAMPLE_SIZE, parse_rows,
+                               get_import_columns, get_expense_objects)
+from .stream_functions import (RecordReader, iter_file_chunks)
+from .categorizer_functions import (VendorCategorizer,
+                                    get_user_categorizer)
+from .rule_functions import get_user_rules
+from .views_functions import (FingerprintFilter, insert_expense_batch,
+                              get_import_message)
+from login.functions.user import user_exists
+from login.utils.responses import (invalid_request_body, no_user_found)
+from ..utils.responses import (parse_csv_failed, import_csv_failed)
+
+
+# Name of multipart form field holding expense file data
+UPLOAD_FIELD_NAME = 'expense_file'
+GZIP_MAGIC = b'\x1f\x8b'
+# Most bytes decompressed at once from gzip data, so highly compressed
+# chunks are parsed and inserted piece by piece
+DECOMPRESS_CHUNK_SIZE = 256 * 1024
+
+
+def get_upload_options(query_params: QueryDict) -> list | None:
+    ''' get_upload_options: function to get import options sent as query
+            parameters, since multipart form fields following the file
+            are not parsed until after it has been streamed
+
+        Args:
+            query_params (QueryDict): query parameters from client request,
+                specifically must contain 'user' id and may contain
+                'has_heading' boolean
+
+        Returns:
+            list: list containing 'user' id and 'has_heading' boolean or
+                None if no 'user' id provided
+    '''
+    userId: str | None = query_params.get('user')
+    if not userId:
+        return None
+    has_heading: bool = query_params.get(
+        'has_heading', 'false') in BooleanField.TRUE_VALUES
+    return [userId, has_heading]
+
+
+def import_file_data(file: BinaryIO, has_heading: bool, userId: str) -> list:
+    ''' import_file_data: function to stream raw (optionally gzip
+            compressed) expense file data from request body, creating new
+            Expense instances in batches as rows are parsed
+
+        Args:
+            file (BinaryIO): readable stream of expense file data
+            has_heading (bool): whether file contains a heading row
+            userId (str): id for associated User instance
+
+        Returns:
+            list: list containing a human-readable response
+                message and a 'status' integer with standard
+                Http status code
+    '''
+    if not user_exists(userId):
+        return [no_user_found, status.HTTP_404_NOT_FOUND]
+    stream = ImportStream(userId, has_heading)
+    try:
+        for chunk in iter_file_chunks(file):
+            stream.feed(chunk)
+        return stream.close()
+    except (ValueError, zlib.error):
+        return [parse_csv_failed, status.HTTP_400_BAD_REQUEST]
+
+
+class ImportStream:
+    ''' ImportStream: class to import expense file data pushed to it in
+            chunks, decompressing gzip data, decoding and splitting csv
+            records incrementally and bulk creating Expense instances
+            once each batch is full
+
+        Args:
+            userId (str): id for associated User instance
+            has_heading (bool): whether file contains a heading row
+            batch_size (int): number of expenses validated and inserted
+                per batch (defaults to EXPENSE_IMPORT_BATCH_SIZE)
+    '''
+
+    def __init__(self, userId: str, has_heading: bool,
+                 batch_size: int | None = None) -> None:
+        self.userId: str = userId
+        self.has_heading: bool = has_heading
+        self.batch_size: int = (batch_size or
+                                settings.EXPENSE_IMPORT_BATCH_SIZE)
+        self.header: bytes | None = b''
+        self.decompressor = None
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.reader = RecordReader()
+        # Heading and sample rows held until column roles are found
+        self.sample: list | None = []
+        self.columns: list | None = None
+        self.resolver = CategoryResolver(userId)
+        # Kept for whole file, as each inserted batch invalidates it
+        self.categorizer: VendorCategorizer | None = None
+        self.rules = get_user_rules(userId)
+        self.fingerprints = FingerprintFilter()
+        self.pending: list = []
+        self.success_count: int = 0
+        self.failed_count: int = 0
+        self.skipped_count: int = 0
+
+    def feed(self, data: bytes) -> None:
+        ''' feed: function to import next chunk of expense file data
+
+            Args:
+                data (bytes): raw bytes chunk of expense file data
+        '''
+        if self.header is not None:
+            # Hold first bytes until gzip header can be detected
+            data = self.header + data
+            if len(data) < len(GZIP_MAGIC):
+                self.header = data
+                return
+            self.header = None
+            if data.startswith(GZIP_MAGIC):
+                self.decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+        if self.decompressor is None:
+            self.add_records(self.reader.feed(self.decoder.decode(data)))
+            return
+        while len(data) > 0:
+            text: str = self.decoder.decode(self.decompressor.decompress(
+                data, DECOMPRESS_CHUNK_SIZE))
+            self.add_records(self.reader.feed(text))
+            data = self.decompressor.unconsumed_tail
+
+    def close(self) -> list:
+        ''' close: function to import remaining expense file data once
+                all chunks have been fed
+
+            Returns:
+                list: list containing a human-readable response
+                    message and a 'status' integer with standard
+                    Http status code
+        '''
+        data: bytes = self.header or b''
+        if self.decompressor is not None:
+            data = self.decompressor.flush()
+            if not self.decompressor.eof:
+                raise zlib.error('Incomplete gzip data')
+        text: str = self.decoder.decode(data, final=True)
+        self.add_records(self.reader.feed(text) + self.reader.close(),
+                         final=True)
+        self.insert_pending()
+
+        if self.success_count == 0 and self.skipped_count == 0:
+            return [import_csv_failed, status.HTTP_400_BAD_REQUEST]
+        return [get_import_message(self.success_count, self.failed_count,
+                                   self.skipped_count), status.HTTP_200_OK]
+
+    def add_records(self, records: list, final: bool = False) -> None:
+        ''' add_records: function to parse csv records into Expense type
+                objects, inserting each full batch
+
+            Args:
+                records (list): list of rows of csv data
+                final (bool): whether these are the last rows of file
+        '''
+        if self.sample is not None:
+            self.sample += records
+            sample_size: int = PROFILE_SAMPLE_SIZE
+            if self.has_heading:
+                sample_size += 1
+            if len(self.sample) < sample_size and not final:
+                return
+            body: Iterator[str]
+            [body, self.columns] = get_import_columns(
+                iter(self.sample), self.has_heading, self.userId)
+            records = list(body)
+            self.sample = None
+
+        if self.categorizer is None:
+            self.categorizer = get_user_categorizer(self.userId)
+        parsed_rows: filter = filter(None, parse_rows(records, self.columns))
+        self.pending.extend(get_expense_objects(
+            parsed_rows, self.userId, self.resolver, self.categorizer,
+            self.rules))
+        while len(self.pending) >= self.batch_size:
+            self.insert_pending(self.batch_size)
+
+    def insert_pending(self, count: int | None = None) -> None:
+        ''' insert_pending: function to bulk create held Expense type
+                objects
+
+            Args:
+                count (int): number of held objects to insert (defaults
+                    to all)
+        '''
+        batch: list = self.pending[:count]
+        del self.pending[:len(batch)]
+        if len(batch) == 0:
+            return
+        [created, failed, skipped] = insert_expense_batch(batch,
+                                                          self.fingerprints)
+        self.success_count += created
+        self.failed_count += failed
+        self.skipped_count += skipped
+
+
+class ExpenseUploadHandler(FileUploadHandler):
+    ''' ExpenseUploadHandler: custom FileUploadHandler class that streams
+            the 'expense_file' multipart field directly into an ImportStream
+            instead of holding it in memory or a temporary file
+
+        Args:
+            FileUploadHandler (class): Django generic file upload
+                handler class
+    '''
+
+    def __init__(self, request=None) -> None:
+        super().__init__(request)
+        self.stream: ImportStream | None = None
+        self.handled: bool = False
+        self.response: list = [invalid_request_body,
+                                status.HTTP_400_BAD_REQUEST]
+
+    def new_file(self, field_name: str, *args, **kwargs) -> None:
+        super().new_file(field_name, *args, **kwargs)
+        options: list | None = get_upload_options(self.request.GET)
+        self.stream = None
+        # Only import first expense file field in each request
+        if (field_name != UPLOAD_FIELD_NAME or options is None or
+                self.handled):
+            return
+        [userId, has_heading] = options
+        self.handled = True
+        if not user_exists(userId):
+            self.response = [no_user_found, status.HTTP_404_NOT_FOUND]
+            return
+        self.stream = ImportStream(userId, has_heading)
+
+    def receive_data_chunk(self, raw_data: bytes, start: int) -> None:
+        # Returning None keeps file data from reaching other handlers
+        if self.stream is None:
+            return None
+        try:
+            self.stream.feed(raw_data)
+        except (ValueError, zlib.error):
+            self.stream = None
+            self.response = [parse_csv_failed, status.HTTP_400_BAD_REQUEST]
+            raise StopUpload(connection_reset=False)
+        return None
+
+    def file_complete(self, file_size: int) -> None:
+        if self.stream is None:
+            return None
+        try:
+            self.response = self.stream.close()
+        except (ValueError, zlib.error):
+            self.response = [parse_csv_failed, status.HTTP_400_BAD_REQUEST]
+        self.stream = None
+        return None
@@ -1,9 +1,21 @@
 from datetime import (datetime, timezone)
-from django.db.models import QuerySet
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (Count, QuerySet)
 from rest_framework import status
-from ..models import Expense
-from ..serializers import ExpenseSerializer
-from ..utils.responses import (no_expense_found, import_csv_failed)
+from rest_framework.exceptions import ValidationError
+from login.models.user import User
+from login.utils.responses import no_user_found
+from dashboard.models.category import Category
+from dashboard.serializers.category import CategoryReadSerializer
+from ..models import (Expense, Tombstone)
+from ..serializers import (ExpenseImportSerializer, ExpenseReadSerializer)
+from .rollup_functions import update_rollups
+from .sync_functions import set_changed
+from ..utils.responses import (no_expense_found, import_csv_failed,
+                               invalid_sync_token)
 
 
 def find_expenses_by_user(userId: str, type: str) -> list:
@@ -22,16 +34,14 @@ def find_expenses_by_user(userId: str, type: str) -> list:
                     integer with standard Http status code
     '''
     if type == 'current':
-        current_month: str = str(datetime.now(tz=timezone.utc).month)
-        current_year: str = str(datetime.now(tz=timezone.utc).year)
+        [start, end] = get_month_range(datetime.now(tz=timezone.utc))
         queryset: QuerySet[Expense] = Expense.objects.filter(
-            spend_date__year=current_year,
-            spend_date__month=current_month,
+            spend_date__gte=start, spend_date__lt=end,
             user=userId).order_by('spend_date')
     else:
         queryset: QuerySet[Expense] = Expense.objects.filter(
             user=userId).order_by('spend_date')
-    if len(queryset) == 0:
+    if not queryset.exists():
         return [no_expense_found, status.HTTP_404_NOT_FOUND]
     return [queryset, status.HTTP_200_OK]
 
@@ -72,11 +82,9 @@ def find_expenses_by_category(categoryId: str, userId: str, type: str) -> list:
                     integer with standard Http status code
     '''
     if type == 'current':
-        current_month: str = str(datetime.now(tz=timezone.utc).month)
-        current_year: str = str(datetime.now(tz=timezone.utc).year)
+        [start, end] = get_month_range(datetime.now(tz=timezone.utc))
         queryset: QuerySet[Expense] = Expense.objects.filter(
-            spend_date__year=current_year,
-            spend_date__month=current_month,
+            spend_date__gte=start, spend_date__lt=end,
             category=categoryId,
             user=userId).order_by('spend_date')
     else:
@@ -84,7 +92,7 @@ def find_expenses_by_category(categoryId: str, userId: str, type: str) -> list:
             category=categoryId,
             user=userId).order_by('spend_date')
 
-    if len(queryset) == 0:
+    if not queryset.exists():
         return [no_expense_found, status.HTTP_404_NOT_FOUND]
     return [queryset, status.HTTP_200_OK]
 
@@ -110,34 +118,274 @@ def get_expenses_by_range(userId: str, start_date: str,
     queryset: QuerySet[Expense] = Expense.objects.filter(
         spend_date__gte=str(start), spend_date__lte=str(end),
         user=userId).order_by('spend_date')
-    if len(queryset) == 0:
+    if not queryset.exists():
         return [no_expense_found, status.HTTP_404_NOT_FOUND]
     return [queryset, status.HTTP_200_OK]
 
 
-def create_expenses_for_import(new_expenses: list) -> list:
-    ''' create_expense_for_import: function to handle creating
-            new Expense instance using name from CSV import file
+def get_sync_changes(userId: str, token: str | None = None) -> list:
+    ''' get_sync_changes: function to get Expense and Category instances
+            of User instance created or updated, and ids of instances
+            deleted, since change sequence number of sync token (all
+            instances if no token), with token of returned changes
 
         Args:
-            new_expenses (list): list containing expense objects
+            userId (str): id for requested User instance
+            token (str): token returned by previous sync
 
         Returns:
-            list: list containing category ID string for success
-                or a human-readable response message if failed,
+            list: list containing dictionary of new 'token', 'expenses'
+                and 'categories' serializer data and 'deleted' expense
+                and category ids or a human-readable response message,
                 and a 'status' integer with standard Http status code
     '''
+    try:
+        since: int = 0 if token in [None, ''] else int(token)
+    except (TypeError, ValueError):
+        return [invalid_sync_token, status.HTTP_400_BAD_REQUEST]
+
+    # Token is read before changes, so changes committed in between are
+    # sent again next sync rather than missed
+    new_token: int | None = User.objects.filter(id=userId).values_list(
+        'change_seq', flat=True).first()
+    if new_token is None:
+        return [no_user_found, status.HTTP_404_NOT_FOUND]
+    if since < 0 or since > new_token:
+        return [invalid_sync_token, status.HTTP_400_BAD_REQUEST]
+
+    expenses: QuerySet[Expense] = Expense.objects.filter(user=userId)
+    categories: QuerySet[Category] = Category.objects.filter(user=userId)
+    deleted: dict = {Tombstone.EXPENSE: [], Tombstone.CATEGORY: []}
+    if token not in [None, '']:
+        expenses = expenses.filter(change_seq__gt=since)
+        categories = categories.filter(change_seq__gt=since)
+        tombstones: QuerySet = Tombstone.objects.filter(
+            user=userId, change_seq__gt=since).values_list(
+            'name', 'object_id').order_by('change_seq')
+        for [name, objectId] in tombstones:
+            deleted[name].append(str(objectId))
+
+    changes: dict = {
+        'token': str(new_token),
+        'expenses': ExpenseReadSerializer(ExpenseReadSerializer.get_values(
+            expenses.order_by('spend_date', 'id')), many=True).data,
+        'categories': CategoryReadSerializer(
+            CategoryReadSerializer.get_values(categories.order_by('name')),
+            many=True).data,
+        'deleted': {'expenses': deleted[Tombstone.EXPENSE],
+                    'categories': deleted[Tombstone.CATEGORY]}}
+    return [changes, status.HTTP_200_OK]
+
+
+def get_month_range(date: datetime) -> list:
+    ''' get_month_range: function to get half-open range of the month
+            containing date, so month filters can use spend_date indexes
+
+        Args:
+            date (datetime): utc datetime within requested month
+
+        Returns:
+            list: list containing start of month and start of
+                following month as utc datetimes
+    '''
+    start: datetime = datetime(date.year, date.month, 1, tzinfo=timezone.utc)
+    end: datetime = datetime(date.year + date.month // 12,
+                             date.month % 12 + 1, 1, tzinfo=timezone.utc)
+    return [start, end]
+
+
+def create_expenses_for_import(new_expenses: Iterable[dict],
+                               batch_size: int | None = None,
+                               before_insert: Callable | None = None,
+                               after_insert: Callable | None = None) -> list:
+    ''' create_expense_for_import: function to handle creating
+            new Expense instances from CSV import file in batches,
+            skipping rows already imported
+
+        Args:
+            new_expenses (Iterable[dict]): expense objects, consumed as
+                they are parsed so rows are saved while file is decoded
+            batch_size (int): number of expenses validated and inserted
+                per transaction (defaults to EXPENSE_IMPORT_BATCH_SIZE)
+            before_insert (Callable): function called before each batch
+                is inserted (ex: to create categories the batch references)
+            after_insert (Callable): function called with created, failed
+                and skipped counts within the transaction of each
+                inserted batch
+
+        Returns:
+            list: list containing a human-readable response message
+                with success, failed and skipped counts, and a 'status'
+                integer with standard Http status code
+    '''
+    if batch_size is None:
+        batch_size = settings.EXPENSE_IMPORT_BATCH_SIZE
+
+    fingerprints = FingerprintFilter()
     success_count: int = 0
     failed_count: int = 0
-    for expense in new_expenses:
-        serializer = ExpenseSerializer(data=expense)
-        if not serializer.is_valid():
-            failed_count += 1
-        else:
-            serializer.save()
-            success_count += 1
-    message: str = ('Success Count: ' + str(success_count) +
-                    ', Failed Count: ' + str(failed_count))
-    if success_count == 0:
+    skipped_count: int = 0
+    for batch in iter_batches(new_expenses, batch_size):
+        if before_insert is not None:
+            before_insert()
+        with transaction.atomic():
+            [created, failed, skipped] = insert_expense_batch(batch,
+                                                              fingerprints)
+            if after_insert is not None:
+                after_insert(created, failed, skipped)
+        success_count += created
+        failed_count += failed
+        skipped_count += skipped
+    if success_count == 0 and skipped_count == 0:
         return [import_csv_failed, status.HTTP_400_BAD_REQUEST]
+    message: str = get_import_message(success_count, failed_count,
+                                      skipped_count)
     return [message, status.HTTP_200_OK]
+
+
+def get_import_message(success_count: int, failed_count: int,
+                       skipped_count: int = 0) -> str:
+    ''' get_import_message: function to get human-readable message
+            of import results
+
+        Args:
+            success_count (int): number of expenses created
+            failed_count (int): number of expenses failing validation
+            skipped_count (int): number of expenses already imported
+
+        Returns:
+            message (str): human-readable response message
+    '''
+    message: str = ('Success Count: ' + str(success_count) +
+                    ', Failed Count: ' + str(failed_count) +
+                    ', Skipped Count: ' + str(skipped_count))
+    return message
+
+
+def iter_batches(items: Iterable, batch_size: int) -> Iterator[list]:
+    ''' iter_batches: function to group items into lists of batch_size
+
+        Args:
+            items (Iterable): items to be grouped
+            batch_size (int): maximum number of items per batch
+
+        Yields:
+            list: next batch of items
+    '''
+    iterator: Iterator = iter(items)
+    while True:
+        batch: list = list(islice(iterator, batch_size))
+        if len(batch) == 0:
+            return
+        yield batch
+
+
+class FingerprintFilter:
+    ''' FingerprintFilter: class to skip imported expenses matching
+            Expense instances that existed before the import started,
+            comparing fingerprint counts so repeated identical rows
+            within a file are only skipped as many times as they exist
+    '''
+
+    def __init__(self) -> None:
+        self.seen: dict = {}
+        self.inserted: dict = {}
+
+    def filter(self, expenses: list) -> list:
+        ''' filter: function to look up fingerprints of a batch of
+                expenses with one indexed query and remove those already
+                imported
+
+            Args:
+                expenses (list): list containing Expense instances with
+                    fingerprint set
+
+            Returns:
+                new_expenses (list): list containing Expense instances
+                    to be created
+        '''
+        existing: dict = {}
+        user_ids: set = {expense.user_id for expense in expenses}
+        for userId in user_ids:
+            keys: set = {expense.fingerprint for expense in expenses
+                         if expense.user_id == userId}
+            for row in Expense.objects.filter(
+                    user=userId, fingerprint__in=keys).values(
+                    'fingerprint').annotate(count=Count('id')):
+                existing[(userId, row['fingerprint'])] = row['count']
+
+        new_expenses: list = []
+        for expense in expenses:
+            key: tuple = (expense.user_id, expense.fingerprint)
+            self.seen[key] = self.seen.get(key, 0) + 1
+            # Ignore rows created by earlier batches of this import
+            existing_count: int = (existing.get(key, 0) -
+                                   self.inserted.get(key, 0))
+            if self.seen[key] > existing_count:
+                self.inserted[key] = self.inserted.get(key, 0) + 1
+                new_expenses.append(expense)
+        return new_expenses
+
+
+def insert_expense_batch(batch: list,
+                         fingerprints: FingerprintFilter | None = None
+                         ) -> list:
+    ''' insert_expense_batch: function to validate a batch of expense
+            objects, checking all referenced User and Category ids and
+            existing fingerprints with one query each, then bulk create
+            valid rows in one transaction
+
+        Args:
+            batch (list): list containing expense objects
+            fingerprints (FingerprintFilter): filter shared across the
+                whole import to skip rows already imported
+
+        Returns:
+            list: list containing number of created expenses, number of
+                failed expenses and number of skipped expenses
+    '''
+    if fingerprints is None:
+        fingerprints = FingerprintFilter()
+
+    serializer = ExpenseImportSerializer()
+    expenses: list = []
+    failed_count: int = 0
+    for expense in batch:
+        try:
+            data: dict = serializer.to_internal_value(expense)
+        except ValidationError:
+            failed_count += 1
+            continue
+        expenses.append(Expense(user_id=data.pop('user'),
+                                category_id=data.pop('category', None),
+                                **data))
+
+    user_ids: set = {expense.user_id for expense in expenses}
+    category_ids: set = {expense.category_id for expense in expenses
+                         if expense.category_id is not None}
+    valid_users: set = set(User.objects.filter(
+        id__in=user_ids).values_list('id', flat=True))
+    valid_categories: set = set()
+    if len(category_ids) > 0:
+        valid_categories = set(Category.objects.filter(
+            id__in=category_ids).values_list('id', flat=True))
+
+    valid_expenses: list = []
+    for expense in expenses:
+        if expense.user_id not in valid_users or (
+                expense.category_id is not None and
+                expense.category_id not in valid_categories):
+            failed_count += 1
+        else:
+            expense.fingerprint = expense.get_fingerprint()
+            valid_expenses.append(expense)
+
+    new_expenses: list = fingerprints.filter(valid_expenses)
+    with transaction.atomic():
+        for userId in {expense.user_id for expense in new_expenses}:
+            set_changed([expense for expense in new_expenses
+                         if expense.user_id == userId], userId)
+        Expense.objects.bulk_create(new_expenses)
+        update_rollups(new_expenses)
+    return [len(new_expenses), failed_count,
+            len(valid_expenses) - len(new_expenses)]
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db.models import QuerySet
+from ...models import Expense
+
+
+class Command(BaseCommand):
+    ''' Command: 'manage.py backfill_fingerprints' command to set
+            fingerprint of Expense instances created before it existed,
+            so re-imports of older statements are detected
+
+        Args:
+            BaseCommand (class): Django generic management command class
+    '''
+    help = 'Set missing fingerprints on existing expenses.'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of expenses updated per query.')
+
+    def handle(self, *args, **options) -> None:
+        queryset: QuerySet[Expense] = Expense.objects.filter(
+            fingerprint='').only('id', 'user', 'spend_date', 'amount',
+                                 'type', 'vendor')
+        batch: list = []
+        updated: int = 0
+        for expense in queryset.iterator(chunk_size=options['batch_size']):
+            expense.fingerprint = expense.get_fingerprint()
+            batch.append(expense)
+            if len(batch) >= options['batch_size']:
+                updated += Expense.objects.bulk_update(batch, ['fingerprint'])
+                batch = []
+        if len(batch) > 0:
+            updated += Expense.objects.bulk_update(batch, ['fingerprint'])
+        self.stdout.write('Fingerprints set: ' + str(updated))
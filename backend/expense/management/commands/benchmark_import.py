@@ -0,0 +1,132 @@
+import json
+import platform
+import subprocess
+from datetime import (datetime, timezone)
+from django.conf import settings
+from django.core.management.base import (BaseCommand, CommandError)
+from ...benchmarks.import_benchmark import (PHASE_LIST,
+                                            run_import_benchmark)
+
+
+class Command(BaseCommand):
+    ''' Command: 'manage.py benchmark_import' command to time each phase
+            of the import pipeline on synthetic bank export csv files,
+            writing results as JSON and optionally comparing them with a
+            previous run to catch throughput regressions
+
+        Args:
+            BaseCommand (class): Django generic management command class
+    '''
+    help = 'Benchmark import pipeline phases and write results as JSON.'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--rows', type=int, nargs='+',
+                            default=[1000, 10000, 100000],
+                            help='Row counts of synthetic files to import.')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Seed for synthetic file generator.')
+        parser.add_argument('--no-insert', action='store_true',
+                            help='Skip insert phase.')
+        parser.add_argument('--no-memory', action='store_true',
+                            help='Skip tracemalloc peak memory pass.')
+        parser.add_argument('--classifier', action='store_true',
+                            help=('Classify every cell instead of parsing ' +
+                                  'by inferred column roles.'))
+        parser.add_argument('--output', default=None,
+                            help='File to write JSON results to.')
+        parser.add_argument('--baseline', default=None,
+                            help='JSON results of previous run to compare.')
+        parser.add_argument('--threshold', type=float, default=0.1,
+                            help='Allowed rows/sec drop versus baseline.')
+
+    def handle(self, *args, **options) -> None:
+        results: list = []
+        for count in options['rows']:
+            result: dict = run_import_benchmark(
+                count, options['seed'], insert=not options['no_insert'],
+                memory=not options['no_memory'],
+                classifier=options['classifier'])
+            results.append(result)
+            self.stderr.write(str(count) + ' rows: ' +
+                              '{:.2f}'.format(result['seconds']) + 's, ' +
+                              '{:,.0f}'.format(result['rows_per_sec']) +
+                              ' rows/sec')
+
+        report: dict = {
+            'commit': get_commit(),
+            'date': datetime.now(tz=timezone.utc).replace(
+                microsecond=0).isoformat(),
+            'python': platform.python_version(),
+            'seed': options['seed'],
+            'results': results}
+        output: str = json.dumps(report, indent=2)
+        if options['output'] is None:
+            self.stdout.write(output)
+        else:
+            with open(options['output'], 'w') as file:
+                file.write(output + '\n')
+
+        if options['baseline'] is not None:
+            with open(options['baseline']) as file:
+                baseline: dict = json.load(file)
+            regressions: list = get_regressions(
+                baseline, report, options['threshold'])
+            if len(regressions) > 0:
+                raise CommandError('Throughput regressions:\n' +
+                                   '\n'.join(regressions))
+            self.stderr.write('No regressions versus ' +
+                              str(baseline.get('commit')))
+
+
+def get_regressions(baseline: dict, report: dict, threshold: float) -> list:
+    ''' get_regressions: function to compare rows per second of each phase
+            for row counts found in both benchmark reports
+
+        Args:
+            baseline (dict): benchmark report of previous run
+            report (dict): benchmark report of current run
+            threshold (float): allowed fraction drop in rows per second
+
+        Returns:
+            regressions (list): list of human-readable regression strings
+    '''
+    baseline_results: dict = {result['rows']: result
+                              for result in baseline['results']}
+    regressions: list = []
+    for result in report['results']:
+        previous: dict | None = baseline_results.get(result['rows'])
+        if previous is None:
+            continue
+        for name in PHASE_LIST + ['total']:
+            if name == 'total':
+                # Totals only comparable when same phases were run
+                if set(result['phases']) != set(previous['phases']):
+                    continue
+                [old, new] = [previous['rows_per_sec'],
+                              result['rows_per_sec']]
+            elif name in result['phases'] and name in previous['phases']:
+                [old, new] = [previous['phases'][name]['rows_per_sec'],
+                              result['phases'][name]['rows_per_sec']]
+            else:
+                continue
+            if new < old * (1 - threshold):
+                regressions.append(
+                    str(result['rows']) + ' rows ' + name + ': ' +
+                    '{:,.0f}'.format(old) + ' -> ' + '{:,.0f}'.format(new) +
+                    ' rows/sec')
+    return regressions
+
+
+def get_commit() -> str | None:
+    ''' get_commit: function to get current git commit hash so results
+            can be compared between commits
+
+        Returns:
+            commit (str): commit hash or None if not a git checkout
+    '''
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,40 @@
+import time
+from django.core.management.base import BaseCommand
+from ...benchmarks.generator import generate_rows
+from ...functions.import_functions import parse_data
+from ...functions.categorizer_functions import VendorCategorizer
+from ...functions.rule_functions import RuleMatcher
+
+
+class Command(BaseCommand):
+    ''' Command: 'manage.py benchmark_parse' command to measure rows per
+            second of the import row classifier on a synthetic file
+
+        Args:
+            BaseCommand (class): Django generic management command class
+    '''
+    help = 'Measure import parse_data throughput on synthetic csv rows.'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--rows', type=int, default=1000000,
+                            help='Number of synthetic rows to parse.')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Number of timed runs (best is reported).')
+
+    def handle(self, *args, **options) -> None:
+        rows: list = list(generate_rows(options['rows']))
+        best: float | None = None
+        parsed: int = 0
+        for _ in range(options['repeat']):
+            start: float = time.perf_counter()
+            parsed = sum(1 for _ in parse_data(
+                rows, '', categorizer=VendorCategorizer(),
+                rules=RuleMatcher([])))
+            elapsed: float = time.perf_counter() - start
+            if best is None or elapsed < best:
+                best = elapsed
+
+        self.stdout.write('Rows parsed: ' + str(parsed) + ' of ' +
+                          str(len(rows)))
+        self.stdout.write('Best time: ' + '{:.2f}'.format(best) + 's')
+        self.stdout.write('Rows/sec: ' + '{:,.0f}'.format(len(rows) / best))
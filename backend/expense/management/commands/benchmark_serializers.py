@@ -0,0 +1,54 @@
+import json
+import platform
+from datetime import (datetime, timezone)
+from django.core.management.base import BaseCommand
+from ...benchmarks.serializer_benchmark import run_serializer_benchmark
+from .benchmark_import import get_commit
+
+
+class Command(BaseCommand):
+    ''' Command: 'manage.py benchmark_serializers' command to compare rows
+            per second of model serializers against values() based read
+            serializers for Expense and Category lists, writing results
+            as JSON
+
+        Args:
+            BaseCommand (class): Django generic management command class
+    '''
+    help = 'Benchmark read serializers against model serializers.'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--rows', type=int, nargs='+',
+                            default=[10000, 100000],
+                            help='Number of rows to serialize.')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Seed for synthetic row generator.')
+        parser.add_argument('--output', default=None,
+                            help='File to write JSON results to.')
+
+    def handle(self, *args, **options) -> None:
+        results: list = []
+        for count in options['rows']:
+            result: dict = run_serializer_benchmark(count, options['seed'])
+            results.append(result)
+            for name in ['expense', 'category']:
+                self.stderr.write(
+                    str(count) + ' rows ' + name + ': ' +
+                    '{:,.0f}'.format(result[name]['model']['rows_per_sec']) +
+                    ' -> ' +
+                    '{:,.0f}'.format(result[name]['read']['rows_per_sec']) +
+                    ' rows/sec')
+
+        report: dict = {
+            'commit': get_commit(),
+            'date': datetime.now(tz=timezone.utc).replace(
+                microsecond=0).isoformat(),
+            'python': platform.python_version(),
+            'seed': options['seed'],
+            'results': results}
+        output: str = json.dumps(report, indent=2)
+        if options['output'] is None:
+            self.stdout.write(output)
+        else:
+            with open(options['output'], 'w') as file:
+                file.write(output + '\n')
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db.models import QuerySet
+from login.models.user import User
+from ...functions.snapshot_functions import refresh_snapshot
+
+
+class Command(BaseCommand):
+    ''' Command: 'manage.py build_snapshots' command to build or refresh
+            columnar expense snapshots ahead of range summary requests
+            (after deploying, so first requests of users are not served
+            from expense rows while snapshots are built in background)
+
+        Args:
+            BaseCommand (class): Django generic management command class
+    '''
+    help = 'Build or refresh columnar expense snapshots of users.'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--user', default=None,
+                            help='Id of user to build (default all).')
+
+    def handle(self, *args, **options) -> None:
+        users: QuerySet = User.objects.values_list('id', flat=True)
+        if options['user'] is not None:
+            users = users.filter(id=options['user'])
+        built: int = 0
+        for userId in users.iterator():
+            if refresh_snapshot(str(userId)) is not None:
+                built += 1
+        self.stdout.write('Snapshots built: ' + str(built))
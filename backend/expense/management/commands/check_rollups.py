@@ -0,0 +1,25 @@
+from django.core.management.base import (BaseCommand, CommandError)
+from ...functions.rollup_functions import check_rollups
+
+
+class Command(BaseCommand):
+    ''' Command: 'manage.py check_rollups' command to compare monthly
+            expense rollups with totals computed from expense rows,
+            failing if any differ
+
+        Args:
+            BaseCommand (class): Django generic management command class
+    '''
+    help = 'Compare monthly expense rollups with expenses.'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--user', default=None,
+                            help='Id of user to check (default all).')
+
+    def handle(self, *args, **options) -> None:
+        mismatches: list = check_rollups(options['user'])
+        for mismatch in mismatches:
+            self.stderr.write(mismatch)
+        if len(mismatches) > 0:
+            raise CommandError('Rollup mismatches: ' + str(len(mismatches)))
+        self.stdout.write('Rollups consistent.')
@@ -0,0 +1,211 @@
+import os
+import glob
+import fnmatch
+import json
+import mmap
+import time
+import django
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Iterator
+from django.core.management.base import (BaseCommand, CommandError)
+from dashboard.functions.category import CategoryResolver
+from login.functions.user import user_exists
+from ...functions.import_functions import (get_import_columns,
+                                           get_expense_objects)
+from ...functions.shard_functions import (SHARD_SIZE,
+                                          SHARDS_AHEAD_PER_WORKER,
+                                          get_shard_ranges,
+                                          iter_parsed_shards)
+from ...functions.stream_functions import (iter_file_chunks,
+                                           iter_text_chunks, iter_records)
+from ...functions.views_functions import create_expenses_for_import
+
+
+class Command(BaseCommand):
+    ''' Command: 'manage.py import_expenses' command to import directories
+            or globs of csv bank exports, parsing shards of each file in
+            parallel worker processes and inserting rows in batches
+
+        Args:
+            BaseCommand (class): Django generic management command class
+    '''
+    help = ('Import csv expense files for one or more users, parsing ' +
+            'in parallel and writing rows through a single batched writer.')
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('paths', nargs='+',
+                            help='Csv files, directories or glob patterns.')
+        parser.add_argument('--user',
+                            help='User id to import all files for.')
+        parser.add_argument('--user-map',
+                            help=('Json file mapping file name or glob ' +
+                                  'pattern to user id.'))
+        parser.add_argument('--has-heading', action='store_true',
+                            help='Files contain a heading row.')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help='Number of parse worker processes.')
+        parser.add_argument('--shard-size', type=int,
+                            default=SHARD_SIZE // (1024 * 1024),
+                            help='Approximate megabytes parsed per task.')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Number of rows inserted per transaction.')
+        parser.add_argument('--dry-run', action='store_true',
+                            help=('Parse files without inserting rows, ' +
+                                  'to measure parse throughput.'))
+
+    def handle(self, *args, **options) -> None:
+        if options['user'] is None and options['user_map'] is None:
+            raise CommandError('Either --user or --user-map is required.')
+        user_map: dict = {}
+        if options['user_map'] is not None:
+            with open(options['user_map']) as file:
+                user_map = json.load(file)
+
+        file_paths: list = get_file_paths(options['paths'])
+        if len(file_paths) == 0:
+            raise CommandError('No csv files found.')
+
+        # Users are checked before any file is parsed
+        file_users: list = []
+        for file_path in file_paths:
+            userId: str | None = get_user_id(file_path, options['user'],
+                                             user_map)
+            if not user_exists(userId):
+                self.stderr.write('Skipped (no user): ' + file_path)
+                continue
+            file_users.append([file_path, userId])
+
+        totals: dict = {'files': 0, 'rows': 0, 'inserted': 0, 'failed': 0,
+                        'skipped': 0, 'bytes': 0}
+        start: float = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=options['workers'],
+                                 initializer=django.setup) as executor:
+            for [file_path, userId] in file_users:
+                result: dict = self.import_file(executor, file_path, userId,
+                                                options)
+                self.write_result(file_path, result)
+                totals['files'] += 1
+                for key in ['rows', 'inserted', 'failed', 'skipped',
+                            'bytes']:
+                    totals[key] += result[key]
+        totals['seconds'] = time.perf_counter() - start
+        self.write_result('Total (' + str(totals['files']) + ' files)',
+                          totals)
+
+    def import_file(self, executor: ProcessPoolExecutor, file_path: str,
+                    userId: str, options: dict) -> dict:
+        ''' import_file: function to parse shards of a single file in
+                worker processes and insert resulting rows in batches
+
+            Args:
+                executor (ProcessPoolExecutor): pool of parse workers
+                file_path (str): path of expense file to be imported
+                userId (str): id for associated User instance
+                options (dict): parsed command options
+
+            Returns:
+                dict: dictionary containing number of rows parsed,
+                    inserted, failed and skipped, bytes read and seconds taken
+        '''
+        start: float = time.perf_counter()
+        result: dict = {'rows': 0, 'inserted': 0, 'failed': 0, 'skipped': 0,
+                        'bytes': 0, 'seconds': 0}
+        size: int = os.path.getsize(file_path)
+        if size == 0:
+            return result
+
+        with open(file_path, 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                ranges: list = get_shard_ranges(
+                    data, options['shard_size'] * 1024 * 1024)
+
+        # Find column roles once from heading and first rows of file
+        with open(file_path, 'rb') as file:
+            columns: list | None = get_import_columns(
+                iter_records(iter_text_chunks(iter_file_chunks(file))),
+                options['has_heading'], userId)[1]
+
+        shards: Iterator[list] = iter_parsed_shards(
+            executor, file_path, ranges, options['has_heading'], columns,
+            max(options['workers'] or 1, 1) * SHARDS_AHEAD_PER_WORKER)
+
+        def after_insert(created: int, failed: int, skipped: int) -> None:
+            result['inserted'] += created
+            result['failed'] += failed
+            result['skipped'] += skipped
+            result['rows'] += created + failed + skipped
+
+        if options['dry_run']:
+            for parsed_rows in shards:
+                result['rows'] += len(parsed_rows)
+            result['bytes'] = size
+            result['seconds'] = time.perf_counter() - start
+            return result
+
+        resolver = CategoryResolver(userId)
+        new_expenses: Iterator[dict] = get_expense_objects(
+            chain.from_iterable(shards), userId, resolver)
+        create_expenses_for_import(
+            new_expenses, batch_size=options['batch_size'],
+            before_insert=resolver.create_pending, after_insert=after_insert)
+        result['bytes'] = size
+        result['seconds'] = time.perf_counter() - start
+        return result
+
+    def write_result(self, name: str, result: dict) -> None:
+        # Write rows, throughput and timing for a file or all files
+        seconds: float = max(result['seconds'], 0.000001)
+        self.stdout.write(
+            name + ': ' + str(result['rows']) + ' rows (' +
+            str(result['inserted']) + ' inserted, ' +
+            str(result['failed']) + ' failed, ' +
+            str(result['skipped']) + ' skipped) in ' +
+            '{:.2f}'.format(result['seconds']) + 's, ' +
+            '{:,.0f}'.format(result['rows'] / seconds) + ' rows/sec, ' +
+            '{:.2f}'.format(result['bytes'] / seconds / 1024 / 1024) +
+            ' MB/sec')
+
+
+def get_file_paths(paths: list) -> list:
+    ''' get_file_paths: function to expand files, directories and glob
+            patterns into sorted list of csv file paths
+
+        Args:
+            paths (list): list of file, directory or glob pattern strings
+
+        Returns:
+            list: list of csv file paths
+    '''
+    file_paths: list = []
+    for path in paths:
+        if os.path.isdir(path):
+            file_paths += glob.glob(os.path.join(path, '*.csv'))
+        elif os.path.isfile(path):
+            file_paths.append(path)
+        else:
+            file_paths += glob.glob(path)
+    return sorted(set(file_paths))
+
+
+def get_user_id(file_path: str, userId: str | None,
+                user_map: dict) -> str | None:
+    ''' get_user_id: function to get user id for file from mapping of
+            file names or glob patterns, falling back to default user id
+
+        Args:
+            file_path (str): path of expense file to be imported
+            userId (str): default user id for all files
+            user_map (dict): dictionary mapping file name or glob pattern
+                to user id
+
+        Returns:
+            userId (str): id for associated User instance or None
+    '''
+    name: str = os.path.basename(file_path)
+    if name in user_map:
+        return user_map[name]
+    for pattern, mapped_user in user_map.items():
+        if fnmatch.fnmatch(name, pattern):
+            return mapped_user
+    return userId
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from ...functions.rollup_functions import rebuild_rollups
+
+
+class Command(BaseCommand):
+    ''' Command: 'manage.py rebuild_rollups' command to recompute monthly
+            expense rollups from expense rows (after creating the rollup
+            table on an existing database, or if check_rollups reports
+            mismatches)
+
+        Args:
+            BaseCommand (class): Django generic management command class
+    '''
+    help = 'Recompute monthly expense rollups from expenses.'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--user', default=None,
+                            help='Id of user to rebuild (default all).')
+
+    def handle(self, *args, **options) -> None:
+        created: int = rebuild_rollups(options['user'])
+        self.stdout.write('Rollups created: ' + str(created))
@@ -0,0 +1,23 @@
+from django.core.management.base import (BaseCommand, CommandError)
+from django.db import connection
+from ...functions.search_functions import (create_search_index,
+                                            rebuild_search_index)
+
+
+class Command(BaseCommand):
+    ''' Command: 'manage.py rebuild_search' command to recreate the expense
+            search table and its triggers and reindex every expense (after
+            VACUUM, which may renumber rowids, or bulk loads made without
+            triggers)
+
+        Args:
+            BaseCommand (class): Django generic management command class
+    '''
+    help = 'Rebuild full-text search index of expenses (SQLite only).'
+
+    def handle(self, *args, **options) -> None:
+        if connection.vendor != 'sqlite':
+            raise CommandError('Search index requires SQLite FTS5.')
+        create_search_index()
+        rebuild_search_index()
+        self.stdout.write('Search index rebuilt.')
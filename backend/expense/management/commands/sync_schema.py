@@ -0,0 +1,107 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connection
+from ...functions.search_functions import (create_search_index,
+                                            rebuild_search_index)
+
+
+# Apps created with 'migrate --run-syncdb' (no migrations package)
+SYNC_APP_LIST = ['login', 'dashboard', 'expense']
+
+
+class Command(BaseCommand):
+    ''' Command: 'manage.py sync_schema' command to add columns, indexes
+            and constraints declared on models to tables created by an
+            earlier 'migrate --run-syncdb', which only creates new tables
+
+        Args:
+            BaseCommand (class): Django generic management command class
+    '''
+    help = 'Add missing model columns, indexes and constraints.'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('--dry-run', action='store_true',
+                            help='List changes without applying them.')
+
+    def handle(self, *args, **options) -> None:
+        with connection.cursor() as cursor:
+            tables: list = connection.introspection.table_names(cursor)
+        changes: int = 0
+        for app_label in SYNC_APP_LIST:
+            for model in apps.get_app_config(app_label).get_models():
+                if model._meta.db_table not in tables:
+                    continue
+                changes += self.sync_model(model, options['dry_run'])
+        if changes > 0 and not options['dry_run']:
+            # SQLite table rebuilds drop triggers and may renumber rowids
+            # of expenses, so search table is recreated and reindexed
+            create_search_index()
+            if connection.vendor == 'sqlite':
+                rebuild_search_index()
+        self.stdout.write('Changes: ' + str(changes))
+
+    def sync_model(self, model, dry_run: bool) -> int:
+        ''' sync_model: function to add missing columns, then missing
+                constraints and indexes, to table of a single model
+                (checking again after each change, since SQLite rebuilds
+                the whole table for some changes)
+
+            Args:
+                model (Model): Django model class
+                dry_run (bool): whether to only list changes
+
+            Returns:
+                changes (int): number of changes made or found
+        '''
+        table: str = model._meta.db_table
+        changes: int = 0
+        for field in model._meta.local_concrete_fields:
+            if field.column in get_column_names(table):
+                continue
+            changes += 1
+            self.stdout.write(table + ': add ' + field.column)
+            if not dry_run:
+                with connection.schema_editor() as schema_editor:
+                    schema_editor.add_field(model, field)
+
+        for item in model._meta.constraints + model._meta.indexes:
+            if item.name in get_constraint_names(table):
+                continue
+            changes += 1
+            self.stdout.write(table + ': add ' + item.name)
+            if dry_run:
+                continue
+            with connection.schema_editor() as schema_editor:
+                if item in model._meta.indexes:
+                    schema_editor.add_index(model, item)
+                else:
+                    schema_editor.add_constraint(model, item)
+        return changes
+
+
+def get_column_names(table: str) -> set:
+    ''' get_column_names: function to get column names of table
+
+        Args:
+            table (str): database table name
+
+        Returns:
+            set: set of column names
+    '''
+    with connection.cursor() as cursor:
+        return {column.name for column in
+                connection.introspection.get_table_description(cursor, table)}
+
+
+def get_constraint_names(table: str) -> set:
+    ''' get_constraint_names: function to get index and constraint
+            names of table
+
+        Args:
+            table (str): database table name
+
+        Returns:
+            set: set of index and constraint names
+    '''
+    with connection.cursor() as cursor:
+        return set(connection.introspection.get_constraints(cursor, table))
@@ -1,5 +1,8 @@
+import re
 import uuid
+from datetime import datetime
 from decimal import Decimal
+from hashlib import sha256
 from django.core.validators import (MinLengthValidator, MaxLengthValidator,
                                     MinValueValidator, MaxValueValidator)
 from django.db import models
@@ -8,6 +11,9 @@ from login.models.user import User
 from dashboard.models.category import Category
 
 
+VENDOR_NORMALIZE_REGEX = re.compile(r'[^0-9a-z]+')
+
+
 class Expense(models.Model):
     ''' Expense: custom Expense model associated to
             User model by foreign key
@@ -55,6 +61,34 @@ class Expense(models.Model):
                 message=('Value must be: 0 (Deposit) or 1 (Withdrawal)'))])
     spend_date = CustomDateTimeField(blank=False, null=False)
     date_created = CustomDateTimeField(blank=False, null=False)
+    # Hash of user, spend date, amount, type and vendor to detect re-imports
+    fingerprint = models.CharField(max_length=64, blank=True, null=False,
+                                   default='', editable=False)
+    # Change sequence number and date of last create or update (see
+    # expense sync)
+    change_seq = models.BigIntegerField(blank=False, null=False, default=0,
+                                        editable=False)
+    updated_at = CustomDateTimeField(blank=True, null=True, editable=False)
+
+    def get_fingerprint(self) -> str:
+        ''' get_fingerprint: function to hash values identifying the same
+                transaction across imports, ignoring time of day and
+                vendor case, punctuation and spacing
+
+            Returns:
+                fingerprint (str): sha256 hex digest of expense values
+        '''
+        spend_date: datetime = self.spend_date
+        amount: Decimal = Decimal(str(self.amount)).quantize(Decimal('0.01'))
+        vendor: str = ' '.join(
+            VENDOR_NORMALIZE_REGEX.sub(' ', self.vendor.lower()).split())
+        values: list = [str(self.user_id), spend_date.strftime('%Y-%m-%d'),
+                        str(amount), str(self.type), vendor]
+        return sha256('|'.join(values).encode()).hexdigest()
+
+    def save(self, *args, **kwargs) -> None:
+        self.fingerprint = self.get_fingerprint()
+        super().save(*args, **kwargs)
 
     def get_display_string(self) -> str:
         spend_date_string: str = self.spend_date.strftime('%m-%d-%Y')
@@ -76,3 +110,213 @@ class Expense(models.Model):
     class Meta:
         verbose_name_plural = 'Expenses'
         db_table = 'expense_expenses'
+        indexes = [models.Index(fields=['user', 'spend_date', 'id'],
+                                name='expense_user_date_id_idx'),
+                   models.Index(fields=['user', 'category', 'spend_date'],
+                                name='expense_user_category_date_idx'),
+                   models.Index(fields=['user', 'fingerprint'],
+                                name='expense_user_fingerprint_idx'),
+                   models.Index(fields=['user', 'change_seq'],
+                                name='expense_user_change_seq_idx')]
+
+
+class ImportJob(models.Model):
+    ''' ImportJob: custom ImportJob model associated to User model by
+            foreign key, tracking state of a stored expense file being
+            imported in the background
+
+        Args:
+            Model (class): Django generic model class
+    '''
+    QUEUED = 0
+    RUNNING = 1
+    COMPLETED = 2
+    FAILED = 3
+    CANCELLED = 4
+
+    id = models.UUIDField(primary_key=True,
+                          default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, blank=False, null=False,
+                             on_delete=models.CASCADE,
+                             related_name='import_jobs')
+    status = models.SmallIntegerField(
+        blank=False, null=False, default=QUEUED,
+        validators=[
+            MinValueValidator(
+                limit_value=0,
+                message=('Value must be: 0 (Queued), 1 (Running), ' +
+                         '2 (Completed), 3 (Failed) or 4 (Cancelled)')),
+            MaxValueValidator(
+                limit_value=4,
+                message=('Value must be: 0 (Queued), 1 (Running), ' +
+                         '2 (Completed), 3 (Failed) or 4 (Cancelled)'))])
+    file_path = models.CharField(max_length=255, blank=False, null=False)
+    # 'host:pid' of worker process running job
+    worker = models.CharField(max_length=255, blank=True, null=False)
+    has_heading = models.BooleanField(blank=False, null=False)
+    file_size = models.BigIntegerField(blank=False, null=False, default=0)
+    bytes_read = models.BigIntegerField(blank=False, null=False, default=0)
+    rows_parsed = models.IntegerField(blank=False, null=False, default=0)
+    rows_inserted = models.IntegerField(blank=False, null=False, default=0)
+    rows_failed = models.IntegerField(blank=False, null=False, default=0)
+    rows_skipped = models.IntegerField(blank=False, null=False, default=0)
+    message = models.CharField(max_length=250, blank=True, null=False)
+    date_created = CustomDateTimeField(blank=False, null=False)
+    date_started = CustomDateTimeField(blank=True, null=True)
+    date_updated = CustomDateTimeField(blank=True, null=True)
+    date_finished = CustomDateTimeField(blank=True, null=True)
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in [ImportJob.QUEUED, ImportJob.RUNNING]
+
+    def __str__(self) -> str:
+        return str(self.id)
+
+    class Meta:
+        verbose_name_plural = 'Import Jobs'
+        db_table = 'expense_import_jobs'
+
+
+class ImportProfile(models.Model):
+    ''' ImportProfile: custom ImportProfile model associated to User
+            model by foreign key, storing column roles inferred from an
+            import file heading so later files with the same heading are
+            parsed positionally without inference
+
+        Args:
+            Model (class): Django generic model class
+    '''
+    id = models.UUIDField(primary_key=True,
+                          default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, blank=False, null=False,
+                             on_delete=models.CASCADE,
+                             related_name='import_profiles')
+    # Hash of normalized heading cells
+    signature = models.CharField(max_length=64, blank=False, null=False)
+    heading = models.CharField(max_length=500, blank=True, null=False)
+    date_column = models.SmallIntegerField(blank=False, null=False)
+    amount_column = models.SmallIntegerField(blank=False, null=False)
+    vendor_column = models.SmallIntegerField(blank=False, null=False)
+    category_column = models.SmallIntegerField(blank=True, null=True)
+    date_created = CustomDateTimeField(blank=False, null=False)
+
+    def get_columns(self) -> list:
+        return [self.date_column, self.amount_column, self.vendor_column,
+                self.category_column]
+
+    def __str__(self) -> str:
+        return self.heading
+
+    class Meta:
+        verbose_name_plural = 'Import Profiles'
+        db_table = 'expense_import_profiles'
+        constraints = [models.UniqueConstraint(
+            fields=['user', 'signature'],
+            name='expense_import_profile_unique')]
+
+
+class CategoryRule(models.Model):
+    ''' CategoryRule: custom CategoryRule model associated to User and
+            Category models by foreign key, giving its category to
+            expenses whose vendor contains any of its keywords (ignoring
+            case), rules with lower priority number taking precedence
+
+        Args:
+            Model (class): Django generic model class
+    '''
+    id = models.UUIDField(primary_key=True,
+                          default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, blank=False, null=False,
+                             on_delete=models.CASCADE,
+                             related_name='category_rules')
+    category = models.ForeignKey(Category, blank=False, null=False,
+                                 on_delete=models.CASCADE,
+                                 related_name='rules')
+    # Comma separated keywords (ex: 'AMZN, AMAZON')
+    keywords = models.CharField(
+        max_length=250, blank=False, null=False,
+        validators=[MinLengthValidator(limit_value=2,
+                                       message=('Must be at least ' +
+                                                '2 characters.'))])
+    priority = models.SmallIntegerField(blank=False, null=False, default=0)
+    date_created = CustomDateTimeField(blank=False, null=False)
+    # Kept with microseconds, as it identifies version of compiled rules
+    date_updated = CustomDateTimeField(blank=False, null=False)
+
+    def __str__(self) -> str:
+        return self.keywords
+
+    class Meta:
+        verbose_name_plural = 'Category Rules'
+        db_table = 'expense_category_rules'
+        indexes = [models.Index(fields=['user', 'priority'],
+                                name='category_rule_user_idx')]
+
+
+class ExpenseRollup(models.Model):
+    ''' ExpenseRollup: custom ExpenseRollup model associated to User and
+            Category models by foreign key, holding total amount and count
+            of expenses for each user, category (null for uncategorized),
+            month and type, kept up to date as expenses are written so
+            aggregate reads scale with categories instead of expenses
+
+        Args:
+            Model (class): Django generic model class
+    '''
+    user = models.ForeignKey(User, blank=False, null=False,
+                             on_delete=models.CASCADE,
+                             related_name='expense_rollups')
+    # Rows are moved to uncategorized before category is deleted
+    category = models.ForeignKey(Category, blank=True, null=True,
+                                 on_delete=models.CASCADE,
+                                 related_name='expense_rollups')
+    # First day of month of spend_date (in current time zone)
+    month = models.DateField(blank=False, null=False)
+    type = models.SmallIntegerField(blank=False, null=False)
+    total = models.DecimalField(max_digits=14, decimal_places=2,
+                                blank=False, null=False, default=0)
+    count = models.IntegerField(blank=False, null=False, default=0)
+
+    def __str__(self) -> str:
+        return (str(self.user_id) + ' ' + str(self.category_id) + ' ' +
+                self.month.strftime('%Y-%m') + ' ' + str(self.type))
+
+    class Meta:
+        verbose_name_plural = 'Expense Rollups'
+        db_table = 'expense_rollups'
+        constraints = [models.UniqueConstraint(
+            fields=['user', 'category', 'month', 'type'],
+            name='expense_rollup_unique')]
+
+
+class Tombstone(models.Model):
+    ''' Tombstone: custom Tombstone model associated to User model by
+            foreign key, recording id and change sequence number of a
+            deleted Expense or Category instance, so sync clients remove
+            their copy
+
+        Args:
+            Model (class): Django generic model class
+    '''
+    EXPENSE = 'expense'
+    CATEGORY = 'category'
+
+    user = models.ForeignKey(User, blank=False, null=False,
+                             on_delete=models.CASCADE,
+                             related_name='tombstones')
+    name = models.CharField(max_length=20, blank=False, null=False,
+                            choices=[(EXPENSE, 'Expense'),
+                                     (CATEGORY, 'Category')])
+    object_id = models.UUIDField(blank=False, null=False)
+    change_seq = models.BigIntegerField(blank=False, null=False)
+    date_deleted = CustomDateTimeField(blank=False, null=False)
+
+    def __str__(self) -> str:
+        return self.name + ' ' + str(self.object_id)
+
+    class Meta:
+        verbose_name_plural = 'Tombstones'
+        db_table = 'expense_tombstones'
+        indexes = [models.Index(fields=['user', 'change_seq'],
+                                name='tombstone_user_change_seq_idx')]
@@ -1,6 +1,13 @@
-from datetime import datetime
+from datetime import (datetime, timezone)
+from django.db import transaction
+from django.db.models import F
 from rest_framework import serializers
-from .models import Expense
+from login.serializers.read import (ReadSerializer, format_datetime,
+                                    format_decimal, format_uuid)
+from .models import (Expense, ImportJob, CategoryRule)
+from .functions.rollup_functions import update_rollups
+from .functions.rule_functions import get_rule_keywords
+from .functions.sync_functions import (next_change_seq, set_changed)
 
 
 class ExpenseSerializer(serializers.ModelSerializer):
@@ -15,7 +22,7 @@ class ExpenseSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Expense
-        fields = '__all__'
+        exclude = ['fingerprint', 'change_seq', 'updated_at']
 
     def validate_amount(self, value) -> float:
         # Validate amount to return float number
@@ -34,18 +41,170 @@ class ExpenseSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data) -> Expense:
         # Create new instance of Expense model once data validated
-        return Expense.objects.create(**validated_data)
+        with transaction.atomic():
+            expense = Expense(**validated_data)
+            set_changed([expense], expense.user_id)
+            expense.save(force_insert=True)
+            update_rollups([expense])
+        return expense
 
     def update(self, instance, validated_data) -> Expense:
         # Update existing instance of Expense model once data validated
-        instance.vendor = validated_data.get('vendor', instance.vendor)
-        instance.description = validated_data.get(
-            'description', instance.description)
-        instance.amount = validated_data.get('amount', instance.amount)
-        instance.summary = validated_data.get('description', instance.summary)
-        instance.spend_date = validated_data.get(
-            'spend_date', instance.spend_date)
+        with transaction.atomic():
+            # Remove previous values from rollups before updating
+            update_rollups([instance], -1)
+            instance.vendor = validated_data.get('vendor', instance.vendor)
+            instance.description = validated_data.get(
+                'description', instance.description)
+            instance.amount = validated_data.get('amount', instance.amount)
+            instance.spend_date = validated_data.get(
+                'spend_date', instance.spend_date)
+            instance.category = validated_data.get(
+                'category', instance.category)
+            instance.type = validated_data.get('type', instance.type)
+            set_changed([instance], instance.user_id)
+            instance.save()
+            update_rollups([instance])
+        return instance
+
+
+class ExpenseReadSerializer(ReadSerializer):
+    ''' ExpenseReadSerializer: read only Expense serializer converting
+            rows of ExpenseReadSerializer.get_values(queryset), with
+            category name joined in the same query, to the same data
+            as ExpenseSerializer (datetimes without microseconds)
+
+        Args:
+            ReadSerializer (class): custom read only serializer class
+    '''
+    value_fields = ['id', 'vendor', 'description', 'amount', 'type',
+                    'spend_date', 'date_created', 'user', 'category']
+    value_expressions = {'category_name': F('category__name')}
+    value_formats = {'id': format_uuid, 'amount': format_decimal,
+                     'spend_date': format_datetime,
+                     'date_created': format_datetime, 'user': format_uuid,
+                     'category': format_uuid}
+
+    def to_representation(self, row: dict) -> dict:
+        data: dict = {'id': format_uuid(row['id'])}
+        # Expenses without category have no category_name field
+        if row['category_name'] is not None:
+            data['category_name'] = row['category_name']
+        data.update(super().to_representation(row))
+        return data
+
+
+class ExpenseImportSerializer(ExpenseSerializer):
+    ''' ExpenseImportSerializer: custom Expense serializer for validating
+            imported rows without querying related instances, so 'user'
+            and 'category' ids can be checked for a whole batch at once
+
+        Args:
+            ExpenseSerializer (class): custom Expense serializer class
+    '''
+    user = serializers.UUIDField()
+    category = serializers.UUIDField(required=False, allow_null=True)
+
+
+class CategoryRuleSerializer(serializers.ModelSerializer):
+    ''' CategoryRuleSerializer: custom CategoryRule serializer for
+            validating data and creating / updating instances of class
+            CategoryRule
+
+        Args:
+            ModelSerializer (class): Django generic serializer
+                model class
+    '''
+    class Meta:
+        model = CategoryRule
+        fields = '__all__'
+        read_only_fields = ['date_created', 'date_updated']
+
+    def validate_keywords(self, value: str) -> str:
+        # Validate keywords to return comma separated lowercase keywords
+        keywords: list = get_rule_keywords(value)
+        if len(keywords) == 0 or min(map(len, keywords)) < 2:
+            raise serializers.ValidationError(
+                'Keywords must be at least 2 characters.')
+        return ', '.join(keywords)
+
+    def validate(self, data: dict) -> dict:
+        # Validate category belongs to user of rule
+        user = data.get('user', getattr(self.instance, 'user', None))
+        category = data.get('category',
+                            getattr(self.instance, 'category', None))
+        if category is not None and category.user_id != user.id:
+            raise serializers.ValidationError(
+                'Category must belong to user.')
+        return data
+
+    def create(self, validated_data) -> CategoryRule:
+        # Create new instance of CategoryRule model once data validated
+        date_updated: datetime = datetime.now(tz=timezone.utc)
+        with transaction.atomic():
+            # Compiled rules of user are kept by change sequence number
+            next_change_seq(validated_data['user'].id)
+            return CategoryRule.objects.create(
+                **validated_data, date_updated=date_updated,
+                date_created=date_updated.replace(microsecond=0))
+
+    def update(self, instance, validated_data) -> CategoryRule:
+        # Update existing instance of CategoryRule model once data validated
+        instance.keywords = validated_data.get('keywords', instance.keywords)
         instance.category = validated_data.get('category', instance.category)
-        instance.type = validated_data.get('type', instance.type)
-        instance.save()
+        instance.priority = validated_data.get('priority', instance.priority)
+        instance.date_updated = datetime.now(tz=timezone.utc)
+        with transaction.atomic():
+            next_change_seq(instance.user_id)
+            instance.save()
         return instance
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    ''' ImportJobSerializer: custom ImportJob serializer for validating
+            data and creating instances of class ImportJob, reporting
+            import throughput and estimated time remaining
+
+        Args:
+            ModelSerializer (class): Django generic serializer
+                model class
+    '''
+    throughput = serializers.SerializerMethodField()
+    eta = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ImportJob
+        exclude = ['file_path', 'worker']
+        read_only_fields = ['status', 'file_size', 'bytes_read',
+                            'rows_parsed', 'rows_inserted', 'rows_failed',
+                            'rows_skipped', 'message', 'date_started',
+                            'date_updated', 'date_finished']
+
+    def get_elapsed(self, obj: ImportJob) -> float:
+        # Get seconds job has been running
+        if obj.date_started is None:
+            return 0
+        end: datetime = obj.date_finished or datetime.now(tz=timezone.utc)
+        return (end - obj.date_started).total_seconds()
+
+    def get_throughput(self, obj: ImportJob) -> float:
+        # Get rows parsed per second
+        elapsed: float = self.get_elapsed(obj)
+        if elapsed <= 0:
+            return 0
+        return round(obj.rows_parsed / elapsed, 2)
+
+    def get_eta(self, obj: ImportJob) -> float | None:
+        # Get estimated seconds remaining from share of file read
+        if not obj.is_active:
+            return 0
+        elapsed: float = self.get_elapsed(obj)
+        if obj.bytes_read == 0 or elapsed <= 0:
+            return None
+        remaining: int = max(obj.file_size - obj.bytes_read, 0)
+        return round(elapsed * remaining / obj.bytes_read, 2)
+
+    def validate_date_created(self, value: datetime) -> datetime:
+        # Validate date_created to remove microseconds from datetime
+        date_created: datetime = value.replace(microsecond=0)
+        return date_created
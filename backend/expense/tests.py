@@ -1,3 +1,1136 @@
-# from django.test import TestCase
+import base64
+import gzip
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import uuid
+from datetime import (date, datetime, timezone)
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterator
+from unittest import (mock, skipUnless)
+from django.core.management import call_command
+from django.db import (connection, transaction, OperationalError)
+from django.db.models import (F, QuerySet)
+from django.test import (RequestFactory, SimpleTestCase, TestCase,
+                         override_settings)
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from login.models.user import User
+from login.utils.cache import (get_cached_response, get_response_cache,
+                               get_user_version)
+from dashboard.models.category import Category
+from dashboard.serializers.category import (CategorySerializer,
+                                           CategoryReadSerializer)
+from dashboard.functions.category import (CategoryResolver,
+                                          find_categories_by_user,
+                                          find_category_by_name)
+from dashboard.functions.forecast import get_category_forecast
+from dashboard.functions.summary import (get_category_totals,
+                                         get_uncategorized_totals,
+                                         get_range_summary)
+from .models import (Expense, ExpenseRollup, Tombstone, CategoryRule,
+                     ImportJob, ImportProfile)
+from .serializers import (ExpenseSerializer, ExpenseReadSerializer,
+                          CategoryRuleSerializer)
+from .views import (get_expense_page, get_expense_stream)
+from .functions.views_functions import (find_expenses_by_user,
+                                        find_expenses_by_category,
+                                        get_expenses_by_range,
+                                        insert_expense_batch,
+                                        create_expenses_for_import,
+                                        get_import_message,
+                                        get_sync_changes)
+from .functions.import_functions import (get_import_columns,
+                                         infer_columns, classify_cells)
+from .functions.export_functions import get_export_row
+from .functions.stream_functions import (iter_base64_chunks,
+                                         iter_text_chunks, iter_records)
+from .functions.upload_functions import ImportStream
+from .functions.search_functions import search_expenses
+from .functions.categorizer_functions import (normalize_vendor,
+                                              get_user_categorizer)
+from .functions.rule_functions import (RuleMatcher, get_user_rules,
+                                        reapply_rules)
+from .functions.snapshot_functions import (SNAPSHOT_COLUMNS,
+                                           open_snapshot,
+                                           refresh_snapshot,
+                                           get_id_positions,
+                                           get_snapshot_dir,
+                                           get_column_path,
+                                           has_snapshot,
+                                           read_snapshot_meta,
+                                           remove_generation)
+from .functions.sync_functions import (add_tombstone, next_change_seq)
+from .functions.job_functions import (create_import_job, cancel_import_job,
+                                      resume_import_jobs, run_import_job,
+                                      local_jobs)
+from .functions.rollup_functions import (get_rollup_month, update_rollups,
+                                        move_category_rollups, check_rollups,
+                                        rebuild_rollups)
 
-# Create your tests here.
+
+@skipUnless(connection.vendor == 'sqlite', 'Query plans checked on SQLite')
+class QueryPlanTestCase(TestCase):
+    ''' QueryPlanTestCase: tests that expense and category lookups search
+            by index, without full table scans or temporary sorts
+
+        Args:
+            TestCase (class): Django generic test case class
+    '''
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        now: datetime = datetime.now(tz=timezone.utc).replace(microsecond=0)
+        cls.user = User.objects.create(
+            email='planner@example.com', username='planner',
+            first_name='Query', last_name='Plan', email_verified=True,
+            password='query-plan-password', date_created=now, last_login=now)
+        cls.category = Category.objects.create(
+            user=cls.user, name='Groceries', display_color='#FFFFFF',
+            type=1, budget=0, date_created=now)
+        Expense.objects.create(
+            user=cls.user, category=cls.category, vendor='Market',
+            description='', amount='12.50', type=1, spend_date=now,
+            date_created=now)
+
+    def assert_indexed(self, queryset: QuerySet) -> None:
+        # Check no step of query plan scans a table or sorts results
+        plan: str = queryset.explain()
+        for line in plan.splitlines():
+            self.assertNotRegex(line, r'\bSCAN\b', plan)
+            self.assertNotIn('TEMP B-TREE', line, plan)
+
+    def test_expenses_by_user(self) -> None:
+        for type in ['current', 'all']:
+            response: list = find_expenses_by_user(str(self.user.id), type)
+            self.assertEqual(response[1], 200)
+            self.assert_indexed(response[0])
+
+    def test_expenses_by_category(self) -> None:
+        for type in ['current', 'all']:
+            response: list = find_expenses_by_category(
+                str(self.category.id), str(self.user.id), type)
+            self.assertEqual(response[1], 200)
+            self.assert_indexed(response[0])
+
+    def test_expenses_by_range(self) -> None:
+        response: list = get_expenses_by_range(
+            str(self.user.id), '2000-01-01T00:00:00+00:00',
+            '2100-01-01T00:00:00+00:00')
+        self.assertEqual(response[1], 200)
+        self.assert_indexed(response[0])
+
+    def test_categories_by_user(self) -> None:
+        response: list = find_categories_by_user(str(self.user.id))
+        self.assertEqual(response[1], 200)
+        self.assert_indexed(response[0])
+
+    def test_category_by_name(self) -> None:
+        self.assert_indexed(Category.objects.filter(
+            name='Groceries', user=str(self.user.id)))
+        response: list = find_category_by_name('Groceries', str(self.user.id))
+        self.assertEqual(response[1], 200)
+
+    def test_expense_fingerprints(self) -> None:
+        expense: Expense = Expense.objects.get(user=self.user)
+        self.assert_indexed(Expense.objects.filter(
+            user=self.user, fingerprint__in=[expense.fingerprint]))
+
+    def test_category_summary(self) -> None:
+        month: date = get_rollup_month(datetime.now(tz=timezone.utc))
+        userId: str = str(self.user.id)
+        self.assert_indexed(get_category_totals(userId, month).union(
+            get_uncategorized_totals(userId, month), all=True))
+
+
+class ExpenseWriteTestCase(TestCase):
+    ''' ExpenseWriteTestCase: base test case creating a user and category
+            and expenses through ExpenseSerializer
+
+        Args:
+            TestCase (class): Django generic test case class
+    '''
+
+    @classmethod
+    def setUpTestData(cls) -> None:
+        now: datetime = datetime.now(tz=timezone.utc).replace(microsecond=0)
+        cls.user = User.objects.create(
+            email='rollup@example.com', username='rollup',
+            first_name='Roll', last_name='Up', email_verified=True,
+            password='rollup-password', date_created=now, last_login=now)
+        cls.category = Category.objects.create(
+            user=cls.user, name='Groceries', display_color='#FFFFFF',
+            type=1, budget=0, date_created=now)
+
+    def create_expense(self, amount: str, spend_date: str,
+                       category: Category | None = None,
+                       vendor: str = 'Market') -> Expense:
+        serializer = ExpenseSerializer(data={
+            'user': str(self.user.id),
+            'category': None if category is None else str(category.id),
+            'vendor': vendor, 'description': '', 'amount': amount,
+            'type': 1, 'spend_date': spend_date,
+            'date_created': '2024-01-01T00:00:00Z'})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        return serializer.save()
+
+
+class ReadSerializerTestCase(ExpenseWriteTestCase):
+    ''' ReadSerializerTestCase: tests that read serializers of values()
+            rows give the same JSON as model serializers
+
+        Args:
+            ExpenseWriteTestCase (class): test case creating expenses
+    '''
+
+    def assert_same_json(self, read_data: list, model_data: list) -> None:
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(read_data),
+                         renderer.render(model_data))
+
+    def test_expense_data(self) -> None:
+        self.create_expense('12.5', '2024-03-05T10:00:00.250Z',
+                            self.category)
+        self.create_expense('1', '2024-03-06T10:00:00Z')
+        expenses: QuerySet[Expense] = Expense.objects.filter(
+            user=self.user).order_by('spend_date')
+        self.assert_same_json(
+            ExpenseReadSerializer(ExpenseReadSerializer.get_values(
+                expenses), many=True).data,
+            ExpenseSerializer(expenses, many=True).data)
+
+    def test_category_data(self) -> None:
+        Category.objects.create(
+            user=self.user, name='Travel', display_color='#000000', type=0,
+            budget=Decimal('150.5'), date_created=self.category.date_created)
+        categories: QuerySet[Category] = Category.objects.filter(
+            user=self.user).order_by('name')
+        self.assert_same_json(
+            CategoryReadSerializer(CategoryReadSerializer.get_values(
+                categories), many=True).data,
+            CategorySerializer(categories, many=True).data)
+
+
+class RollupTestCase(ExpenseWriteTestCase):
+    ''' RollupTestCase: tests that monthly expense rollups match totals of
+            expense rows after each kind of write
+
+        Args:
+            ExpenseWriteTestCase (class): test case creating expenses
+    '''
+
+    def assert_consistent(self, rollup_count: int) -> None:
+        self.assertEqual(check_rollups(str(self.user.id)), [])
+        self.assertEqual(ExpenseRollup.objects.filter(
+            user=self.user).count(), rollup_count)
+
+    def test_create_update_remove(self) -> None:
+        expense: Expense = self.create_expense(
+            '12.50', '2024-03-05T10:00:00Z', self.category)
+        self.create_expense('7.25', '2024-03-20T10:00:00Z', self.category)
+        self.create_expense('1.10', '2024-03-06T10:00:00Z')
+        self.assert_consistent(2)
+
+        serializer = ExpenseSerializer(expense, partial=True, data={
+            'amount': '20.00', 'spend_date': '2024-02-10T00:00:00Z'})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+        self.assert_consistent(3)
+
+        update_rollups([expense], -1)
+        expense.delete()
+        self.assert_consistent(2)
+
+    def test_category_delete(self) -> None:
+        category: Category = Category.objects.create(
+            user=self.user, name='Travel', display_color='#FFFFFF',
+            type=1, budget=0, date_created=self.category.date_created)
+        self.create_expense('30.00', '2024-03-05T10:00:00Z', category)
+        self.create_expense('1.10', '2024-03-06T10:00:00Z')
+        move_category_rollups(category)
+        category.delete()
+        self.assert_consistent(1)
+
+    def test_import(self) -> None:
+        expenses: list = [
+            {'vendor': 'Market ' + str(index), 'amount': '2.50', 'type': 1,
+             'spend_date': '2024-0' + str(index % 3 + 1) + '-05T00:00:00Z',
+             'user': str(self.user.id), 'category': str(self.category.id),
+             'date_created': '2024-01-01T00:00:00Z'}
+            for index in range(9)]
+        self.assertEqual(insert_expense_batch(expenses), [9, 0, 0])
+        self.assert_consistent(3)
+
+        ExpenseRollup.objects.filter(user=self.user).update(count=0)
+        self.assertEqual(len(check_rollups(str(self.user.id))), 3)
+        self.assertEqual(rebuild_rollups(str(self.user.id)), 3)
+        self.assert_consistent(3)
+
+
+class SyncTestCase(ExpenseWriteTestCase):
+    ''' SyncTestCase: tests that sync returns only expenses changed or
+            deleted since token
+
+        Args:
+            ExpenseWriteTestCase (class): test case creating expenses
+    '''
+
+    def test_changes_since_token(self) -> None:
+        first: Expense = self.create_expense('1.00', '2024-03-05T10:00:00Z')
+        response: list = get_sync_changes(str(self.user.id))
+        self.assertEqual(len(response[0]['expenses']), 1)
+        token: str = response[0]['token']
+
+        second: Expense = self.create_expense(
+            '2.00', '2024-03-06T10:00:00Z', self.category)
+        firstId: str = str(first.id)
+        add_tombstone(first.user_id, Tombstone.EXPENSE, firstId)
+        first.delete()
+        changes: dict = get_sync_changes(str(self.user.id), token)[0]
+        self.assertEqual([expense['id'] for expense in changes['expenses']],
+                         [str(second.id)])
+        self.assertEqual(changes['deleted']['expenses'], [firstId])
+        self.assertEqual(changes['categories'], [])
+
+        changes = get_sync_changes(str(self.user.id), changes['token'])[0]
+        self.assertEqual([changes['expenses'], changes['deleted']],
+                         [[], {'expenses': [], 'categories': []}])
+        self.assertEqual(get_sync_changes(str(self.user.id), 'x')[1], 400)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Search index is SQLite FTS5')
+class SearchTestCase(ExpenseWriteTestCase):
+    ''' SearchTestCase: tests that search matches words and prefixes of
+            expenses kept in search index by triggers, with filters
+
+        Args:
+            ExpenseWriteTestCase (class): test case creating expenses
+    '''
+
+    def search(self, **params) -> list:
+        response: list = search_expenses(str(self.user.id), params)
+        self.assertEqual(response[1], 200)
+        return sorted(expense.vendor for expense in response[0])
+
+    def test_search(self) -> None:
+        coffee: Expense = self.create_expense(
+            '4.50', '2024-03-05T10:00:00Z', self.category, 'Café Nero')
+        self.create_expense('40.00', '2024-04-05T10:00:00Z',
+                            vendor='Shell Oil')
+        self.assertEqual(self.search(query='cafe'), ['Café Nero'])
+        self.assertEqual(self.search(query='NER* OR'), [])
+        self.assertEqual(self.search(query='ner*'), ['Café Nero'])
+        self.assertEqual(
+            self.search(query='oil', start_date='2024-04-05',
+                        end_date='2024-04-05', min_amount='40'),
+            ['Shell Oil'])
+        self.assertEqual(self.search(query='oil', end_date='2024-04-04'), [])
+        self.assertEqual(
+            self.search(query='cafe', category_id=str(self.category.id)),
+            ['Café Nero'])
+
+        coffee.vendor = 'Corner Bakery'
+        coffee.save()
+        self.assertEqual(self.search(query='cafe'), [])
+        self.assertEqual(self.search(query='bakery'), ['Corner Bakery'])
+        coffee.delete()
+        self.assertEqual(self.search(query='bakery'), [])
+        self.assertEqual(
+            search_expenses(str(self.user.id), {'query': '*'})[1], 400)
+
+
+class CategorizerTestCase(ExpenseWriteTestCase):
+    ''' CategorizerTestCase: tests that vendors are normalized and given
+            category learned from expenses, trained again after writes
+
+        Args:
+            ExpenseWriteTestCase (class): test case creating expenses
+    '''
+
+    def test_normalize_vendor(self) -> None:
+        self.assertEqual(normalize_vendor('SQ *COFFEE SHOP #123 XXXX4521'),
+                         ['coffee', 'shop'])
+        self.assertEqual(normalize_vendor('CHECKCARD 0105 SHELL OIL 5744'),
+                         ['shell', 'oil'])
+        self.assertEqual(normalize_vendor('7-ELEVEN 33012'), ['7', 'eleven'])
+
+    def test_vendor_category(self) -> None:
+        userId: str = str(self.user.id)
+        self.create_expense('1.00', '2024-03-05T10:00:00Z', self.category,
+                            'KROGER #512')
+        categorizer = get_user_categorizer(userId)
+        self.assertEqual(categorizer.get_category_id('Kroger 0042 Dallas'),
+                         str(self.category.id))
+        self.assertIsNone(categorizer.get_category_id('Shell Oil'))
+        self.assertIs(get_user_categorizer(userId), categorizer)
+
+        self.create_expense('2.00', '2024-03-06T10:00:00Z',
+                            vendor='Shell Oil')
+        categorizer = get_user_categorizer(userId)
+        self.assertIsNone(categorizer.get_category_id('Shell Oil'))
+
+        # Write committed by another process only changes database
+        Expense.objects.filter(vendor='Shell Oil').update(
+            category=self.category)
+        User.objects.filter(id=self.user.id).update(
+            change_seq=F('change_seq') + 1)
+        self.assertEqual(
+            get_user_categorizer(userId).get_category_id('Shell Oil'),
+            str(self.category.id))
+
+
+class RuleTestCase(ExpenseWriteTestCase):
+    ''' RuleTestCase: tests that category rules match vendors in priority
+            order and are reapplied to existing expenses
+
+        Args:
+            ExpenseWriteTestCase (class): test case creating expenses
+    '''
+
+    def test_rule_matcher(self) -> None:
+        matcher = RuleMatcher([[['amazon prime'], 'video'],
+                               [['amzn', 'amazon'], 'shopping'],
+                               [['zn'], 'other']])
+        self.assertEqual(matcher.get_category_id('AMAZON PRIME*1X2'),
+                         'video')
+        self.assertEqual(matcher.get_category_id('Amazon.com'), 'shopping')
+        self.assertEqual(matcher.get_category_id('AMZN Mktp US'), 'shopping')
+        self.assertEqual(matcher.get_category_id('Zinc ZN'), 'other')
+        self.assertIsNone(matcher.get_category_id('Kroger'))
+        self.assertIsNone(RuleMatcher([]).get_category_id('Amazon'))
+
+    def test_reapply_rules(self) -> None:
+        category: Category = Category.objects.create(
+            user=self.user, name='Shopping', display_color='#FFFFFF',
+            type=1, budget=0, date_created=self.category.date_created)
+        CategoryRule.objects.create(
+            user=self.user, category=category, keywords='amzn, amazon',
+            date_created=self.category.date_created,
+            date_updated=self.category.date_created)
+        self.create_expense('5.00', '2024-03-05T10:00:00Z', self.category,
+                            'AMZN Mktp US')
+        self.create_expense('6.00', '2024-03-06T10:00:00Z',
+                            vendor='Amazon.com')
+        self.create_expense('7.00', '2024-03-07T10:00:00Z', self.category)
+
+        self.assertEqual(reapply_rules(str(self.user.id)), [2, 200])
+        self.assertEqual(Expense.objects.filter(
+            user=self.user, category=category).count(), 2)
+        self.assertEqual(check_rollups(str(self.user.id)), [])
+        self.assertEqual(reapply_rules(str(self.user.id)), [0, 200])
+
+    def test_user_rules(self) -> None:
+        userId: str = str(self.user.id)
+        serializer = CategoryRuleSerializer(data={
+            'user': userId, 'category': str(self.category.id),
+            'keywords': 'amzn', 'priority': 0})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        rule: CategoryRule = serializer.save()
+        self.assertEqual(get_user_rules(userId).get_category_id('AMZN Mktp'),
+                         str(self.category.id))
+
+        # Rule replaced by another with same count and update date
+        with transaction.atomic():
+            next_change_seq(userId)
+            rule.delete()
+        serializer = CategoryRuleSerializer(data={
+            'user': userId, 'category': str(self.category.id),
+            'keywords': 'kroger', 'priority': 0})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        CategoryRule.objects.filter(id=serializer.save().id).update(
+            date_updated=rule.date_updated)
+        matcher: RuleMatcher = get_user_rules(userId)
+        self.assertIsNone(matcher.get_category_id('AMZN Mktp'))
+        self.assertEqual(matcher.get_category_id('Kroger 0042'),
+                         str(self.category.id))
+
+
+class ForecastTestCase(ExpenseWriteTestCase):
+    ''' ForecastTestCase: tests that month-end projections, rolling
+            averages and trend slopes are calculated from monthly rollups
+
+        Args:
+            ExpenseWriteTestCase (class): test case creating expenses
+    '''
+
+    def test_category_forecast(self) -> None:
+        for [amount, spend_date] in [['100.00', '2024-01-15T10:00:00Z'],
+                                     ['200.00', '2024-02-15T10:00:00Z'],
+                                     ['300.00', '2024-03-15T10:00:00Z'],
+                                     ['50.00', '2024-04-05T10:00:00Z']]:
+            self.create_expense(amount, spend_date, self.category)
+        self.create_expense('9.00', '2024-02-20T10:00:00Z')
+        userId: str = str(self.user.id)
+
+        response: list = get_category_forecast(userId, None,
+                                               date(2024, 4, 10))
+        self.assertEqual(response[1], 200)
+        self.assertEqual([response[0]['days'], response[0]['elapsed_days']],
+                         [30, 10])
+        [groceries, uncategorized] = response[0]['categories']
+        self.assertEqual(
+            [groceries['spent'], groceries['daily_rate'],
+             groceries['projected'], groceries['average_3'],
+             groceries['average_12'], groceries['trend']],
+            ['50.00', '5.00', '150.00', '200.00', '200.00', '100.00'])
+        self.assertTrue(groceries['projected_over_budget'])
+        self.assertEqual([uncategorized['category_id'],
+                          uncategorized['average_3'],
+                          uncategorized['trend']], [None, '3.00', '0.00'])
+
+        response = get_category_forecast(userId, '2024-02', date(2024, 4, 10))
+        self.assertEqual(response[0]['categories'][0]['projected'], '200.00')
+        self.assertEqual(response[0]['categories'][0]['average_3'], '100.00')
+        self.assertIsNone(response[0]['categories'][0]['trend'])
+        self.assertEqual(get_category_forecast(
+            userId, '2024-05', date(2024, 4, 10))[1], 400)
+
+
+class SnapshotTestCase(ExpenseWriteTestCase):
+    ''' SnapshotTestCase: tests that columnar snapshots of expenses are
+            refreshed with expenses created, updated and deleted since
+
+        Args:
+            ExpenseWriteTestCase (class): test case creating expenses
+    '''
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(EXPENSE_SNAPSHOT_DIR=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def get_rows(self) -> list:
+        with open_snapshot(str(self.user.id)) as snapshot:
+            columns: dict = snapshot.columns
+            categories: list = [
+                None if code < 0 else snapshot.categories[code]
+                for code in columns['categories']]
+            return sorted(map(list, zip(columns['days'], columns['cents'],
+                                        columns['types'], categories)))
+
+    def test_refresh(self) -> None:
+        userId: str = str(self.user.id)
+        expense: Expense = self.create_expense(
+            '12.50', '2024-03-05T10:00:00Z', self.category)
+        self.create_expense('1.10', '2024-03-06T10:00:00Z')
+        self.assertEqual(self.get_rows(), [
+            [19787, 1250, 1, str(self.category.id)],
+            [19788, 110, 1, None]])
+        meta: dict = refresh_snapshot(userId)
+        self.assertEqual(refresh_snapshot(userId)['generation'],
+                         meta['generation'])
+
+        serializer = ExpenseSerializer(expense, partial=True, data={
+            'amount': '20.00', 'category': None})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+        removed: Expense = self.create_expense('3.00', '2024-03-07T10:00:00Z')
+        self.assertEqual(len(self.get_rows()), 3)
+        add_tombstone(userId, Tombstone.EXPENSE, removed.id)
+        removed.delete()
+        self.assertEqual(self.get_rows(), [[19787, 2000, 1, None],
+                                           [19788, 110, 1, None]])
+
+    def test_id_positions(self) -> None:
+        keys: list = [bytes([index]) * 16 for index in range(40)]
+        key: bytes = bytes([1]) * 8 + bytes([2]) * 8
+        # Bytes of key also span ids at positions 30 and 31
+        ids = bytearray(b''.join(keys[:30]) + bytes([0]) * 8 + key +
+                        bytes([3]) * 8 + key)
+        for count in [3, 40]:
+            positions: dict = get_id_positions(ids, keys[28:28 + count] +
+                                               [key])
+            self.assertEqual(positions[keys[29]], 29)
+            self.assertNotIn(keys[30], positions)
+            self.assertEqual(positions[key], 32)
+
+    def test_sorted_days(self) -> None:
+        userId: str = str(self.user.id)
+        self.create_expense('1.00', '2024-03-09T10:00:00Z')
+        moved: Expense = self.create_expense('2.00', '2024-03-02T10:00:00Z')
+        refresh_snapshot(userId)
+        self.create_expense('3.00', '2024-03-05T10:00:00Z')
+        self.create_expense('4.00', '2024-03-01T10:00:00Z')
+        serializer = ExpenseSerializer(moved, partial=True, data={
+            'spend_date': '2024-03-07T10:00:00Z'})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+        with open_snapshot(userId) as snapshot:
+            self.assertEqual(list(snapshot.columns['days']),
+                             [19783, 19787, 19789, 19791])
+            self.assertEqual(list(snapshot.columns['cents']),
+                             [400, 300, 200, 100])
+            self.assertEqual(bytes(snapshot.ids[32:48]), moved.id.bytes)
+
+    def test_missing_files(self) -> None:
+        userId: str = str(self.user.id)
+        self.create_expense('1.00', '2024-03-09T10:00:00Z')
+        meta: dict = refresh_snapshot(userId)
+        # Files of generation removed as if replaced by another process
+        directory: Path = get_snapshot_dir(userId)
+        for name in ['ids', *SNAPSHOT_COLUMNS]:
+            os.remove(get_column_path(directory, meta['generation'], name))
+        self.assertEqual(self.get_rows(), [[19791, 100, 1, None]])
+        self.create_expense('2.00', '2024-03-02T10:00:00Z')
+        remove_generation(directory, read_snapshot_meta(
+            directory)['generation'])
+        self.create_expense('3.00', '2024-03-05T10:00:00Z')
+        self.assertEqual([row[1] for row in self.get_rows()],
+                         [200, 300, 100])
+
+    def test_range_summary(self) -> None:
+        userId: str = str(self.user.id)
+        self.create_expense('12.50', '2024-03-05T10:00:00Z', self.category)
+        self.create_expense('7.25', '2024-03-20T10:00:00Z', self.category)
+        self.create_expense('1.10', '2024-03-05T12:00:00Z')
+        self.create_expense('5.00', '2024-03-10T23:00:00Z')
+        # Without snapshot expense rows are read, then snapshot is scanned
+        for snapshot in [False, True]:
+            if snapshot:
+                refresh_snapshot(userId)
+            self.assertEqual(has_snapshot(userId), snapshot)
+            response: list = get_range_summary(userId, '2024-03-01',
+                                               '2024-03-10')
+            self.assertEqual(response[1], 200)
+            self.assertEqual(
+                [[item['name'], item['spent'], item['count']]
+                 for item in response[0]['categories']],
+                [['Groceries', '12.50', 1], ['Uncategorized', '6.10', 2]])
+            self.assertEqual([[item['date'], item['withdrawals']]
+                              for item in response[0]['daily']],
+                             [['2024-03-05', '13.60'],
+                              ['2024-03-10', '5.00']])
+        self.assertEqual(get_range_summary(
+            userId, '2024-03-10', '2024-03-01')[1], 400)
+        self.assertEqual(get_range_summary(
+            str(uuid.uuid4()), '2024-03-01', '2024-03-10')[1], 404)
+
+
+class CategoryResolverTestCase(ExpenseWriteTestCase):
+    ''' CategoryResolverTestCase: tests that category names of imports
+            are matched in memory and new categories are created together
+
+        Args:
+            ExpenseWriteTestCase (class): test case creating expenses
+    '''
+
+    def test_create_pending(self) -> None:
+        userId: str = str(self.user.id)
+        version: int = get_user_version(userId)
+        resolver = CategoryResolver(userId)
+        # Categories of user are loaded once, new names are held
+        with self.assertNumQueries(3):
+            self.assertEqual(resolver.get_category_id('Weekly Groceries'),
+                             self.category.id)
+            travelId = resolver.get_category_id('travel')
+            self.assertEqual(resolver.get_category_id('Travel Costs'),
+                             travelId)
+            self.assertEqual(resolver.get_category_id('travel'), travelId)
+        self.assertFalse(Category.objects.filter(id=travelId).exists())
+
+        resolver.create_pending()
+        category: Category = Category.objects.get(id=travelId)
+        self.assertEqual([category.name, category.type], ['Travel', 1])
+        self.assertGreater(get_user_version(userId), version)
+        with self.assertNumQueries(0):
+            resolver.create_pending()
+        self.assertEqual(resolver.get_category_id('Travel'), travelId)
+
+
+class ImportBatchTestCase(ExpenseWriteTestCase):
+    ''' ImportBatchTestCase: tests that imported batches are validated
+            and counted per row while valid rows are bulk created
+
+        Args:
+            ExpenseWriteTestCase (class): test case creating expenses
+    '''
+
+    def get_expense_object(self, amount: str, spend_date: str,
+                           category: str | None = None,
+                           user: str | None = None) -> dict:
+        return {'user': str(self.user.id) if user is None else user,
+                'category': category, 'vendor': 'Market',
+                'description': '', 'amount': amount, 'type': 1,
+                'spend_date': spend_date,
+                'date_created': '2024-01-01T00:00:00Z'}
+
+    def test_batch_counts(self) -> None:
+        batch: list = [
+            self.get_expense_object('4.50', '2024-03-01T10:00:00Z'),
+            self.get_expense_object('5.00', '2024-03-02T10:00:00Z',
+                                    str(self.category.id)),
+            self.get_expense_object('not a number', '2024-03-03T10:00:00Z'),
+            self.get_expense_object('6.00', '2024-03-04T10:00:00Z',
+                                    str(uuid.uuid4())),
+            self.get_expense_object('7.00', '2024-03-05T10:00:00Z',
+                                    user=str(uuid.uuid4()))]
+        self.assertEqual(insert_expense_batch(batch), [2, 3, 0])
+        self.assertEqual(sorted(Expense.objects.filter(
+            user=self.user).values_list('amount', flat=True)),
+            [Decimal('4.50'), Decimal('5.00')])
+
+        # Counts are summed over batches of the whole import
+        response: list = create_expenses_for_import(
+            [self.get_expense_object(str(index), '2024-04-01T10:00:00Z')
+             for index in range(1, 6)] + batch[2:], batch_size=2)
+        self.assertEqual(response, [get_import_message(5, 3),
+                                    status.HTTP_200_OK])
+        self.assertEqual(create_expenses_for_import(batch[2:])[1],
+                         status.HTTP_400_BAD_REQUEST)
+
+    def test_fingerprint_skips(self) -> None:
+        rows: list = [
+            self.get_expense_object('4.50', '2024-03-01T10:00:00Z'),
+            self.get_expense_object('4.50', '2024-03-01T10:00:00Z'),
+            self.get_expense_object('9.00', '2024-03-02T10:00:00Z')]
+        # Repeated rows within a file are all created, across batches
+        self.assertEqual(create_expenses_for_import(rows, batch_size=1)[0],
+                         get_import_message(3, 0, 0))
+        # Importing file again only creates rows beyond existing ones
+        rows.append(self.get_expense_object('4.50', '2024-03-01T10:00:00Z'))
+        self.assertEqual(create_expenses_for_import(rows, batch_size=2)[0],
+                         get_import_message(1, 0, 3))
+        self.assertEqual(create_expenses_for_import(rows)[0],
+                         get_import_message(0, 0, 4))
+        self.assertEqual(Expense.objects.filter(
+            user=self.user, amount=Decimal('4.50')).count(), 3)
+
+
+class ImportJobTestCase(ExpenseWriteTestCase):
+    ''' ImportJobTestCase: tests that import jobs are limited per user,
+            resumed after their worker exits and always remove their file
+            once finished (jobs being run in test thread, not worker pool)
+
+        Args:
+            ExpenseWriteTestCase (class): test case creating expenses
+    '''
+    csv: str = ('Date,Description,Amount,Type,Category\n' +
+                '01/05/2024,Market,-4.50,debit,Groceries\n' +
+                '01/06/2024,Payroll,1500.00,credit,Income\n' +
+                '01/07/2024,Fuel,-40,debit,\n')
+
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(EXPENSE_IMPORT_DIR=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        patcher = mock.patch(
+            'expense.functions.job_functions.submit_import_job')
+        self.submit = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_job(self) -> ImportJob:
+        data: str = base64.b64encode(self.csv.encode()).decode()
+        response: list = create_import_job(
+            'data:text/csv;base64,' + data, True, str(self.user.id))
+        self.assertEqual(response[1], 200)
+        return ImportJob.objects.get(id=response[0])
+
+    def test_limit_and_run(self) -> None:
+        job: ImportJob = self.create_job()
+        self.assertTrue(os.path.exists(job.file_path))
+        self.assertEqual(create_import_job('', True, str(self.user.id)),
+                         ['Too many import jobs in progress.', 429])
+        self.assertEqual(os.listdir(os.path.dirname(job.file_path)),
+                         [os.path.basename(job.file_path)])
+
+        run_import_job(job.id)
+        job.refresh_from_db()
+        self.assertEqual([job.status, job.rows_inserted],
+                         [ImportJob.COMPLETED, 3])
+        self.assertFalse(os.path.exists(job.file_path))
+        self.assertEqual(create_import_job(
+            '', True, '00000000-0000-0000-0000-000000000000')[1], 404)
+
+    def test_cancel_queued(self) -> None:
+        job: ImportJob = self.create_job()
+        self.assertEqual(cancel_import_job(job)[1], 200)
+        self.assertFalse(os.path.exists(job.file_path))
+        run_import_job(job.id)
+        job.refresh_from_db()
+        self.assertEqual([job.status, job.rows_inserted],
+                         [ImportJob.CANCELLED, 0])
+        self.assertEqual(cancel_import_job(job)[1], 409)
+
+    def test_resume_dead_worker(self) -> None:
+        job: ImportJob = self.create_job()
+        process = subprocess.Popen([sys.executable, '-c', ''])
+        process.wait()
+        # Job interrupted after first row by a worker that has exited
+        ImportJob.objects.filter(id=job.id).update(
+            status=ImportJob.RUNNING, rows_parsed=1, rows_inserted=1,
+            worker=socket.gethostname() + ':' + str(process.pid),
+            date_started=job.date_created, date_updated=datetime.now(
+                tz=timezone.utc).replace(microsecond=0))
+        self.submit.reset_mock()
+        resume_import_jobs()
+        self.submit.assert_called_once_with(job.id)
+
+        run_import_job(job.id)
+        job.refresh_from_db()
+        self.assertEqual([job.status, job.rows_inserted],
+                         [ImportJob.COMPLETED, 3])
+        self.assertEqual(Expense.objects.filter(user=self.user).count(), 2)
+
+    def test_failure_cleanup(self) -> None:
+        job: ImportJob = self.create_job()
+        local_jobs.add(job.id)
+        with mock.patch('expense.functions.job_functions.import_job_file',
+                        side_effect=OperationalError('database is locked')):
+            run_import_job(job.id)
+        job.refresh_from_db()
+        self.assertEqual([job.status, job.message],
+                         [ImportJob.FAILED,
+                          'Import job failed: database is locked'])
+        self.assertFalse(os.path.exists(job.file_path))
+        self.assertNotIn(job.id, local_jobs)
+
+
+class ImportProfileTestCase(ExpenseWriteTestCase):
+    ''' ImportProfileTestCase: tests that column roles are inferred from
+            heading and sample rows, stored per heading and reused until a
+            file no longer matches them
+
+        Args:
+            ExpenseWriteTestCase (class): test case creating expenses
+    '''
+    heading: str = 'Posted,Reference,Description,Debit,Category'
+
+    def get_columns(self, rows: list) -> list | None:
+        records: Iterator[str] = iter([self.heading] + rows)
+        [body, columns] = get_import_columns(records, True,
+                                             str(self.user.id))
+        self.assertEqual(list(body), rows)
+        return columns
+
+    def test_infer_columns(self) -> None:
+        sample: list = [
+            ['01/05/2024', 'REF1001', 'Kroger #512', '-4.50', 'Food'],
+            ['01/06/2024', 'REF1002', 'Shell Oil', '-40', 'Fuel']]
+        self.assertEqual(infer_columns(self.heading.split(','), sample),
+                         [0, 3, 2, 4])
+        self.assertEqual(infer_columns([], [row[:1] + row[2:4]
+                                            for row in sample]),
+                         [0, 2, 1, None])
+        self.assertIsNone(infer_columns([], [['Kroger', 'Food']]))
+        self.assertIsNone(infer_columns(self.heading.split(','), []))
+
+    def test_profile_reuse(self) -> None:
+        rows: list = ['01/05/2024,REF1001,Kroger #512,-4.50,Food',
+                      '01/06/2024,REF1002,Shell Oil,-40,Fuel']
+        self.assertEqual(self.get_columns(rows), [0, 3, 2, 4])
+        self.assertEqual(ImportProfile.objects.filter(
+            user=self.user).count(), 1)
+        with mock.patch('expense.functions.import_functions.infer_columns'
+                        ) as infer:
+            self.assertEqual(self.get_columns(rows[:1]), [0, 3, 2, 4])
+            infer.assert_not_called()
+
+        # Same heading with columns moved by bank replaces profile
+        moved: list = ['Kroger #512,01/05/2024,-4.50,REF1001,Food',
+                       'Shell Oil,01/06/2024,-40,REF1002,Fuel']
+        self.assertEqual(self.get_columns(moved), [1, 2, 0, 4])
+        profile: ImportProfile = ImportProfile.objects.get(user=self.user)
+        self.assertEqual(profile.get_columns(), [1, 2, 0, 4])
+
+
+class UploadTestCase(ExpenseWriteTestCase):
+    ''' UploadTestCase: tests that raw and gzip compressed uploads are
+            imported as streamed, gzip data being decompressed in bounded
+            pieces, and that unknown users are rejected first
+
+        Args:
+            ExpenseWriteTestCase (class): test case creating expenses
+    '''
+    csv: bytes = ('Date,Description,Amount\n' + ''.join(
+        '01/' + str(day % 28 + 1).zfill(2) + '/2024,Market ' + str(day) +
+        ',-' + str(day) + '.25\n' for day in range(3000))).encode()
+
+    def upload(self, data: bytes, userId: str) -> Response:
+        return self.client.post(
+            '/expense/expenses/upload_expenses/?has_heading=true&user=' +
+            userId, data=data, content_type='text/csv')
+
+    def test_gzip_upload(self) -> None:
+        response: Response = self.upload(gzip.compress(self.csv),
+                                         str(self.user.id))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Expense.objects.filter(user=self.user).count(),
+                         3000)
+
+    def test_gzip_bounded(self) -> None:
+        stream = ImportStream(str(self.user.id), True, batch_size=500)
+        texts: list = []
+        feed = stream.reader.feed
+
+        def record_feed(text: str) -> list:
+            texts.append(len(text))
+            return feed(text)
+
+        stream.reader.feed = record_feed
+        with mock.patch(
+                'expense.functions.upload_functions.DECOMPRESS_CHUNK_SIZE',
+                4096):
+            stream.feed(gzip.compress(self.csv))
+        self.assertLessEqual(max(texts), 4096)
+        self.assertGreater(stream.success_count, 0)
+        self.assertLess(len(stream.pending), 500)
+        self.assertEqual(stream.close()[1], 200)
+        self.assertEqual(stream.success_count, 3000)
+
+    def test_unknown_user(self) -> None:
+        for userId in ['nope', '00000000-0000-0000-0000-000000000000']:
+            response: Response = self.upload(self.csv, userId)
+            self.assertEqual([response.status_code, response.data],
+                             [207, {'detail': 'No user found.'}])
+        self.assertFalse(Expense.objects.exists())
+
+
+class ImportCommandTestCase(ExpenseWriteTestCase):
+    ''' ImportCommandTestCase: tests that import_expenses command skips
+            files of invalid users before parsing and its writes change
+            data version of user
+
+        Args:
+            ExpenseWriteTestCase (class): test case creating expenses
+    '''
+
+    def test_import_command(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        for name in ['user.csv', 'other.csv']:
+            with open(os.path.join(directory.name, name), 'w') as file:
+                file.write('Date,Description,Amount\n' + ''.join(
+                    '01/0' + str(day) + '/2024,Market ' + str(day) +
+                    ',-4.50\n' for day in range(1, 8)))
+        user_map: str = os.path.join(directory.name, 'users.json')
+        with open(user_map, 'w') as file:
+            json.dump({'user.csv': str(self.user.id), 'other.csv': 'nope'},
+                      file)
+
+        version: int = get_user_version(str(self.user.id))
+        stderr = io.StringIO()
+        call_command('import_expenses', directory.name, user_map=user_map,
+                     has_heading=True, workers=1, shard_size=0,
+                     stdout=io.StringIO(), stderr=stderr)
+        self.assertIn('Skipped (no user): ' +
+                      os.path.join(directory.name, 'other.csv'),
+                      stderr.getvalue())
+        self.assertEqual(Expense.objects.filter(user=self.user).count(), 7)
+        self.assertGreater(get_user_version(str(self.user.id)), version)
+
+
+class PaginationTestCase(ExpenseWriteTestCase):
+    ''' PaginationTestCase: tests that keyset cursors page forwards and
+            backwards through expenses ordered by spend date and id
+
+        Args:
+            ExpenseWriteTestCase (class): test case creating expenses
+    '''
+
+    def setUp(self) -> None:
+        # Expenses of same spend date are ordered by id
+        for spend_date in ['2024-03-01', '2024-03-02', '2024-03-02',
+                           '2024-03-02', '2024-03-04']:
+            self.create_expense('1.00', spend_date + 'T10:00:00Z')
+        self.queryset: QuerySet = find_expenses_by_user(
+            str(self.user.id), 'all')[0]
+        self.ids: list = [str(expenseId) for expenseId in self.queryset
+                          .order_by('spend_date', 'id')
+                          .values_list('id', flat=True)]
+
+    def get_page(self, **params) -> dict:
+        response: Response = get_expense_page(self.queryset, params)
+        self.assertEqual(response.status_code, 200)
+        return {**response.data, 'detail': [
+            str(item['id']) for item in response.data['detail']]}
+
+    def test_next_previous(self) -> None:
+        pages: list = [self.get_page(page_size=2)]
+        self.assertIsNone(pages[0]['previous'])
+        while pages[-1]['next'] is not None:
+            pages.append(self.get_page(cursor=pages[-1]['next'],
+                                       page_size=2))
+        self.assertEqual([page['detail'] for page in pages],
+                         [self.ids[0:2], self.ids[2:4], self.ids[4:]])
+
+        # Previous cursors return the same pages in the same order
+        page: dict = pages[-1]
+        for expected in reversed(pages[:-1]):
+            page = self.get_page(cursor=page['previous'], page_size=2)
+            self.assertEqual(page['detail'], expected['detail'])
+        self.assertIsNone(page['previous'])
+        self.assertIsNotNone(page['next'])
+
+        # Page ending at last expense has no next page
+        self.assertIsNone(self.get_page(page_size=5)['next'])
+        last: dict = self.get_page(cursor=pages[1]['next'], page_size=5)
+        self.assertEqual([last['detail'], last['next']], [self.ids[4:], None])
+
+    def test_invalid_cursor(self) -> None:
+        for params in [{'cursor': 'not-a-cursor'}, {'page_size': 0},
+                       {'page_size': 'ten'}]:
+            response: Response = get_expense_page(self.queryset, params)
+            self.assertEqual(response.status_code, 400, params)
+
+    @override_settings(STREAMING_CHUNK_SIZE=2)
+    def test_stream_matches_pages(self) -> None:
+        renderer = JSONRenderer()
+        detail: list = []
+        params: dict = {'page_size': 2}
+        while True:
+            response: Response = get_expense_page(self.queryset, params)
+            data: dict = json.loads(renderer.render(response.data))
+            detail += data['detail']
+            if data['next'] is None:
+                break
+            params = {'cursor': data['next'], 'page_size': 2}
+        # Rows are written in chunks, separated as one JSON list
+        stream: bytes = b''.join(
+            get_expense_stream(self.queryset).streaming_content)
+        streamed: list = json.loads(stream)['detail']
+        self.assertEqual(sorted(streamed, key=lambda item: (
+            item['spend_date'], item['id'])), detail)
+        self.assertEqual(len(detail), len(self.ids))
+
+
+class RecordReaderTestCase(SimpleTestCase):
+    ''' RecordReaderTestCase: tests that csv records are split the same
+            however file data is chunked, including quoted newlines, escaped
+            quotes and multibyte characters split across chunks
+
+        Args:
+            SimpleTestCase (class): Django test case class without database
+    '''
+
+    text: str = ('01/02/2024,"Caf\u00e9 ""Bleu""\nParis",-4.50\n'
+                 '01/03/2024,"Line\n\nbreaks,  and \u20ac",12.00\n'
+                 '01/04/2024,\u65e5\u672c,3.00')
+    records: list = ['01/02/2024,"Caf\u00e9 ""Bleu"" Paris",-4.50',
+                     # Spaces are collapsed before newlines are replaced
+                     '01/03/2024,"Line  breaks, and \u20ac",12.00',
+                     '01/04/2024,\u65e5\u672c,3.00']
+
+    def test_text_chunks(self) -> None:
+        for size in range(1, len(self.text) + 1):
+            chunks: list = [self.text[index:index + size]
+                            for index in range(0, len(self.text), size)]
+            self.assertEqual(list(iter_records(chunks)), self.records, size)
+
+    def test_base64_chunks(self) -> None:
+        data: str = 'data:text/csv;base64,' + base64.b64encode(
+            self.text.encode('utf-8')).decode('ascii')
+        # Multibyte characters are split across decoded chunks
+        for size in [4, 8, 12, 64]:
+            records: Iterator[str] = iter_records(iter_text_chunks(
+                iter_base64_chunks(data, size)))
+            self.assertEqual(list(records), self.records, size)
+
+
+class ClassifyCellsTestCase(SimpleTestCase):
+    ''' ClassifyCellsTestCase: tests that cells of imported rows are
+            labelled as date, amount, skipped or text in one pass
+
+        Args:
+            SimpleTestCase (class): Django test case class without database
+    '''
+
+    def test_classify_cells(self) -> None:
+        # First date and amount are kept, later ones are dropped
+        self.assertEqual(classify_cells(
+            ['01/05/2024', 'Debit', 'Coffee Shop', '($4.50)', '02/01/2024',
+             '12.00', 'x', '', 'Food']),
+            ['01/05/2024', '($4.50)', ['Coffee Shop', 'Food']])
+        self.assertEqual(classify_cells(
+            ['pos', 'Payroll', '$1500', 'DEPOSIT', '12/31/1999']),
+            ['12/31/1999', '$1500', ['Payroll']])
+        # Invalid dates and amounts with thousands separators are text
+        self.assertEqual(classify_cells(['13/01/2024', '1,234.56']),
+                         [None, None, ['13/01/2024', '1,234.56']])
+        self.assertEqual(classify_cells([]), [None, None, []])
+
+
+class ExportTestCase(SimpleTestCase):
+    ''' ExportTestCase: tests that CSV export rows are formatted as
+            frontend createCSV (date, signed amount, type name, category)
+
+        Args:
+            SimpleTestCase (class): Django test case class without database
+    '''
+
+    def test_export_row(self) -> None:
+        spend_date: datetime = datetime(2024, 1, 5, 23, tzinfo=timezone.utc)
+        self.assertEqual(
+            get_export_row(spend_date, 'Market', Decimal('4.50'), 1, 'Food'),
+            ['2024-01-05', 'Market', '-4.5', 'Withdrawal', 'Food', ''])
+        self.assertEqual(
+            get_export_row(spend_date, 'Payroll', Decimal('1500.00'), 0,
+                           None),
+            ['2024-01-05', 'Payroll', '1500', 'Deposit', 'Uncategorized', ''])
+        self.assertEqual(
+            get_export_row(spend_date, 'Refund', Decimal('0.00'), 1, None)[2],
+            '0')
+
+
+class ResponseCacheTestCase(ExpenseWriteTestCase):
+    ''' ResponseCacheTestCase: tests that cached responses and their ETags
+            are served until change sequence of the user changes, also by
+            writes of other processes
+
+        Args:
+            ExpenseWriteTestCase (class): test case creating expenses
+    '''
+
+    def setUp(self) -> None:
+        # Change sequence of user is rolled back after each test
+        get_response_cache().clear()
+        self.builds: list = []
+
+    def build(self) -> HttpResponse:
+        self.builds.append(1)
+        return HttpResponse(str(len(self.builds)))
+
+    def get_response(self, etag: str = '') -> HttpResponse:
+        request = RequestFactory().post('/', HTTP_IF_NONE_MATCH=etag)
+        return get_cached_response(request, str(self.user.id), 'test', {},
+                                   self.build)
+
+    def test_invalidate_on_change(self) -> None:
+        first: HttpResponse = self.get_response()
+        second: HttpResponse = self.get_response()
+        self.assertEqual([first['X-Cache'], second['X-Cache']],
+                         ['MISS', 'HIT'])
+        self.assertEqual(second.content, b'1')
+
+        self.create_expense('1.00', '2024-03-05T10:00:00Z')
+        third: HttpResponse = self.get_response()
+        self.assertEqual([third['X-Cache'], third.content], ['MISS', b'2'])
+
+        # Write committed by another process only changes database
+        User.objects.filter(id=self.user.id).update(
+            change_seq=F('change_seq') + 1)
+        self.assertEqual(self.get_response().content, b'3')
+        self.assertEqual(self.get_response()['X-Cache'], 'HIT')
+        self.assertEqual(len(self.builds), 3)
+
+    def test_etag(self) -> None:
+        first: HttpResponse = self.get_response()
+        self.assertEqual(self.get_response(first['ETag']).status_code, 304)
+        self.assertEqual(len(self.builds), 1)
+
+        User.objects.filter(id=self.user.id).update(
+            change_seq=F('change_seq') + 1)
+        second: HttpResponse = self.get_response(first['ETag'])
+        self.assertEqual([second.status_code, second.content], [200, b'2'])
+        self.assertNotEqual(second['ETag'], first['ETag'])
+        self.assertEqual(self.get_response(second['ETag']).status_code, 304)
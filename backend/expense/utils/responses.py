@@ -11,8 +11,32 @@ bulk_create_failed = 'Failed to bulk create data from file.'
 
 bulk_create_success = 'Expenses bulk created successfully.'
 
+invalid_export_format = "Export format must be 'json' or 'csv'."
+
+invalid_sync_token = 'Invalid sync token, sync again without token.'
+
+invalid_search_request = 'Search requires query words and valid filters.'
+
+no_rule_found = 'No category rule found.'
+
+create_rule_failed = 'Error creating category rule in db.'
+
+rule_update_failed = 'Error updating category rule in db.'
+
+rule_deleted = 'Category rule successfully deleted.'
+
 parse_csv_failed = 'Parse csv data failed.'
 
 parse_csv_success = 'CSV imported successfully.'
 
 import_csv_failed = 'Failed to create expenses from CSV data.'
+
+no_import_job_found = 'No import job found.'
+
+import_job_limit = 'Too many import jobs in progress.'
+
+import_job_cancelled = 'Import job successfully cancelled.'
+
+import_job_finished = 'Import job already finished.'
+
+import_job_failed = 'Import job failed:'
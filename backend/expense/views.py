@@ -1,22 +1,58 @@
+import uuid
 from datetime import (datetime, timezone)
+from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.db.models import QuerySet
+from django.http import (HttpResponse, StreamingHttpResponse)
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import ensure_csrf_cookie
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Expense
-from .serializers import ExpenseSerializer
+from .models import (Expense, ImportJob, Tombstone, CategoryRule)
+from .serializers import (ExpenseSerializer, ExpenseReadSerializer,
+                          ImportJobSerializer, CategoryRuleSerializer)
 from .functions.views_functions import (find_expense_by_id,
                                         find_expenses_by_user,
                                         find_expenses_by_category,
-                                        get_expenses_by_range)
+                                        get_expenses_by_range,
+                                        get_sync_changes)
 from .functions.import_functions import decode_data_file
+from .functions.rollup_functions import update_rollups
+from .functions.sync_functions import (add_tombstone, next_change_seq)
+from .functions.export_functions import iter_export_rows
+from .functions.search_functions import (search_expenses,
+                                         SEARCH_PAGE_ORDERING)
+from .functions.categorizer_functions import (train_categorizer,
+                                              get_vendor_category_id)
+from .functions.rule_functions import (find_rules_by_user,
+                                       find_rule_by_id,
+                                       get_rule_category_id,
+                                       reapply_rules)
+from .functions.job_functions import (create_import_job,
+                                      find_import_job_by_id,
+                                      cancel_import_job)
+from .functions.upload_functions import (ExpenseUploadHandler,
+                                         get_upload_options,
+                                         import_file_data)
+from login.utils.cache import get_cached_response
+from login.utils.pagination import (is_paginated, get_keyset_page)
+from login.utils.streaming import (get_streaming_response,
+                                   get_csv_streaming_response)
 from login.utils.responses import invalid_request_body
 from .utils.responses import (no_expense_found, expense_deleted,
                               expense_update_failed, create_expense_failed,
-                              bulk_create_failed, bulk_create_success)
+                              bulk_create_failed, bulk_create_success,
+                              invalid_export_format, create_rule_failed,
+                              rule_update_failed, rule_deleted)
+
+
+# Unique ordering of Expense instances positioning each page
+EXPENSE_PAGE_ORDERING = ['spend_date', 'id']
+
+# Formats of export_expenses ('json' detail list or 'csv' file)
+EXPORT_FORMAT_LIST = ['json', 'csv']
 
 
 class ExpenseViewSet(viewsets.ViewSet):
@@ -28,11 +64,19 @@ class ExpenseViewSet(viewsets.ViewSet):
     '''
     lookup_field = 'id'
 
+    def initialize_request(self, request, *args, **kwargs):
+        # Upload handlers must be set before request body is parsed
+        if self.action_map.get(request.method.lower()) == 'upload_expenses':
+            request.upload_handlers = [ExpenseUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
+
     @method_decorator(ensure_csrf_cookie)
     @action(methods=['post'], detail=False)
     def add_expense(self, request) -> Response:
         ''' add_expense: 'POST' route for 'expense/expenses/add_expense'
-                to create new instance of Expense model
+                to create new instance of Expense model, given category
+                of first rule matching its vendor, else category learned
+                for its vendor, if none chosen
 
         Args:
             request (obj): object from client request, specifically
@@ -53,6 +97,11 @@ class ExpenseViewSet(viewsets.ViewSet):
 
         new_expense['date_created'] = datetime.now(tz=timezone.utc).replace(
             microsecond=0)
+        if not new_expense.get('category'):
+            new_expense['category'] = get_rule_category_id(
+                new_expense.get('user'), new_expense.get('vendor')) or \
+                get_vendor_category_id(new_expense.get('user'),
+                                       new_expense.get('vendor'))
         serializer = ExpenseSerializer(data=new_expense)
         if not serializer.is_valid():
             return Response({'detail': create_expense_failed},
@@ -66,7 +115,10 @@ class ExpenseViewSet(viewsets.ViewSet):
     @action(methods=['post'], detail=False)
     def bulk_create(self, request) -> Response:
         ''' bulk_create: 'POST' route for 'expense/expenses/bulk_create'
-                to bulk create multiple new instances of Expense model
+                to bulk create multiple new instances of Expense model,
+                importing within the request so its response reports the
+                result (large files are better sent to add_import_job,
+                which imports them in the background)
 
         Args:
             request (obj): object from client request, specifically
@@ -95,27 +147,367 @@ class ExpenseViewSet(viewsets.ViewSet):
         return Response({'detail': bulk_create_success},
                         status=status.HTTP_200_OK)
 
+    @method_decorator(ensure_csrf_cookie)
+    @action(methods=['post'], detail=False)
+    def upload_expenses(self, request) -> Response:
+        ''' upload_expenses: 'POST' route for
+                'expense/expenses/upload_expenses' to bulk create multiple
+                new instances of Expense model from binary file data,
+                streaming it into the importer as it is received
+
+        Args:
+            request (obj): object from client request, specifically
+                must contain either a multipart 'expense_file' field or a
+                raw 'text/csv' body (either optionally gzip compressed),
+                and 'user' id and 'has_heading' boolean in query parameters
+
+        Returns:
+            Response (HttpResponse): object containing API response
+                information, specifically a 'detail' string of human-readable
+                response message with success and failed counts,
+                'status' integer with standard Http status code
+        '''
+        options: list | None = get_upload_options(request.query_params)
+        if options is None:
+            return Response({'detail': invalid_request_body},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        if request.content_type.startswith('multipart/form-data'):
+            # Parsing form data runs the import via ExpenseUploadHandler
+            request.data
+            response = request.upload_handlers[0].response
+        elif request.stream is None:
+            return Response({'detail': invalid_request_body},
+                            status=status.HTTP_400_BAD_REQUEST)
+        else:
+            [userId, has_heading] = options
+            response = import_file_data(request.stream, has_heading, userId)
+
+        if response[1] != status.HTTP_200_OK:
+            return Response({'detail': response[0]},
+                            status=status.HTTP_207_MULTI_STATUS)
+        return Response({'detail': response[0]},
+                        status=status.HTTP_200_OK)
+
+    @method_decorator(ensure_csrf_cookie)
+    @action(methods=['post'], detail=False)
+    def retrain_categorizer(self, request) -> Response:
+        ''' retrain_categorizer: 'POST' route for
+                'expense/expenses/retrain_categorizer' to train vendor
+                categorizer of a specific User instance again from all of
+                its categorized expenses
+
+        Args:
+            request (obj): object from client request, specifically
+                must contain a dictionary with an 'user' id in
+                request.data
+
+        Returns:
+            Response (HttpResponse): object containing API response
+                information, specifically a 'detail' object of number of
+                'vendors' and 'expenses' learned, 'status' integer with
+                standard Http status code
+        '''
+        try:
+            userId: str = str(uuid.UUID(str(request.data['user'])))
+        except (KeyError, ValueError):
+            return Response({'detail': invalid_request_body},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        categorizer = train_categorizer(userId)
+        return Response({'detail': {'vendors': categorizer.vendors,
+                                    'expenses': categorizer.expenses}},
+                        status=status.HTTP_200_OK)
+
+    @method_decorator(ensure_csrf_cookie)
+    @action(methods=['post'], detail=False)
+    def add_rule(self, request) -> Response:
+        ''' add_rule: 'POST' route for 'expense/expenses/add_rule' to create
+                new instance of CategoryRule model giving expenses whose
+                vendor contains any of its keywords its category
+
+        Args:
+            request (obj): object from client request, specifically
+                must contain a dictionary with comma separated 'keywords',
+                'category' id, 'user' id and optionally 'priority' (lower
+                applied first) in request.data
+
+        Returns:
+            Response (HttpResponse): object containing API response
+                information, specifically a 'detail' string of human-readable
+                response message or new rule id if status=200, 'status'
+                integer with standard Http status code
+        '''
+        serializer = CategoryRuleSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({'detail': create_rule_failed},
+                            status=status.HTTP_207_MULTI_STATUS)
+        serializer.save()
+        rule: dict = serializer.data
+        return Response({'detail': rule['id']},
+                        status=status.HTTP_200_OK)
+
+    @method_decorator(ensure_csrf_cookie)
+    @action(methods=['post'], detail=False)
+    def user_rules(self, request) -> Response:
+        ''' user_rules: 'POST' route for 'expense/expenses/user_rules' to
+                get all instances of CategoryRule model associated to a
+                specific User instance in priority order
+
+        Args:
+            request (obj): object from client request, specifically
+                must contain a dictionary with an 'user' id in
+                request.data
+
+        Returns:
+            Response (HttpResponse): object containing API response
+                information, specifically a 'detail' object of
+                CategoryRuleSerializer data containing queryset of
+                CategoryRule database or error if no data found, 'status'
+                integer with standard Http status code
+        '''
+        try:
+            userId: str = request.data['user']
+            response = find_rules_by_user(userId)
+            if response[1] == status.HTTP_404_NOT_FOUND:
+                return Response({'detail': response[0]},
+                                status=status.HTTP_207_MULTI_STATUS)
+        except (KeyError, ValueError, ValidationError):
+            return Response({'detail': invalid_request_body},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = CategoryRuleSerializer(response[0], many=True)
+        return Response({'detail': serializer.data},
+                        status=status.HTTP_200_OK)
+
+    @method_decorator(ensure_csrf_cookie)
+    @action(methods=['patch'], detail=False)
+    def update_rule(self, request) -> Response:
+        ''' update_rule: 'PATCH' route for 'expense/expenses/update_rule' to
+                update selected field(s) for a specific CategoryRule
+                instance (existing expenses keep their category until
+                rules are reapplied)
+
+        Args:
+            request (obj): object from client request, specifically
+                must contain a dictionary with a 'rule_id' and field(s) to
+                be updated in request.data
+
+        Returns:
+            Response (HttpResponse): object containing API response
+                information, specifically a 'detail' string of human-readable
+                response message or rule id if status=200, 'status'
+                integer with standard Http status code
+        '''
+        try:
+            ruleId: str = request.data['rule_id']
+            response = find_rule_by_id(ruleId)
+            if response[1] == status.HTTP_404_NOT_FOUND:
+                return Response({'detail': response[0]},
+                                status=status.HTTP_207_MULTI_STATUS)
+        except (KeyError, ValueError, ValidationError):
+            return Response({'detail': invalid_request_body},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        rule: CategoryRule = response[0]
+        data: dict = {key: value for [key, value] in request.data.items()
+                      if key != 'user'}
+        serializer = CategoryRuleSerializer(rule, data=data, partial=True)
+        if not serializer.is_valid():
+            return Response({'detail': rule_update_failed},
+                            status=status.HTTP_400_BAD_REQUEST)
+        serializer.save()
+        return Response({'detail': serializer.data['id']},
+                        status=status.HTTP_200_OK)
+
+    @method_decorator(ensure_csrf_cookie)
+    @action(methods=['delete'], detail=False)
+    def remove_rule(self, request) -> Response:
+        ''' remove_rule: 'DELETE' route for 'expense/expenses/remove_rule'
+                to delete a specific CategoryRule instance
+
+        Args:
+            request (obj): object from client request, specifically
+                must contain a dictionary with a 'rule_id' in request.data
+
+        Returns:
+            Response (HttpResponse): object containing API response
+                information, specifically a 'detail' string of human-readable
+                response message, 'status' integer with standard Http
+                status code
+        '''
+        try:
+            ruleId: str = request.data['rule_id']
+            response = find_rule_by_id(ruleId)
+            if response[1] == status.HTTP_404_NOT_FOUND:
+                return Response({'detail': response[0]},
+                                status=status.HTTP_207_MULTI_STATUS)
+        except (KeyError, ValueError, ValidationError):
+            return Response({'detail': invalid_request_body},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        rule: CategoryRule = response[0]
+        with transaction.atomic():
+            # Compiled rules of user are kept by change sequence number
+            next_change_seq(rule.user_id)
+            rule.delete()
+        return Response({'detail': rule_deleted},
+                        status=status.HTTP_200_OK)
+
+    @method_decorator(ensure_csrf_cookie)
+    @action(methods=['post'], detail=False)
+    def reapply_rules(self, request) -> Response:
+        ''' reapply_rules: 'POST' route for 'expense/expenses/reapply_rules'
+                to give every existing expense of a specific User instance
+                matching a category rule the category of that rule
+
+        Args:
+            request (obj): object from client request, specifically
+                must contain a dictionary with an 'user' id in
+                request.data
+
+        Returns:
+            Response (HttpResponse): object containing API response
+                information, specifically a 'detail' object of number of
+                expenses 'updated', 'status' integer with standard Http
+                status code
+        '''
+        try:
+            userId: str = str(uuid.UUID(str(request.data['user'])))
+        except (KeyError, ValueError):
+            return Response({'detail': invalid_request_body},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        response = reapply_rules(userId)
+        return Response({'detail': {'updated': response[0]}},
+                        status=status.HTTP_200_OK)
+
+    @method_decorator(ensure_csrf_cookie)
+    @action(methods=['post'], detail=False)
+    def add_import_job(self, request) -> Response:
+        ''' add_import_job: 'POST' route for 'expense/expenses/add_import_job'
+                to store expense file data and create new instance of
+                ImportJob model importing it in the background
+
+        Args:
+            request (obj): object from client request, specifically
+                must contain a dictionary with 'expense_file', which is
+                a base64 encoded string of the expenses data, 'has_heading'
+                boolean and 'user' id in request.data
+
+        Returns:
+            Response (HttpResponse): object containing API response
+                information, specifically a 'detail' string of human-readable
+                response message or new import job id if status=200,
+                'status' integer with standard Http status code
+        '''
+        try:
+            data_file = request.data['expense_file']
+            has_heading = request.data['has_heading']
+            userId = request.data['user']
+            response = create_import_job(data_file, has_heading, userId)
+        except (KeyError, ValidationError):
+            return Response({'detail': invalid_request_body},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        if response[1] != status.HTTP_200_OK:
+            return Response({'detail': response[0]},
+                            status=status.HTTP_207_MULTI_STATUS)
+        return Response({'detail': response[0]},
+                        status=status.HTTP_200_OK)
+
+    @method_decorator(ensure_csrf_cookie)
+    @action(methods=['post'], detail=False)
+    def get_import_job(self, request) -> Response:
+        ''' get_import_job: 'POST' route for 'expense/expenses/get_import_job'
+                to return status and progress of a specific import job
+
+        Args:
+            request (obj): object from client request, specifically
+                must contain a dictionary with a 'job_id' in request.data
+
+        Returns:
+            Response (HttpResponse): object containing API response
+                information, specifically a 'detail' object of
+                ImportJobSerializer data containing ImportJob instance
+                with rows parsed, inserted and failed, throughput and eta
+                or error if no data found, 'status' integer with
+                standard Http status code
+        '''
+        try:
+            jobId: str = request.data['job_id']
+            response = find_import_job_by_id(jobId)
+            if response[1] == status.HTTP_404_NOT_FOUND:
+                return Response({'detail': response[0]},
+                                status=status.HTTP_207_MULTI_STATUS)
+        except (KeyError, ValidationError):
+            return Response({'detail': invalid_request_body},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        job: ImportJob = response[0]
+        serializer = ImportJobSerializer(job)
+        return Response({'detail': serializer.data},
+                        status=status.HTTP_200_OK)
+
+    @method_decorator(ensure_csrf_cookie)
+    @action(methods=['patch'], detail=False)
+    def cancel_import_job(self, request) -> Response:
+        ''' cancel_import_job: 'PATCH' route for
+                'expense/expenses/cancel_import_job' to cancel a specific
+                queued or running import job
+
+        Args:
+            request (obj): object from client request, specifically
+                must contain a dictionary with a 'job_id' in request.data
+
+        Returns:
+            Response (HttpResponse): object containing API response
+                information, specifically a 'detail' string of human-readable
+                response message, 'status' integer with standard Http
+                status code
+        '''
+        try:
+            jobId: str = request.data['job_id']
+            response = find_import_job_by_id(jobId)
+            if response[1] == status.HTTP_404_NOT_FOUND:
+                return Response({'detail': response[0]},
+                                status=status.HTTP_207_MULTI_STATUS)
+        except (KeyError, ValidationError):
+            return Response({'detail': invalid_request_body},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        job: ImportJob = response[0]
+        response = cancel_import_job(job)
+        if response[1] != status.HTTP_200_OK:
+            return Response({'detail': response[0]},
+                            status=status.HTTP_207_MULTI_STATUS)
+        return Response({'detail': response[0]},
+                        status=status.HTTP_200_OK)
+
     def list(self, request) -> Response:
         ''' list: 'GET' route for 'expense/expenses' to get all
                 instances of Expense model
 
         Args:
-            request (obj): object from client request (no data required)
+            request (obj): object from client request, optionally with
+                'cursor' and/or 'page_size' query parameters to get a
+                single page
 
         Returns:
             Response (HttpResponse): object containing API response
                 information, specifically a 'detail' object of
                 ExpenseSerializer data containing queryset of Expense
-                database or error if no data found, 'status' integer with
-                standard Http status code
+                database or error if no data found, 'next' and 'previous'
+                cursors if paginated, 'status' integer with standard Http
+                status code
         '''
         queryset: QuerySet[Expense] = Expense.objects.all()
-        if len(queryset) == 0:
+        if is_paginated(request.query_params):
+            return get_expense_page(queryset, request.query_params)
+        if not queryset.exists():
             return Response({'detail': no_expense_found},
                             status=status.HTTP_404_NOT_FOUND)
-        serializer = ExpenseSerializer(queryset, many=True)
-        return Response({'detail': serializer.data},
-                        status=status.HTTP_200_OK)
+        return get_expense_stream(queryset)
 
     @method_decorator(ensure_csrf_cookie)
     @action(methods=['post'], detail=False)
@@ -128,31 +520,95 @@ class ExpenseViewSet(viewsets.ViewSet):
         Args:
             request (obj): object from client request, specifically
                 must contain a dictionary with an 'user' id
-                and 'type' ('current' or 'all') in request.data
+                and 'type' ('current' or 'all') in request.data, optionally
+                with 'cursor' and/or 'page_size' to get a single page
 
 
         Returns:
             Response (HttpResponse): object containing API response
                 information, specifically a 'detail' object of
                 ExpenseSerializer data containing queryset of Expense
-                database or error if no data found, 'status' integer with
-                standard Http status code
+                database or error if no data found, 'next' and 'previous'
+                cursors if paginated, 'status' integer with standard Http
+                status code
         '''
         try:
             userId: str = request.data['user']
             type: str = request.data['type']
-            response = find_expenses_by_user(userId, type)
-            if response[1] == status.HTTP_404_NOT_FOUND:
-                return Response({'detail': response[0]},
-                                status=status.HTTP_207_MULTI_STATUS)
         except KeyError:
             return Response({'detail': invalid_request_body},
                             status=status.HTTP_400_BAD_REQUEST)
 
-        queryset: QuerySet[Expense] = response[0]
-        serializer = ExpenseSerializer(queryset, many=True)
-        return Response({'detail': serializer.data},
-                        status=status.HTTP_200_OK)
+        return get_cached_response(
+            request, userId, 'user_expenses', request.data,
+            lambda: get_user_expenses(userId, type, request.data))
+
+    @method_decorator(ensure_csrf_cookie)
+    @action(methods=['post'], detail=False)
+    def sync(self, request) -> Response:
+        ''' sync: 'POST' route for 'expense/expenses/sync' to get instances
+                of Expense and Category models associated to a specific
+                User instance created or updated, and ids of instances
+                deleted, since a previous sync
+
+        Args:
+            request (obj): object from client request, specifically
+                must contain a dictionary with an 'user' id and optionally
+                'token' returned by previous sync (all expenses and
+                categories without token) in request.data
+
+        Returns:
+            Response (HttpResponse): object containing API response
+                information, specifically a 'detail' object of new
+                'token', changed 'expenses' and 'categories' and
+                'deleted' ids or error if token invalid, 'status' integer
+                with standard Http status code
+        '''
+        try:
+            userId: str = request.data['user']
+            token: str | None = request.data.get('token')
+        except KeyError:
+            return Response({'detail': invalid_request_body},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return get_cached_response(
+            request, userId, 'sync', {'token': token},
+            lambda: get_sync_response(userId, token))
+
+    @method_decorator(ensure_csrf_cookie)
+    @action(methods=['post'], detail=False)
+    def search(self, request) -> Response:
+        ''' search: 'POST' route for 'expense/expenses/search' to get a page
+                of instances of Expense model associated to a specific
+                User instance matching search words in vendor or
+                description, most relevant first
+
+        Args:
+            request (obj): object from client request, specifically
+                must contain a dictionary with an 'user' id and 'query'
+                search text (words ending with '*' match as prefix) in
+                request.data, optionally with 'start_date', 'end_date',
+                'category_id', 'type', 'min_amount' and 'max_amount'
+                filters and 'cursor' and/or 'page_size'
+
+        Returns:
+            Response (HttpResponse): object containing API response
+                information, specifically a 'detail' object of
+                ExpenseReadSerializer data containing page of matches,
+                'next' and 'previous' cursors or error if query or
+                filters invalid, 'status' integer with standard Http
+                status code
+        '''
+        try:
+            userId: str = request.data['user']
+            request.data['query']
+        except KeyError:
+            return Response({'detail': invalid_request_body},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return get_cached_response(
+            request, userId, 'search', request.data,
+            lambda: get_search_response(userId, request.data))
 
     @method_decorator(ensure_csrf_cookie)
     @action(methods=['post'], detail=False)
@@ -165,20 +621,27 @@ class ExpenseViewSet(viewsets.ViewSet):
         Args:
             request (obj): object from client request, specifically
                 must contain a dictionary with an 'user' id, as well as
-                'start_date' and 'end_date' for date range
+                'start_date' and 'end_date' for date range, with optional
+                'format' ('json' default or 'csv') and 'gzip' flag to
+                compress CSV file
 
 
         Returns:
             Response (HttpResponse): object containing API response
                 information, specifically a 'detail' object of
-                comma delimited Expense database queryset or error
-                if no data found, 'status' integer with
-                standard Http status code
+                comma delimited Expense database queryset (or CSV file
+                download of Date, Vendor, signed Amount, Type and
+                Category columns) or error if no data found, 'status'
+                integer with standard Http status code
         '''
         try:
             userId: str = request.data['user']
             start_date: str = request.data['start_date']
             end_date: str = request.data['end_date']
+            export_format: str = request.data.get('format', 'json')
+            if export_format not in EXPORT_FORMAT_LIST:
+                return Response({'detail': invalid_export_format},
+                                status=status.HTTP_400_BAD_REQUEST)
             response = get_expenses_by_range(userId, start_date, end_date)
             if response[1] != status.HTTP_200_OK:
                 return Response({'detail': response[0]},
@@ -188,9 +651,11 @@ class ExpenseViewSet(viewsets.ViewSet):
                             status=status.HTTP_400_BAD_REQUEST)
 
         queryset: QuerySet[Expense] = response[0]
-        serializer = ExpenseSerializer(queryset, many=True)
-        return Response({'detail': serializer.data},
-                        status=status.HTTP_200_OK)
+        if export_format == 'csv':
+            return get_csv_streaming_response(
+                iter_export_rows(queryset), 'expenses.csv',
+                compress=request.data.get('gzip') in [True, 'true', '1'])
+        return get_expense_stream(queryset)
 
     @method_decorator(ensure_csrf_cookie)
     @action(methods=['post'], detail=False)
@@ -217,18 +682,13 @@ class ExpenseViewSet(viewsets.ViewSet):
             userId: str = request.data['user']
             categoryId: str = request.data['category_id']
             type: str = request.data['type']
-            response = find_expenses_by_category(categoryId, userId, type)
-            if response[1] == status.HTTP_404_NOT_FOUND:
-                return Response({'detail': response[0]},
-                                status=status.HTTP_207_MULTI_STATUS)
         except KeyError:
             return Response({'detail': invalid_request_body},
                             status=status.HTTP_400_BAD_REQUEST)
 
-        queryset: QuerySet[Expense] = response[0]
-        serializer = ExpenseSerializer(queryset, many=True)
-        return Response({'detail': serializer.data},
-                        status=status.HTTP_200_OK)
+        return get_cached_response(
+            request, userId, 'category_expenses', request.data,
+            lambda: get_category_expenses(userId, categoryId, type))
 
     @method_decorator(ensure_csrf_cookie)
     @action(methods=['post'], detail=False)
@@ -337,6 +797,161 @@ class ExpenseViewSet(viewsets.ViewSet):
                             status=status.HTTP_400_BAD_REQUEST)
 
         expense: Expense = response[0]
-        expense.delete()
+        with transaction.atomic():
+            update_rollups([expense], -1)
+            add_tombstone(expense.user_id, Tombstone.EXPENSE, expense.id)
+            expense.delete()
         return Response({'detail': expense_deleted},
                         status=status.HTTP_200_OK)
+
+
+def get_sync_response(userId: str, token: str | None) -> HttpResponse:
+    ''' get_sync_response: function to get response of sync route (cached
+            by user data version)
+
+        Args:
+            userId (str): id for requested User instance
+            token (str): token returned by previous sync
+
+        Returns:
+            HttpResponse: object containing API response information,
+                specifically a 'detail' object of sync changes or error if
+                token invalid, 'status' integer with standard Http status
+                code
+    '''
+    response: list = get_sync_changes(userId, token)
+    if response[1] == status.HTTP_404_NOT_FOUND:
+        return Response({'detail': response[0]},
+                        status=status.HTTP_207_MULTI_STATUS)
+    return Response({'detail': response[0]}, status=response[1])
+
+
+def get_search_response(userId: str, params) -> Response:
+    ''' get_search_response: function to get response of search route
+            (cached by user data version)
+
+        Args:
+            userId (str): id for requested User instance
+            params (dict): request body with 'query' search text, filters
+                and optional 'cursor' string and 'page_size' integer
+
+        Returns:
+            Response (HttpResponse): object containing API response
+                information, specifically a 'detail' object of
+                ExpenseReadSerializer data containing page of matches,
+                'next' and 'previous' cursor strings or error if request
+                invalid, 'status' integer with standard Http status code
+    '''
+    response: list = search_expenses(userId, params)
+    if response[1] == status.HTTP_400_BAD_REQUEST:
+        return Response({'detail': response[0]},
+                        status=status.HTTP_400_BAD_REQUEST)
+    queryset: QuerySet[Expense] = response[0]
+    return get_expense_page(queryset, params, SEARCH_PAGE_ORDERING)
+
+
+def get_user_expenses(userId: str, type: str, params) -> HttpResponse:
+    ''' get_user_expenses: function to get response of user_expenses
+            route (cached by user data version)
+
+        Args:
+            userId (str): id for requested User instance
+            type (str): either 'current' or 'all' for which expenses
+                to retrieve: all time or current month
+            params (dict): request body, with optional 'cursor' string
+                and 'page_size' integer to get a single page
+
+        Returns:
+            HttpResponse: object containing API response information,
+                specifically a 'detail' object of ExpenseReadSerializer
+                data or error if no data found, 'status' integer with
+                standard Http status code
+    '''
+    response: list = find_expenses_by_user(userId, type)
+    if response[1] == status.HTTP_404_NOT_FOUND:
+        return Response({'detail': response[0]},
+                        status=status.HTTP_207_MULTI_STATUS)
+    queryset: QuerySet[Expense] = response[0]
+    if is_paginated(params):
+        return get_expense_page(queryset, params)
+    return get_expense_stream(queryset)
+
+
+def get_category_expenses(userId: str, categoryId: str,
+                          type: str) -> HttpResponse:
+    ''' get_category_expenses: function to get response of
+            category_expenses route (cached by user data version)
+
+        Args:
+            userId (str): id for requested User instance
+            categoryId (str): id for requested Category instance
+            type (str): either 'current' or 'all' for which expenses
+                to retrieve: all time or current month
+
+        Returns:
+            HttpResponse: object containing API response information,
+                specifically a 'detail' object of ExpenseReadSerializer
+                data or error if no data found, 'status' integer with
+                standard Http status code
+    '''
+    response: list = find_expenses_by_category(categoryId, userId, type)
+    if response[1] == status.HTTP_404_NOT_FOUND:
+        return Response({'detail': response[0]},
+                        status=status.HTTP_207_MULTI_STATUS)
+    queryset: QuerySet[Expense] = response[0]
+    return get_expense_stream(queryset)
+
+
+def get_expense_page(queryset: QuerySet[Expense], params,
+                     ordering: list = EXPENSE_PAGE_ORDERING) -> Response:
+    ''' get_expense_page: function to get response containing a single
+            page of Expense rows ordered by spend_date then id (or by
+            ordering given)
+
+        Args:
+            queryset (QuerySet): queryset of Expense instances
+            params (dict): request query parameters or body, with optional
+                'cursor' string and 'page_size' integer
+            ordering (list): unique combination of field (or annotation)
+                names to order and position pages by
+
+        Returns:
+            Response (HttpResponse): object containing API response
+                information, specifically a 'detail' object of
+                ExpenseReadSerializer data containing page of queryset, 'next'
+                and 'previous' cursor strings (None at either end) or error
+                if cursor or page size invalid, 'status' integer with
+                standard Http status code
+    '''
+    # Annotations ordered by (as search rank) are read with each row
+    annotations: list = [name for name in ordering
+                         if name in queryset.query.annotations]
+    response: list = get_keyset_page(
+        ExpenseReadSerializer.get_values(queryset, *annotations), params,
+        ordering)
+    if response[1] == status.HTTP_400_BAD_REQUEST:
+        return Response({'detail': response[0]},
+                        status=status.HTTP_400_BAD_REQUEST)
+    page: dict = response[0]
+    serializer = ExpenseReadSerializer(page['results'], many=True)
+    return Response({'detail': serializer.data, 'next': page['next'],
+                     'previous': page['previous']},
+                    status=status.HTTP_200_OK)
+
+
+def get_expense_stream(queryset: QuerySet[Expense]) -> StreamingHttpResponse:
+    ''' get_expense_stream: function to get response streaming all
+            Expense rows of queryset, reading category names in the
+            same query
+
+        Args:
+            queryset (QuerySet): queryset of Expense instances
+
+        Returns:
+            StreamingHttpResponse: object containing API response
+                information, specifically a 'detail' object of
+                ExpenseReadSerializer data containing queryset, 'status'
+                integer with standard Http status code
+    '''
+    return get_streaming_response(ExpenseReadSerializer.get_values(queryset),
+                                  ExpenseReadSerializer)
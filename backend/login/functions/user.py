@@ -1,3 +1,4 @@
+import uuid
 from django.db.models import QuerySet
 from rest_framework import status
 from ..models.user import User
@@ -21,3 +22,21 @@ def find_user_by_id(userId: str) -> list:
         return [no_user_found, status.HTTP_404_NOT_FOUND]
     user: User = queryset[0]
     return [user, status.HTTP_200_OK]
+
+
+def user_exists(userId) -> bool:
+    ''' user_exists: function to determine whether id is a valid uuid of
+            an existing User instance (so ids from query parameters and
+            files need no further validation)
+
+        Args:
+            userId (str): id for requested User instance
+
+        Returns:
+            bool: True if user exists
+    '''
+    try:
+        userId = uuid.UUID(str(userId))
+    except ValueError:
+        return False
+    return User.objects.filter(id=userId).exists()
@@ -62,6 +62,10 @@ class User(models.Model):
     last_login = CustomDateTimeField(blank=False, null=False)
     is_admin = models.BooleanField(blank=False, null=False, default=False)
     deleted = models.BooleanField(blank=False, null=False, default=False)
+    # Last change sequence number given to expenses and categories of
+    # user (see expense sync)
+    change_seq = models.BigIntegerField(blank=False, null=False, default=0,
+                                        editable=False)
 
     def __str__(self) -> str:
         return self.email
@@ -69,3 +73,5 @@ class User(models.Model):
     class Meta:
         verbose_name_plural = 'Users'
         db_table = 'login_users'
+        indexes = [models.Index(fields=['deleted', 'date_created', 'id'],
+                                name='user_deleted_created_idx')]
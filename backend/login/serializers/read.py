@@ -0,0 +1,112 @@
+from datetime import datetime
+from decimal import Decimal
+from django.db.models import QuerySet
+from django.utils import timezone
+
+
+class ReadSerializer:
+    ''' ReadSerializer: base class of read only serializers converting
+            rows of QuerySet.values() to the same JSON fields and formats
+            as the model serializer, without building model instances or
+            serializer fields for each row
+
+        Subclasses set value_fields (model field names read by values(),
+        in order of serializer fields), value_expressions (joined or
+        computed columns) and value_formats (function formatting value of
+        a field like its serializer field, values of other fields being
+        used as read).
+    '''
+    value_fields: list = []
+    value_expressions: dict = {}
+    value_formats: dict = {}
+
+    def __init__(self, instance=None, many: bool = False):
+        self.instance = instance
+        self.many = many
+
+    @classmethod
+    def get_values(cls, queryset: QuerySet, *names: str) -> QuerySet:
+        ''' get_values: function to get queryset of row dictionaries
+                containing only columns read by serializer
+
+            Args:
+                queryset (QuerySet): queryset of model instances
+                names (str): other field or annotation names to read
+
+            Returns:
+                QuerySet: queryset of row dictionaries
+        '''
+        return queryset.values(*cls.value_fields, *names,
+                               **cls.value_expressions)
+
+    def to_representation(self, row: dict) -> dict:
+        ''' to_representation: function to convert single row dictionary
+                to serializer data of value_fields, formatted by
+                value_formats
+
+            Args:
+                row (dict): row dictionary from get_values queryset
+
+            Returns:
+                dict: dictionary of serializer data
+        '''
+        formats: dict = self.value_formats
+        return {name: formats[name](row[name]) if name in formats
+                else row[name] for name in self.value_fields}
+
+    @property
+    def data(self) -> list | dict:
+        if self.many:
+            return [self.to_representation(row) for row in self.instance]
+        return self.to_representation(self.instance)
+
+
+def format_datetime(value: datetime | None) -> str | None:
+    ''' format_datetime: function to format datetime as ISO 8601 string
+            in current timezone without microseconds, with 'Z' for UTC
+            (as DateTimeField of serializer)
+
+        Args:
+            value (datetime): timezone aware datetime
+
+        Returns:
+            str: ISO 8601 date time string
+    '''
+    if value is None:
+        return None
+    value = timezone.localtime(value).replace(microsecond=0)
+    string: str = value.isoformat()
+    if string.endswith('+00:00'):
+        string = string[:-6] + 'Z'
+    return string
+
+
+def format_decimal(value: Decimal | None, places: int = 2) -> str | None:
+    ''' format_decimal: function to format decimal as fixed point string
+            with number of decimal places of model field (as DecimalField
+            of serializer)
+
+        Args:
+            value (Decimal): decimal value
+            places (int): number of decimal places
+
+        Returns:
+            str: fixed point decimal string
+    '''
+    if value is None:
+        return None
+    return '{:f}'.format(Decimal(value).quantize(Decimal(1).scaleb(-places)))
+
+
+def format_uuid(value) -> str | None:
+    ''' format_uuid: function to format uuid as hyphenated string
+
+        Args:
+            value (UUID): uuid value
+
+        Returns:
+            str: hyphenated uuid string
+    '''
+    if value is None:
+        return None
+    return str(value)
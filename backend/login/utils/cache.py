@@ -0,0 +1,312 @@
+''' Per-user versioned cache of read route responses '''
+import hashlib
+import json
+import threading
+import time
+from datetime import (datetime, timezone)
+from typing import (Callable, Iterator)
+from django.conf import settings
+from django.core.cache import (BaseCache, caches)
+from django.core.exceptions import ValidationError
+from django.http import (HttpResponse, HttpResponseNotModified,
+                         StreamingHttpResponse)
+from django.utils.http import parse_etags
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from ..models.user import User
+
+
+# Counters of cache lookups since process started (see get_cache_stats)
+CACHE_STATS = {'hits': 0, 'misses': 0, 'waits': 0, 'stores': 0,
+               'skipped': 0}
+
+stats_lock = threading.Lock()
+
+# Seconds between checks for entry built by another request
+CACHE_WAIT_INTERVAL = 0.05
+
+
+def get_response_cache() -> BaseCache:
+    ''' get_response_cache: function to get cache of read route responses
+            (RESPONSE_CACHE_ALIAS of CACHES setting)
+
+        Returns:
+            BaseCache: Django cache instance
+    '''
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def get_user_version(userId: str) -> int:
+    ''' get_user_version: function to get data version of User instance,
+            its change sequence number, increased in the transaction of
+            every write of its expenses or categories (read from database,
+            so writes of other processes and commands change it too)
+
+        Args:
+            userId (str): id for User instance
+
+        Returns:
+            int: data version of user (0 if no user found, so invalid ids
+                are answered by route as before)
+    '''
+    try:
+        version: int | None = User.objects.filter(id=userId).values_list(
+            'change_seq', flat=True).first()
+    except ValidationError:
+        version = None
+    return 0 if version is None else version
+
+
+def get_cache_key(userId: str, name: str, params) -> str:
+    ''' get_cache_key: function to get cache key of response of read route
+            for current data version of User instance and current month
+            (so routes reading the current month are not served after it
+            ends)
+
+        Args:
+            userId (str): id for User instance
+            name (str): name of read route
+            params (dict): request parameters changing response
+
+        Returns:
+            str: cache key
+    '''
+    params = dict(params.items()) if hasattr(params, 'items') else params
+    digest: str = hashlib.sha1(json.dumps(
+        params, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    month: str = datetime.now(tz=timezone.utc).strftime('%Y-%m')
+    return ':'.join(['response', str(userId), str(get_user_version(userId)),
+                     month, name, digest])
+
+
+def get_etag(key: str) -> str:
+    ''' get_etag: function to get strong ETag of response from its cache
+            key, so it changes with data version of user (change sequence
+            in database, so same in every process and changed by writes
+            of any process), month and request parameters but not content
+            (known before response is built)
+
+        Args:
+            key (str): cache key of response
+
+        Returns:
+            str: quoted ETag string
+    '''
+    return '"' + hashlib.sha1(key.encode('utf-8')).hexdigest() + '"'
+
+
+def is_not_modified(request, etag: str) -> bool:
+    ''' is_not_modified: function to determine whether 'If-None-Match'
+            header of request matches ETag of response
+
+        Args:
+            request (obj): object from client request
+            etag (str): quoted ETag string
+
+        Returns:
+            bool: True if client copy is current
+    '''
+    etags: list = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+    return '*' in etags or etag in etags
+
+
+def get_cached_response(request, userId: str, name: str, params,
+                        build: Callable[[], HttpResponse]) -> HttpResponse:
+    ''' get_cached_response: function to get response of read route from
+            cache, or build and store it, with only one request building
+            each missing entry while others wait for it (stampede
+            protection), or 'Not Modified' if request 'If-None-Match'
+            matches ETag (before reading cache or database)
+
+        Args:
+            request (obj): object from client request
+            userId (str): id for User instance owning response data
+            name (str): name of read route
+            params (dict): request parameters changing response
+            build (Callable): function returning response of route (not
+                stored and without ETag if it sets
+                'Cache-Control: no-store')
+
+        Returns:
+            HttpResponse: object containing API response information,
+                with 'ETag' header and 'X-Cache' header set to 'HIT' or
+                'MISS', or 304 status code without content
+    '''
+    cache: BaseCache = get_response_cache()
+    key: str = get_cache_key(userId, name, params)
+    etag: str = get_etag(key)
+    if is_not_modified(request, etag):
+        response: HttpResponse = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    response = get_stored_response(cache, key, build)
+    if 'no-store' not in response.get('Cache-Control', ''):
+        response['ETag'] = etag
+    return response
+
+
+def get_stored_response(cache: BaseCache, key: str,
+                        build: Callable[[], HttpResponse]) -> HttpResponse:
+    ''' get_stored_response: function to get response stored in cache, or
+            build and store it if this request holds lock of entry
+
+        Args:
+            cache (BaseCache): cache of responses
+            key (str): cache key of entry
+            build (Callable): function returning response of route
+
+        Returns:
+            HttpResponse: object containing API response information,
+                with 'X-Cache' header set to 'HIT' or 'MISS'
+    '''
+    entry: list | None = cache.get(key)
+    if entry is None:
+        lock_key: str = key + ':lock'
+        timeout: int = settings.RESPONSE_CACHE_LOCK_TIMEOUT
+        if cache.add(lock_key, 1, timeout=timeout):
+            count_cache_stat('misses')
+            return store_response(cache, key, lock_key, build())
+        count_cache_stat('waits')
+        entry = wait_for_entry(cache, key, lock_key)
+    if entry is None:
+        count_cache_stat('misses')
+        response: HttpResponse = build()
+        response['X-Cache'] = 'MISS'
+        return response
+
+    count_cache_stat('hits')
+    [status, content_type, content] = entry
+    response = HttpResponse(content, content_type=content_type,
+                            status=status)
+    response['X-Cache'] = 'HIT'
+    return response
+
+
+def wait_for_entry(cache: BaseCache, key: str,
+                   lock_key: str) -> list | None:
+    ''' wait_for_entry: function to wait for cache entry built by another
+            request, until its lock is released or expires
+
+        Args:
+            cache (BaseCache): cache of responses
+            key (str): cache key of entry
+            lock_key (str): cache key of lock of entry
+
+        Returns:
+            list: cache entry (None if not stored)
+    '''
+    while cache.get(lock_key) is not None:
+        time.sleep(CACHE_WAIT_INTERVAL)
+        entry: list | None = cache.get(key)
+        if entry is not None:
+            return entry
+    return cache.get(key)
+
+
+def store_response(cache: BaseCache, key: str, lock_key: str,
+                   response: HttpResponse) -> HttpResponse:
+    ''' store_response: function to store content of built response in
+            cache (rendered as JSON if a Response), releasing lock once
+            stored or skipped if larger than RESPONSE_CACHE_MAX_ENTRY_SIZE
+
+        Args:
+            cache (BaseCache): cache of responses
+            key (str): cache key of entry
+            lock_key (str): cache key of lock of entry
+            response (HttpResponse): response of read route
+
+        Returns:
+            HttpResponse: object containing API response information
+                (streamed as stored if a StreamingHttpResponse)
+    '''
+    if 'no-store' in response.get('Cache-Control', ''):
+        cache.delete(lock_key)
+        count_cache_stat('skipped')
+        return response
+
+    if isinstance(response, StreamingHttpResponse):
+        streaming_response = StreamingHttpResponse(
+            iter_stored_content(cache, key, lock_key, response),
+            content_type=response['Content-Type'],
+            status=response.status_code)
+        streaming_response['X-Cache'] = 'MISS'
+        return streaming_response
+
+    if isinstance(response, Response):
+        renderer = JSONRenderer()
+        response = HttpResponse(renderer.render(response.data),
+                                content_type=renderer.media_type,
+                                status=response.status_code)
+    content: bytes = response.content
+    if len(content) <= settings.RESPONSE_CACHE_MAX_ENTRY_SIZE:
+        cache.set(key, [response.status_code, response['Content-Type'],
+                        content])
+        count_cache_stat('stores')
+    else:
+        count_cache_stat('skipped')
+    cache.delete(lock_key)
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+def iter_stored_content(cache: BaseCache, key: str, lock_key: str,
+                        response: StreamingHttpResponse) -> Iterator[bytes]:
+    ''' iter_stored_content: function to yield content of streaming
+            response while keeping a copy, stored in cache once finished
+            unless larger than RESPONSE_CACHE_MAX_ENTRY_SIZE (so streamed
+            routes keep constant memory for large responses)
+
+        Args:
+            cache (BaseCache): cache of responses
+            key (str): cache key of entry
+            lock_key (str): cache key of lock of entry
+            response (StreamingHttpResponse): response of read route
+
+        Returns:
+            Iterator[bytes]: iterator of response content
+    '''
+    chunks: list | None = []
+    size: int = 0
+    try:
+        for chunk in response.streaming_content:
+            if chunks is not None:
+                size += len(chunk)
+                if size <= settings.RESPONSE_CACHE_MAX_ENTRY_SIZE:
+                    chunks.append(chunk)
+                else:
+                    chunks = None
+            yield chunk
+        if chunks is None:
+            count_cache_stat('skipped')
+        else:
+            cache.set(key, [response.status_code, response['Content-Type'],
+                            b''.join(chunks)])
+            count_cache_stat('stores')
+    finally:
+        cache.delete(lock_key)
+
+
+def count_cache_stat(name: str) -> None:
+    ''' count_cache_stat: function to increase counter of cache lookups
+
+        Args:
+            name (str): name of counter ('hits', 'misses', 'waits',
+                'stores' or 'skipped')
+    '''
+    with stats_lock:
+        CACHE_STATS[name] += 1
+
+
+def get_cache_stats() -> dict:
+    ''' get_cache_stats: function to get counters of cache lookups of
+            current process, with hit rate of lookups
+
+        Returns:
+            dict: dictionary of counters and 'hit_rate' (0 to 1)
+    '''
+    with stats_lock:
+        stats: dict = dict(CACHE_STATS)
+    lookups: int = stats['hits'] + stats['misses']
+    stats['hit_rate'] = 0 if lookups == 0 else stats['hits'] / lookups
+    return stats
@@ -0,0 +1,181 @@
+''' Keyset (cursor) pagination of querysets for list routes '''
+import json
+from datetime import datetime
+from base64 import (urlsafe_b64decode, urlsafe_b64encode)
+from binascii import Error as Base64Error
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import (Field, Model, Q, QuerySet)
+from rest_framework import status
+from .responses import invalid_page_request
+
+
+def is_paginated(params) -> bool:
+    ''' is_paginated: function to check whether client opted in to
+            pagination, so clients sending neither a cursor nor a page
+            size keep receiving the full list
+
+        Args:
+            params (dict): request query parameters or body
+
+        Returns:
+            bool: True if 'cursor' or 'page_size' present
+    '''
+    return 'cursor' in params or 'page_size' in params
+
+
+def get_keyset_page(queryset: QuerySet, params, ordering: list) -> list:
+    ''' get_keyset_page: function to get a page of queryset positioned
+            by cursor rather than OFFSET, so later pages use the same
+            index seek as the first instead of counting past skipped rows
+
+        Args:
+            queryset (QuerySet): filtered queryset to paginate
+            params (dict): request query parameters or body, with optional
+                'cursor' string and 'page_size' integer
+            ordering (list): unique combination of field (or annotation)
+                names, ending with primary key, to order and position
+                pages by
+
+        Returns:
+            list: list containing a dictionary of 'results' list of model
+                instances (or rows of a values() queryset) with 'next' and
+                'previous' cursor strings (None at either end) or a
+                human-readable response message and a 'status' integer
+                with standard Http status code
+    '''
+    try:
+        page_size: int = get_page_size(params.get('page_size'))
+        cursor: str | None = params.get('cursor') or None
+        [values, reverse] = [None, False]
+        if cursor is not None:
+            [values, reverse] = decode_cursor(cursor, queryset, ordering)
+    except (TypeError, ValueError, ValidationError):
+        return [invalid_page_request, status.HTTP_400_BAD_REQUEST]
+
+    if values is not None:
+        queryset = queryset.filter(
+            get_keyset_filter(ordering, values, reverse))
+    order_by: list = [('-' if reverse else '') + name for name in ordering]
+    # One extra row shows whether another page follows
+    results: list = list(queryset.order_by(*order_by)[:page_size + 1])
+    has_more: bool = len(results) > page_size
+    results = results[:page_size]
+    if reverse:
+        results.reverse()
+
+    [next, previous] = [None, None]
+    if len(results) > 0:
+        if has_more or reverse:
+            next = encode_cursor(results[-1], ordering, False)
+        if (has_more and reverse) or (cursor is not None and not reverse):
+            previous = encode_cursor(results[0], ordering, True)
+    return [{'results': results, 'next': next, 'previous': previous},
+            status.HTTP_200_OK]
+
+
+def get_page_size(page_size) -> int:
+    ''' get_page_size: function to get requested page size limited
+            to PAGINATION_MAX_PAGE_SIZE
+
+        Args:
+            page_size (int | str | None): requested page size
+
+        Returns:
+            int: number of instances per page
+    '''
+    if page_size is None or page_size == '':
+        return settings.PAGINATION_PAGE_SIZE
+    page_size = int(page_size)
+    if page_size < 1:
+        raise ValueError('Page size must be positive.')
+    return min(page_size, settings.PAGINATION_MAX_PAGE_SIZE)
+
+
+def get_keyset_filter(ordering: list, values: list, reverse: bool) -> Q:
+    ''' get_keyset_filter: function to get filter for rows ordered after
+            (or before when reverse) cursor position
+
+        Args:
+            ordering (list): field names queryset is ordered by
+            values (list): field values of row at cursor position
+            reverse (bool): whether to get rows ordered before cursor
+
+        Returns:
+            Q: filter of rows following cursor position
+    '''
+    lookup: str = '__lt' if reverse else '__gt'
+    keyset: Q = Q()
+    for index, name in enumerate(ordering):
+        keyset |= Q(**dict(zip(ordering[:index], values[:index])),
+                    **{name + lookup: values[index]})
+    # Inclusive range on first field lets database seek index to cursor
+    return Q(**{ordering[0] + lookup + 'e': values[0]}) & keyset
+
+
+def encode_cursor(instance: Model | dict, ordering: list,
+                  reverse: bool) -> str:
+    ''' encode_cursor: function to get opaque cursor string for position
+            of model instance or row
+
+        Args:
+            instance (Model | dict): model instance or row dictionary of
+                QuerySet.values() at cursor position
+            ordering (list): field names queryset is ordered by
+            reverse (bool): whether cursor is for rows ordered before
+
+        Returns:
+            str: url safe base64 cursor string
+    '''
+    values: list = []
+    for name in ordering:
+        value = (instance[name] if isinstance(instance, dict)
+                 else getattr(instance, name))
+        values.append(value.isoformat() if isinstance(value, datetime)
+                      else str(value))
+    data: bytes = json.dumps({'v': values, 'r': reverse},
+                             separators=(',', ':')).encode()
+    return urlsafe_b64encode(data).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, queryset: QuerySet, ordering: list) -> list:
+    ''' decode_cursor: function to get field values and direction of
+            cursor string, raising ValueError or ValidationError if invalid
+
+        Args:
+            cursor (str): url safe base64 cursor string
+            queryset (QuerySet): paginated queryset
+            ordering (list): field names queryset is ordered by
+
+        Returns:
+            list: list containing field values and reverse boolean
+    '''
+    try:
+        data: dict = json.loads(urlsafe_b64decode(
+            cursor + '=' * (-len(cursor) % 4)))
+    except (Base64Error, UnicodeDecodeError) as error:
+        raise ValueError('Invalid cursor.') from error
+    if (not isinstance(data, dict) or not isinstance(data.get('r'), bool) or
+            not isinstance(data.get('v'), list) or
+            len(data['v']) != len(ordering) or
+            not all(isinstance(value, str) and value for value in data['v'])):
+        raise ValueError('Invalid cursor.')
+    values: list = [get_ordering_field(queryset, name).to_python(value)
+                    for [name, value] in zip(ordering, data['v'])]
+    return [values, data['r']]
+
+
+def get_ordering_field(queryset: QuerySet, name: str) -> Field:
+    ''' get_ordering_field: function to get model field, or output field
+            of annotation, converting cursor values of ordering name
+
+        Args:
+            queryset (QuerySet): paginated queryset
+            name (str): field or annotation name queryset is ordered by
+
+        Returns:
+            Field: Django model field
+    '''
+    if name in queryset.query.annotations:
+        return queryset.query.annotations[name].output_field
+    return queryset.model._meta.get_field(name)
@@ -16,3 +16,5 @@ user_update_failed = 'Error updating user in db.'
 create_user_failed = 'Error creating user in db.'
 
 user_deleted = 'User successfully deleted.'
+
+invalid_page_request = 'Invalid pagination cursor or page size.'
@@ -0,0 +1,154 @@
+''' Streaming JSON responses of querysets for unpaginated list routes '''
+import csv
+import zlib
+from typing import (Iterable, Iterator)
+from django.conf import settings
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.serializers import Serializer
+
+
+def get_streaming_response(queryset: QuerySet, serializer_class: type,
+                           **kwargs) -> StreamingHttpResponse:
+    ''' get_streaming_response: function to get response writing
+            '{"detail": [...]}' envelope of serialized queryset as rows
+            are read, so first bytes are sent before whole queryset is
+            loaded and memory stays constant however many rows match
+
+        Args:
+            queryset (QuerySet): queryset of model instances
+            serializer_class (type): serializer class of model
+            kwargs (dict): keyword arguments of serializer (ex: 'fields',
+                'context')
+
+        Returns:
+            StreamingHttpResponse: object containing API response
+                information, specifically a 'detail' list of serializer
+                data of queryset, 'status' integer with standard Http
+                status code
+    '''
+    renderer = JSONRenderer()
+    return StreamingHttpResponse(
+        iter_detail_json(queryset, serializer_class(**kwargs), renderer),
+        content_type=renderer.media_type, status=status.HTTP_200_OK)
+
+
+def iter_detail_json(queryset: QuerySet, serializer: Serializer,
+                     renderer: JSONRenderer,
+                     chunk_size: int | None = None) -> Iterator[bytes]:
+    ''' iter_detail_json: function to yield JSON of '{"detail": [...]}'
+            envelope, reading and rendering queryset rows in chunks
+
+        Args:
+            queryset (QuerySet): queryset of model instances
+            serializer (Serializer): serializer instance converting each
+                model instance (same as child of many=True serializer)
+            renderer (JSONRenderer): renderer of each serialized row,
+                so output matches JSON of a Response
+            chunk_size (int): number of rows read from database and
+                written per chunk (defaults to STREAMING_CHUNK_SIZE)
+
+        Returns:
+            Iterator[bytes]: iterator of JSON byte strings
+    '''
+    if chunk_size is None:
+        chunk_size = settings.STREAMING_CHUNK_SIZE
+    yield b'{"detail":['
+    chunk: list = []
+    separator: bytes = b''
+    for instance in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(renderer.render(serializer.to_representation(instance)))
+        if len(chunk) >= chunk_size:
+            yield separator + b','.join(chunk)
+            [chunk, separator] = [[], b',']
+    if len(chunk) > 0:
+        yield separator + b','.join(chunk)
+    yield b']}'
+
+
+def get_csv_streaming_response(rows: Iterable[list], filename: str,
+                               compress: bool = False
+                               ) -> StreamingHttpResponse:
+    ''' get_csv_streaming_response: function to get response writing
+            rows as a CSV file download as they are read, optionally
+            gzip compressed, so memory stays constant however many rows
+            are exported
+
+        Args:
+            rows (Iterable[list]): iterable of CSV row lists (heading
+                first), ideally reading from a queryset iterator
+            filename (str): name of downloaded file ('.gz' appended if
+                compressed)
+            compress (bool): whether to gzip file
+
+        Returns:
+            StreamingHttpResponse: object containing API response
+                information, specifically CSV (or gzip) file content,
+                'status' integer with standard Http status code
+    '''
+    chunks: Iterator[bytes] = iter_csv(rows)
+    content_type: str = 'text/csv; charset=utf-8'
+    if compress:
+        [chunks, content_type] = [iter_gzip(chunks), 'application/gzip']
+        filename += '.gz'
+    response = StreamingHttpResponse(chunks, content_type=content_type,
+                                     status=status.HTTP_200_OK)
+    response['Content-Disposition'] = 'attachment; filename="{}"'.format(
+        filename)
+    return response
+
+
+class CSVBuffer:
+    ''' CSVBuffer: class with write method returning written line, so
+            csv.writer formats rows without keeping a file in memory
+    '''
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_csv(rows: Iterable[list],
+             chunk_size: int | None = None) -> Iterator[bytes]:
+    ''' iter_csv: function to yield UTF-8 CSV lines of rows (newline
+            line endings), grouped in chunks
+
+        Args:
+            rows (Iterable[list]): iterable of CSV row lists
+            chunk_size (int): number of rows written per chunk (defaults
+                to STREAMING_CHUNK_SIZE)
+
+        Returns:
+            Iterator[bytes]: iterator of CSV byte strings
+    '''
+    if chunk_size is None:
+        chunk_size = settings.STREAMING_CHUNK_SIZE
+    writer = csv.writer(CSVBuffer(), lineterminator='\n')
+    chunk: list = []
+    for row in rows:
+        chunk.append(writer.writerow(row))
+        if len(chunk) >= chunk_size:
+            yield ''.join(chunk).encode('utf-8')
+            chunk = []
+    if len(chunk) > 0:
+        yield ''.join(chunk).encode('utf-8')
+
+
+def iter_gzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    ''' iter_gzip: function to yield gzip file of chunks, compressing
+            each chunk as it is read
+
+        Args:
+            chunks (Iterable[bytes]): iterable of byte strings
+
+        Returns:
+            Iterator[bytes]: iterator of gzip byte strings
+    '''
+    # wbits 31 writes gzip header and trailer (not raw zlib stream)
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        data: bytes = compressor.compress(chunk)
+        if len(data) > 0:
+            yield data
+    yield compressor.flush()
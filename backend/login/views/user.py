@@ -8,6 +8,7 @@ from rest_framework import status
 from ..models.user import User
 from ..serializers.user import UserSerializer
 from ..functions.user import find_user_by_id
+from ..utils.pagination import (is_paginated, get_keyset_page)
 from ..utils.responses import (no_user_found, create_user_failed,
                                invalid_request_body, user_deleted,
                                user_update_failed)
@@ -18,6 +19,9 @@ RETURN_FIELDS = ['id', 'email', 'username', 'first_name',
                  'last_name', 'email_verified', 'is_admin',
                  'last_login', 'deleted']
 
+# Unique ordering of User instances positioning each page
+USER_PAGE_ORDERING = ['date_created', 'id']
+
 
 class UserViewSet(viewsets.ViewSet):
     ''' UserViewSet: custom User viewsets for handling
@@ -68,15 +72,31 @@ class UserViewSet(viewsets.ViewSet):
                 instances of User model
 
         Args:
-            request (obj): object from client request, no data required
+            request (obj): object from client request, optionally with
+                'cursor' and/or 'page_size' query parameters to get a
+                single page
 
         Returns:
             Response (HttpResponse): object containing API response
                 information, specifically a 'detail' object of UserSerializer
                 data containing queryset of User database or error if no
-                data found, 'status' integer with standard Http status code
+                data found, 'next' and 'previous' cursors if paginated,
+                'status' integer with standard Http status code
         '''
         queryset: QuerySet[User] = User.objects.filter(deleted=False)
+        if is_paginated(request.query_params):
+            response: list = get_keyset_page(
+                queryset, request.query_params, USER_PAGE_ORDERING)
+            if response[1] == status.HTTP_400_BAD_REQUEST:
+                return Response({'detail': response[0]},
+                                status=status.HTTP_400_BAD_REQUEST)
+            page: dict = response[0]
+            serializer = UserSerializer(page['results'], fields=RETURN_FIELDS,
+                                        many=True,
+                                        context={'request': self.request})
+            return Response({'detail': serializer.data, 'next': page['next'],
+                             'previous': page['previous']},
+                            status=status.HTTP_200_OK)
         if len(queryset) == 0:
             return Response({'detail': no_user_found},
                             status=status.HTTP_404_NOT_FOUND)
@@ -113,6 +113,14 @@ CORS_ALLOW_HEADERS = [
     "x-csrftoken",
     "x-xsrftoken",
     "x-requested-with",
+    "if-none-match",
+]
+
+# Lets frontend read file name of CSV export downloads and ETag of
+# read routes (sent back as If-None-Match)
+CORS_EXPOSE_HEADERS = [
+    "content-disposition",
+    "etag",
 ]
 
 
@@ -200,3 +208,60 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 MEDIA_URL = '/media/'
+
+
+# Expense import
+EXPENSE_IMPORT_BATCH_SIZE = 1000
+
+EXPENSE_IMPORT_DIR = MEDIA_ROOT / 'imports'
+
+EXPENSE_IMPORT_MAX_WORKERS = 2
+
+EXPENSE_IMPORT_MAX_JOBS_PER_USER = 1
+
+# Seconds without progress before a running import job is resumed (jobs
+# of worker processes found to have exited on same host resume at once)
+EXPENSE_IMPORT_JOB_TIMEOUT = 300
+
+
+# Memory-mapped columnar snapshots of expenses of each user, refreshed
+# from expenses changed since on read by analytics routes
+EXPENSE_SNAPSHOT_DIR = MEDIA_ROOT / 'snapshots'
+
+
+# Keyset pagination of list routes (opt in with 'cursor' or 'page_size')
+PAGINATION_PAGE_SIZE = 100
+
+PAGINATION_MAX_PAGE_SIZE = 1000
+
+# Rows read and written per chunk of streamed list responses
+STREAMING_CHUNK_SIZE = 500
+
+# Users whose trained vendor categorizers are kept in memory per process
+CATEGORIZER_MAX_USERS = 100
+
+
+# Cache of read route responses by user data version (change sequence
+# read from database, so writes of any process invalidate entries).
+# LocMemCache is per process and evicts least recently used entries
+# (CULL_FREQUENCY equal to MAX_ENTRIES culls one at a time)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'responses',
+        'TIMEOUT': 3600,
+        'OPTIONS': {'MAX_ENTRIES': 500, 'CULL_FREQUENCY': 500},
+    },
+}
+
+RESPONSE_CACHE_ALIAS = 'responses'
+
+# Largest response body stored, so memory of cache stays below
+# MAX_ENTRIES times this size (larger responses are streamed uncached)
+RESPONSE_CACHE_MAX_ENTRY_SIZE = 1024 * 1024
+
+# Seconds other requests wait for response being built before building it
+RESPONSE_CACHE_LOCK_TIMEOUT = 30